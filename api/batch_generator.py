@@ -0,0 +1,208 @@
+"""Bulk content generation from a JSONL/CSV prompt file"""
+
+import asyncio
+import csv
+import json
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+import openai
+from api.openai_client import EnhancedOpenAIClient
+from api.provider_pool import ProviderPoolError, get_provider_pool
+from config.settings import (
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_RETRIES,
+    BATCH_REQUESTS_PER_MINUTE,
+    BATCH_RETRY_BASE_DELAY,
+)
+from models.content import BatchRequest
+from utils.retry_budget import get_retry_budget
+
+# Errors worth retrying: throttling, timeouts and upstream 5xx
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    ProviderPoolError,
+)
+
+
+def parse_batch_requests(lines: Iterable[str], file_format: str) -> Iterator[BatchRequest]:
+    """Parse batch requests from JSONL or CSV lines"""
+    if file_format == "csv":
+        rows = csv.DictReader(lines)
+    elif file_format == "jsonl":
+        rows = (json.loads(line) for line in lines if line.strip())
+    else:
+        raise ValueError(f"Unsupported batch file format: {file_format}")
+
+    for row in rows:
+        yield BatchRequest.from_row(row)
+
+
+def load_batch_requests(path: str) -> List[BatchRequest]:
+    """Load batch requests from a .jsonl or .csv file"""
+    file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+    with open(path, newline="", encoding="utf-8") as batch_file:
+        return list(parse_batch_requests(batch_file, file_format))
+
+
+class RequestPacer:
+    """Spaces request starts evenly to stay under a requests-per-minute limit"""
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Wait until the next request slot is available"""
+        if not self.interval:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class BatchGenerator:
+    """Generates many articles concurrently with a bounded number of in-flight requests"""
+
+    def __init__(
+        self,
+        api_key=None,
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        requests_per_minute: int = BATCH_REQUESTS_PER_MINUTE,
+        max_retries: int = BATCH_MAX_RETRIES,
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+
+    async def generate(self, requests: Iterable[BatchRequest]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one result record per request, in completion order"""
+        client = EnhancedOpenAIClient(self.api_key)
+        # The pacing limit is per key; pooled keys each add their own
+        pacer = RequestPacer(self.requests_per_minute * len(get_provider_pool().keys_for(client.api_key)))
+
+        # Bounded queues keep both in-flight calls and buffered input small
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def feed() -> None:
+            try:
+                for index, request in enumerate(requests):
+                    await pending.put((index, request))
+            finally:
+                # Always release the workers, even if the input fails to parse
+                for _ in range(self.max_concurrency):
+                    await pending.put(None)
+
+        async def work() -> None:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    await results.put(None)
+                    return
+                index, request = item
+                await results.put(await self._generate_one(client, pacer, index, request))
+
+        tasks = [asyncio.create_task(feed())]
+        tasks.extend(
+            asyncio.create_task(work()) for _ in range(self.max_concurrency)
+        )
+
+        try:
+            finished_workers = 0
+            while finished_workers < self.max_concurrency:
+                record = await results.get()
+                if record is None:
+                    finished_workers += 1
+                    continue
+                yield record
+
+            # Surface input parsing errors raised inside the feeder
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await client.aclose()
+
+    async def _generate_one(
+        self,
+        client: EnhancedOpenAIClient,
+        pacer: RequestPacer,
+        index: int,
+        request: BatchRequest,
+    ) -> Dict[str, Any]:
+        """Generate and analyze one request, retrying transient failures"""
+        record: Dict[str, Any] = {
+            "index": index,
+            **request.__dict__,
+            "content": None,
+            "analysis": None,
+            "error": None,
+        }
+        started_at = time.perf_counter()
+        # The pool already retries and fails over; row retries come out of the same budget
+        budget = get_retry_budget("openai")
+
+        for attempt in range(self.max_retries + 1):
+            await pacer.wait()
+            try:
+                content = await client.agenerate_content(
+                    request.prompt,
+                    request.content_type,
+                    request.tone,
+                    request.max_length,
+                    request.model,
+                    request.temperature,
+                )
+                record["content"] = content
+                record["analysis"] = client.get_content_analysis(
+                    content, request.content_type
+                )
+                record["error"] = None
+                break
+            except RETRYABLE_ERRORS as e:
+                record["error"] = f"{type(e).__name__}: {str(e)}"
+                if attempt >= self.max_retries or not budget.try_spend():
+                    break
+                # Exponential backoff with jitter so workers don't retry in lockstep
+                delay = BATCH_RETRY_BASE_DELAY * (2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {str(e)}"
+                break
+
+        record["attempts"] = attempt + 1
+        record["duration"] = round(time.perf_counter() - started_at, 3)
+        return record
+
+    async def run_to_file(
+        self, requests: Iterable[BatchRequest], output_path: str
+    ) -> Dict[str, int]:
+        """Stream result records to a JSONL file as they complete"""
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            async for record in self.generate(requests):
+                output_file.write(json.dumps(record) + "\n")
+                output_file.flush()
+
+                summary["total"] += 1
+                summary["failed" if record["error"] else "succeeded"] += 1
+
+        return summary
+
+    def run(self, input_path: str, output_path: str) -> Dict[str, int]:
+        """Run a batch file to completion and return a success/failure summary"""
+        return asyncio.run(
+            self.run_to_file(load_batch_requests(input_path), output_path)
+        )
@@ -0,0 +1,269 @@
+"""Single-pass and incremental feature extraction for generated markdown content"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Protocol
+
+LINK_PATTERN = re.compile(r"\[[^\]\n]*\]\([^)\n]*\)")
+LIST_MARKERS = ("- ", "* ", "+ ")
+NUMBERED_PATTERN = re.compile(r"\d+\.[ \t]")
+NEW_LINE_NUMBERED_PATTERN = re.compile(r"\n\d+\.[ \t]")
+STEP_PREFIXES = ("1.", "2.", "3.")
+MARKDOWN_MARKERS = ("#", "```", "**", "*", "-", "1.", "2.", "[", "]")
+TAIL_LINE_COUNT = 5  # the blog post check looks for a conclusion in the last 5 lines
+
+
+class KeywordLookup(Protocol):
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        ...
+
+
+class TextKeywordLookup:
+    """Keyword presence over a fully materialized lowercase text"""
+
+    def __init__(self, lower: str):
+        self.lower = lower
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        """Check whether any keyword occurs in the text"""
+        # Substring semantics ("install" matches "installation"), no re-lowering
+        return any(keyword in self.lower for keyword in keywords)
+
+
+@dataclass
+class ContentFeatures:
+    """Everything the content analysis checks read, extracted once per document"""
+    word_count: int
+    character_count: int
+    line_count: int  # non-empty lines
+    tail_lines: List[str]  # last few stripped, non-empty lines
+    hash_count: int
+    heading_count: int
+    code_fence_count: int
+    list_item_count: int
+    numbered_item_count: int
+    has_numbered_steps: bool  # a line starts with "1.", "2." or "3."
+    link_count: int
+    long_paragraph_count: int  # non-heading lines longer than 50 characters
+    sentence_count: int  # sentence terminators: . ! ?
+    markers: FrozenSet[str]  # markdown markers present anywhere in the text
+    keywords: KeywordLookup
+
+    def has_marker(self, *markers: str) -> bool:
+        """Check whether any of the markdown markers occurs in the content"""
+        return any(marker in self.markers for marker in markers)
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        """Check whether any keyword occurs in the lowercased content"""
+        return self.keywords.has_any(keywords)
+
+
+def extract_features(content: str) -> ContentFeatures:
+    """Tokenize markdown content once into a shared feature record"""
+    lines = list(filter(None, map(str.strip, content.split("\n"))))
+
+    # With every line prefixed by a newline, line-start checks become C-level substring counts
+    joined = "\n" + "\n".join(lines)
+
+    return ContentFeatures(
+        word_count=len(content.split()),
+        character_count=len(content),
+        line_count=len(lines),
+        tail_lines=lines[-TAIL_LINE_COUNT:],
+        hash_count=content.count("#"),
+        heading_count=joined.count("\n#"),
+        code_fence_count=joined.count("\n```"),
+        list_item_count=sum(joined.count("\n" + marker) for marker in LIST_MARKERS),
+        numbered_item_count=len(NEW_LINE_NUMBERED_PATTERN.findall(joined)),
+        has_numbered_steps=any("\n" + prefix in joined for prefix in STEP_PREFIXES),
+        link_count=len(LINK_PATTERN.findall(content)),
+        long_paragraph_count=sum(
+            1 for line in lines if len(line) > 50 and line[0] != "#"
+        ),
+        sentence_count=content.count(".") + content.count("!") + content.count("?"),
+        markers=frozenset(marker for marker in MARKDOWN_MARKERS if marker in content),
+        keywords=TextKeywordLookup(content.lower()),
+    )
+
+
+class IncrementalKeywordLookup:
+    """
+    Keyword presence over text that arrives in pieces. A keyword is scanned
+    against the whole buffer once, the first time it is asked for; after
+    that each delta is only checked together with a short overlap so matches
+    that straddle two deltas are still found.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._overlap = ""
+        self._found: Dict[str, bool] = {}
+        self._max_keyword_length = 1
+
+    def feed(self, lower_delta: str) -> None:
+        """Add a lowercased delta and update every tracked keyword"""
+        window = self._overlap + lower_delta
+        for keyword, found in self._found.items():
+            if not found and keyword in window:
+                self._found[keyword] = True
+
+        self._parts.append(lower_delta)
+        overlap = self._max_keyword_length - 1
+        self._overlap = window[-overlap:] if overlap else ""
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        """Check whether any keyword has occurred so far"""
+        for keyword in keywords:
+            if keyword not in self._found:
+                self._track(keyword)
+            if self._found[keyword]:
+                return True
+        return False
+
+    def _track(self, keyword: str) -> None:
+        """Start tracking a keyword with a one-off scan of the buffer"""
+        text = "".join(self._parts)
+        self._parts = [text]
+        self._found[keyword] = keyword in text
+
+        if len(keyword) > self._max_keyword_length:
+            self._max_keyword_length = len(keyword)
+            self._overlap = text[-(len(keyword) - 1):]
+
+
+class IncrementalContentAnalyzer:
+    """
+    Content analysis that updates while tokens stream in. Each update() only
+    looks at the new delta (plus the unfinished last line), and snapshot()
+    scores the running counters without rescanning the buffer.
+    """
+
+    def __init__(
+        self,
+        content_type: str,
+        scorer: Callable[[ContentFeatures, str], Dict[str, Any]],
+        max_length: Optional[int] = None,
+    ):
+        self.content_type = content_type
+        self.max_length = max_length
+        self._scorer = scorer
+        self._keywords = IncrementalKeywordLookup()
+
+        self.word_count = 0
+        self.character_count = 0
+        self.hash_count = 0
+        self.sentence_count = 0
+        self._in_word = False
+        self._marker_overlap = ""
+        self._markers = set()
+
+        # Counters over completed lines; the unfinished line is kept apart
+        self._partial_line = ""
+        self._line_counts = self._empty_line_counts()
+        self._tail_lines = deque(maxlen=TAIL_LINE_COUNT)
+
+    @staticmethod
+    def _empty_line_counts() -> Dict[str, int]:
+        return {
+            "line_count": 0,
+            "heading_count": 0,
+            "code_fence_count": 0,
+            "list_item_count": 0,
+            "numbered_item_count": 0,
+            "has_numbered_steps": 0,
+            "link_count": 0,
+            "long_paragraph_count": 0,
+        }
+
+    def update(self, delta: str) -> None:
+        """Fold a streamed delta into the running counters"""
+        if not delta:
+            return
+
+        # Words: a delta that continues the previous word doesn't start a new one
+        words = len(delta.split())
+        if words and self._in_word and not delta[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._in_word = not delta[-1].isspace()
+
+        self.character_count += len(delta)
+        self.hash_count += delta.count("#")
+        self.sentence_count += delta.count(".") + delta.count("!") + delta.count("?")
+
+        window = self._marker_overlap + delta
+        self._markers.update(marker for marker in MARKDOWN_MARKERS if marker in window)
+        self._marker_overlap = window[-2:]
+
+        self._keywords.feed(delta.lower())
+
+        lines = (self._partial_line + delta).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            self._count_line(line.strip(), self._line_counts, self._tail_lines)
+
+    @staticmethod
+    def _count_line(line: str, counts: Dict[str, int], tail_lines: deque) -> None:
+        """Add one stripped line to the line counters"""
+        if not line:
+            return
+
+        counts["line_count"] += 1
+        tail_lines.append(line)
+        counts["link_count"] += len(LINK_PATTERN.findall(line))
+
+        if line.startswith(STEP_PREFIXES):
+            counts["has_numbered_steps"] = 1
+
+        if line.startswith("#"):
+            counts["heading_count"] += 1
+            return
+
+        if line.startswith("```"):
+            counts["code_fence_count"] += 1
+        elif line.startswith(LIST_MARKERS):
+            counts["list_item_count"] += 1
+        elif NUMBERED_PATTERN.match(line):
+            counts["numbered_item_count"] += 1
+
+        if len(line) > 50:
+            counts["long_paragraph_count"] += 1
+
+    @property
+    def length_exceeded(self) -> bool:
+        """Early signal: the streamed text is already over the word limit"""
+        return self.max_length is not None and self.word_count > self.max_length
+
+    def features(self) -> ContentFeatures:
+        """Build a feature record from the counters, treating the unfinished line as complete"""
+        counts = dict(self._line_counts)
+        tail_lines = deque(self._tail_lines, maxlen=TAIL_LINE_COUNT)
+        self._count_line(self._partial_line.strip(), counts, tail_lines)
+
+        return ContentFeatures(
+            word_count=self.word_count,
+            character_count=self.character_count,
+            line_count=counts["line_count"],
+            tail_lines=list(tail_lines),
+            hash_count=self.hash_count,
+            heading_count=counts["heading_count"],
+            code_fence_count=counts["code_fence_count"],
+            list_item_count=counts["list_item_count"],
+            numbered_item_count=counts["numbered_item_count"],
+            has_numbered_steps=bool(counts["has_numbered_steps"]),
+            link_count=counts["link_count"],
+            long_paragraph_count=counts["long_paragraph_count"],
+            sentence_count=self.sentence_count,
+            markers=frozenset(self._markers),
+            keywords=self._keywords,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Score the content streamed so far, plus early-stop signals"""
+        analysis = self._scorer(self.features(), self.content_type)
+        analysis["signals"] = {
+            "length_exceeded": self.length_exceeded,
+            "max_length": self.max_length,
+        }
+        return analysis
@@ -1,13 +1,139 @@
+from typing import Any, Dict, List, Optional
 import requests
-import streamlit as st
+from api.http_transport import HttpTransport, get_hashnode_transport
 from utils.masking import mask_publication_ids, mask_sensitive_id
-from config.settings import HASHNODE_GRAPHQL_URL
+from config.settings import HASHNODE_COMMON_TAG_QUERIES, HASHNODE_GRAPHQL_URL, SINGLE_FLIGHT_ENABLED
+from utils.single_flight import get_single_flight
+
+
+CREATE_DRAFT_MUTATION = """
+    mutation createDraft($input: CreateDraftInput!) {
+        createDraft(input: $input) {
+            draft {
+                id
+                title
+                slug
+                updatedAt
+            }
+        }
+    }
+"""
+
+FIND_DRAFTS_QUERY = """
+    query findDrafts($id: ObjectId!, $first: Int!) {
+        publication(id: $id) {
+            drafts(first: $first) {
+                edges {
+                    node {
+                        id
+                        title
+                        slug
+                        updatedAt
+                        content {
+                            markdown
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+class HashnodeRequestError(Exception):
+    """
+    A failed Hashnode call, classified for the caller's retry logic.
+    maybe_sent means the server may have processed the request anyway.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+        maybe_sent: bool = False,
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.maybe_sent = maybe_sent
+
+
+def build_connect_query(tag_queries: List[str]) -> Dict[str, Any]:
+    """
+    Compose one GraphQL document that fetches the user, their publications and
+    a tagCategories page per tag query, each under its own alias.
+    """
+    variable_defs = ["$page: Int!"]
+    tag_fields = []
+    variables: Dict[str, Any] = {"page": 0}
+
+    for number, tag_query in enumerate(tag_queries):
+        variable_defs.append(f"$tagQuery{number}: String")
+        tag_fields.append(
+            f"tags{number}: tagCategories(page: $page, query: $tagQuery{number}) "
+            "{ _id name slug }"
+        )
+        variables[f"tagQuery{number}"] = tag_query
+
+    tag_selections = "\n            ".join(tag_fields)
+    query = f"""
+        query connect({", ".join(variable_defs)}) {{
+            me {{
+                username
+                name
+                publications {{
+                    edges {{
+                        node {{
+                            id
+                            title
+                            isDefault
+                        }}
+                    }}
+                }}
+            }}
+            {tag_selections}
+        }}
+    """
+    return {"query": query, "variables": variables}
+
+
+def _parse_publications(me: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten publication edges, default publication first"""
+    edges = (me.get("publications") or {}).get("edges") or []
+    publications_list = [
+        {
+            "id": edge["node"]["id"],
+            "title": edge["node"]["title"],
+            "isDefault": edge["node"].get("isDefault", False),
+        }
+        for edge in edges
+    ]
+    publications_list.sort(key=lambda x: (0 if x["isDefault"] else 1, x["title"]))
+    return publications_list
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
 
 
 class HashnodeClient:
-    def __init__(self, api_key=None):
+    # The methods that report to the UI import streamlit themselves, so headless
+    # callers (CLI, workers, services) can use connect/submit_draft without it
+    def __init__(self, api_key=None, transport: HttpTransport = None):
         self.api_key = api_key
         self.graphql_url = HASHNODE_GRAPHQL_URL
+        # pooled keep-alive connections are shared by every client instance
+        self.transport = transport or get_hashnode_transport()
+
+    def _shared(self, operation: str, key, func):
+        """Run a read-only lookup, sharing it with identical lookups already in flight"""
+        if not SINGLE_FLIGHT_ENABLED:
+            return func()
+        return get_single_flight(f"hashnode.{operation}").do((self.api_key, key), func)
 
     def _get_headers(self):
         """Get headers for API requests"""
@@ -15,6 +141,8 @@ class HashnodeClient:
 
     def authenticate(self):
         """Authenticate with Hashnode"""
+        import streamlit as st
+
         if not self.api_key:
             st.error("No Hashnode API key provided")
             return False
@@ -29,8 +157,11 @@ class HashnodeClient:
         """
 
         try:
-            response = requests.post(
-                self.graphql_url, json={"query": query}, headers=self._get_headers()
+            response = self.transport.post(
+                self.graphql_url,
+                operation="authenticate",
+                json={"query": query},
+                headers=self._get_headers(),
             )
 
             st.write(f"Response status: {response.status_code}")
@@ -50,8 +181,44 @@ class HashnodeClient:
             st.error(f"Error authenticating with Hashnode: {str(e)}")
             return False
 
+    def connect(self, tag_queries: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch the user, their publications and common tags in a single request.
+        Returns {"user", "publications", "tags"}, where tags maps each tag query
+        to its results, or raises HashnodeRequestError.
+        """
+        if not self.api_key:
+            raise HashnodeRequestError("No Hashnode API key provided")
+
+        tag_queries = list(HASHNODE_COMMON_TAG_QUERIES if tag_queries is None else tag_queries)
+        return self._shared("connect", tuple(tag_queries), lambda: self._connect(tag_queries))
+
+    def _connect(self, tag_queries: List[str]) -> Dict[str, Any]:
+        result = self._post_graphql(
+            "connect", build_connect_query(tag_queries), allow_partial=True
+        )
+
+        data = result["data"]
+        me = data.get("me")
+        if not me:
+            raise HashnodeRequestError("Hashnode did not return the authenticated user")
+
+        return {
+            "user": {"username": me.get("username"), "name": me.get("name")},
+            "publications": _parse_publications(me),
+            "tags": {
+                tag_query: data.get(f"tags{number}") or []
+                for number, tag_query in enumerate(tag_queries)
+            },
+        }
+
     def get_publications(self):
         """Get user's publications"""
+        return self._shared("get_publications", None, self._fetch_publications)
+
+    def _fetch_publications(self):
+        import streamlit as st
+
         query = """
             query {
                 me {
@@ -69,8 +236,11 @@ class HashnodeClient:
         """
 
         try:
-            response = requests.post(
-                self.graphql_url, json={"query": query}, headers=self._get_headers()
+            response = self.transport.post(
+                self.graphql_url,
+                operation="get_publications",
+                json={"query": query},
+                headers=self._get_headers(),
             )
 
             if response.status_code == 200:
@@ -81,26 +251,7 @@ class HashnodeClient:
                     and "me" in result["data"]
                     and "publications" in result["data"]["me"]
                 ):
-                    publications = result["data"]["me"]["publications"]["edges"]
-
-                    publications_list = []
-
-                    for publication in publications:
-                        publications_list.append(
-                            {
-                                "id": publication["node"]["id"],
-                                "title": publication["node"]["title"],
-                                "isDefault": publication["node"].get(
-                                    "isDefault", False
-                                ),
-                            }
-                        )
-
-                    publications_list.sort(
-                        key=lambda x: (0 if x["isDefault"] else 1, x["title"])
-                    )
-
-                    return publications_list
+                    return _parse_publications(result["data"]["me"])
                 else:
                     # Mask sensitive data
                     result_copy = result.copy()
@@ -113,7 +264,13 @@ class HashnodeClient:
             return None
 
     def get_tags(self, search_text=""):
-        """Get tags matching search text"""
+        """Get tags matching search text, or None if the request failed"""
+        search_text = (search_text or "").strip()
+        return self._shared("get_tags", search_text, lambda: self._fetch_tags(search_text))
+
+    def _fetch_tags(self, search_text):
+        import streamlit as st
+
         query = """
             query getTags($page: Int!, $query: String) {
                 tagCategories(page: $page, query: $query) {
@@ -127,8 +284,9 @@ class HashnodeClient:
         variables = {"page": 0, "query": search_text}
 
         try:
-            response = requests.post(
+            response = self.transport.post(
                 self.graphql_url,
+                operation="get_tags",
                 json={"query": query, "variables": variables},
                 headers=self._get_headers(),
             )
@@ -137,48 +295,26 @@ class HashnodeClient:
                 result = response.json()
 
                 if "data" in result and "tagCategories" in result["data"]:
-                    return result["data"]["tagCategories"]
+                    return result["data"]["tagCategories"] or []
 
-            return []
+            return None
         except Exception as e:
             st.error(f"Error getting Hashnode tags: {str(e)}")
-            return []
+            return None
 
     def create_draft(
         self, title, content, tags=None, publication_id=None, subtitle=None
     ):
         """Create a draft post on Hashnode"""
+        import streamlit as st
+
         if not publication_id or not publication_id.strip():
             st.error(
                 "Publication ID is required. Please provide a valid publication ID."
             )
             return False
 
-        if tags is None:
-            tags = []
-
-        input_vars = {
-            "title": title,
-            "contentMarkdown": content,
-            "tags": tags,
-            "publicationId": publication_id,
-        }
-
-        if subtitle and subtitle.strip():
-            input_vars["subtitle"] = subtitle
-
-        mutation = """
-            mutation createDraft($input: CreateDraftInput!) {
-                createDraft(input: $input) {
-                    draft {
-                        id
-                        title
-                        slug
-                        updatedAt
-                    }
-                }
-            }
-        """
+        input_vars = self._draft_input(title, content, tags, publication_id, subtitle)
 
         try:
             # Create a copy with masked publication ID
@@ -191,9 +327,12 @@ class HashnodeClient:
 
             st.write("Sending input variables: ", debug_vars)
 
-            response = requests.post(
+            # mutations are never retried after the server may have processed them
+            response = self.transport.post(
                 self.graphql_url,
-                json={"query": mutation, "variables": {"input": input_vars}},
+                operation="create_draft",
+                idempotent=False,
+                json={"query": CREATE_DRAFT_MUTATION, "variables": {"input": input_vars}},
                 headers=self._get_headers(),
             )
 
@@ -219,3 +358,118 @@ class HashnodeClient:
         except Exception as e:
             st.error(f"Error posting to Hashnode: {str(e)}")
             return False
+
+    @staticmethod
+    def _draft_input(title, content, tags, publication_id, subtitle) -> Dict[str, Any]:
+        """Build the CreateDraftInput variables"""
+        input_vars = {
+            "title": title,
+            "contentMarkdown": content,
+            "tags": tags or [],
+            "publicationId": publication_id,
+        }
+
+        if subtitle and subtitle.strip():
+            input_vars["subtitle"] = subtitle
+
+        return input_vars
+
+    def submit_draft(
+        self, title, content, tags=None, publication_id=None, subtitle=None
+    ) -> Dict[str, Any]:
+        """
+        Create a draft without touching the UI, for background workers.
+        Returns the draft or raises HashnodeRequestError.
+        """
+        if not publication_id or not publication_id.strip():
+            raise HashnodeRequestError("Publication ID is required")
+
+        input_vars = self._draft_input(title, content, tags, publication_id, subtitle)
+        result = self._post_graphql(
+            "create_draft",
+            {"query": CREATE_DRAFT_MUTATION, "variables": {"input": input_vars}},
+            idempotent=False,
+            max_retries=0,  # the publish queue retries, honouring Retry-After
+        )
+
+        draft = ((result.get("data") or {}).get("createDraft") or {}).get("draft")
+        if not draft:
+            raise HashnodeRequestError("Hashnode did not return the created draft")
+        return draft
+
+    def find_draft(self, publication_id, title, content, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        Look for an existing draft with this exact title and content, used to
+        check whether an earlier, interrupted createDraft went through.
+        """
+        result = self._post_graphql(
+            "find_draft",
+            {
+                "query": FIND_DRAFTS_QUERY,
+                "variables": {"id": publication_id, "first": limit},
+            },
+        )
+
+        publication = (result.get("data") or {}).get("publication") or {}
+        edges: List[Dict[str, Any]] = (publication.get("drafts") or {}).get("edges") or []
+
+        for edge in edges:
+            node = edge.get("node") or {}
+            markdown = (node.get("content") or {}).get("markdown")
+            if node.get("title") == title and markdown == content:
+                node.pop("content", None)
+                return node
+        return None
+
+    def _post_graphql(
+        self,
+        operation: str,
+        payload: Dict[str, Any],
+        idempotent: bool = True,
+        allow_partial: bool = False,
+        max_retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        POST a GraphQL payload and classify any failure as a HashnodeRequestError.
+        With allow_partial, field errors are tolerated as long as data came back.
+        max_retries overrides the transport's own retry count.
+        """
+        try:
+            response = self.transport.post(
+                self.graphql_url,
+                operation=operation,
+                idempotent=idempotent,
+                max_retries=max_retries,
+                json=payload,
+                headers=self._get_headers(),
+            )
+        except requests.ConnectTimeout as e:
+            raise HashnodeRequestError(f"Could not connect to Hashnode: {e}", retryable=True)
+        except requests.RequestException as e:
+            # The request may have reached Hashnode before the connection broke
+            raise HashnodeRequestError(
+                f"Request to Hashnode failed: {e}", retryable=True, maybe_sent=True
+            )
+
+        if response.status_code == 429:
+            raise HashnodeRequestError(
+                "Hashnode rate limit reached",
+                retryable=True,
+                retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code >= 500:
+            raise HashnodeRequestError(
+                f"Hashnode server error (HTTP {response.status_code})",
+                retryable=True,
+                maybe_sent=True,
+            )
+        if response.status_code != 200:
+            raise HashnodeRequestError(
+                f"Hashnode rejected the request (HTTP {response.status_code}): {response.text}"
+            )
+
+        result = response.json()
+        if result.get("errors") and not (allow_partial and result.get("data")):
+            messages = "; ".join(error.get("message", "") for error in result["errors"])
+            raise HashnodeRequestError(f"Hashnode API error: {messages}")
+        return result
@@ -0,0 +1,342 @@
+"""
+Hedged requests for streamed completions. When no first chunk has arrived
+by an adaptive deadline, a second request for the same completion is sent;
+whichever produces a chunk first is used and the other is cancelled.
+
+A start function opens one request and returns (stream, context), where
+context is whatever the caller needs to know about that request; open()
+returns the winner's stream and context. start is passed a callback to call
+once the request is actually sent: the deadline runs from then, so time spent
+waiting for a free route in the provider pool never triggers a hedge.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from config.settings import (
+    HEDGE_ENABLED,
+    HEDGE_INITIAL_DELAY,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+)
+from utils.retry_budget import RetryBudget, get_retry_budget
+from utils.telemetry import get_telemetry
+
+# measured from dispatch, so time queued for a free route does not raise the deadline
+TTFT_METRIC = "prosepilot_upstream_ttft_seconds"
+_END = object()  # the stream ended before its first chunk
+
+StartFunction = Callable[[Callable[[], None]], Tuple[Any, Any]]
+
+
+class HedgedStream:
+    """The winning stream, starting with the chunk that won the race"""
+
+    def __init__(self, stream, first_chunk):
+        self.stream = stream
+        self.first_chunk = first_chunk
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.first_chunk is _END:
+            return
+        yield self.first_chunk
+        yield from self.stream
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class AsyncHedgedStream:
+    """async counterpart of HedgedStream"""
+
+    def __init__(self, stream, first_chunk):
+        self.stream = stream
+        self.first_chunk = first_chunk
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self.first_chunk is _END:
+            return
+        yield self.first_chunk
+        async for chunk in self.stream:
+            yield chunk
+
+    async def close(self) -> None:
+        await self.stream.close()
+
+
+class _Attempt:
+    """One request racing in its own thread, up to its first chunk"""
+
+    def __init__(self, start: StartFunction, finished: "queue.Queue[_Attempt]"):
+        self.stream = None
+        self.context: Any = None
+        self.first_chunk: Any = None
+        self.error: Optional[Exception] = None
+        self.dispatched_at: Optional[float] = None
+        self.last_dispatched_at: Optional[float] = None  # differs after a retry inside the pool
+        self.first_chunk_at: Optional[float] = None
+        # set once the request is sent, or the attempt ended without sending it
+        self.dispatched = threading.Event()
+        self._cancelled = False
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, args=(start, finished), daemon=True).start()
+
+    def _dispatch(self) -> None:
+        self.last_dispatched_at = time.perf_counter()
+        if self.dispatched_at is None:
+            self.dispatched_at = self.last_dispatched_at
+        self.dispatched.set()
+
+    def _run(self, start: StartFunction, finished: "queue.Queue[_Attempt]") -> None:
+        try:
+            stream, self.context = start(self._dispatch)
+            with self._lock:
+                self.stream = stream
+                cancelled = self._cancelled
+            if cancelled:
+                stream.close()
+                return
+            self.first_chunk = next(iter(stream), _END)
+            self.first_chunk_at = time.perf_counter()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.dispatched.set()
+        finished.put(self)
+
+    def cancel(self) -> None:
+        """Abandon the attempt; a request still being sent is closed as soon as it returns"""
+        with self._lock:
+            self._cancelled = True
+            stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass  # it is being torn down mid-read; nothing more to release
+
+
+class Hedger:
+    """
+    Sends a hedged duplicate of a completion whose first chunk is later
+    than the HEDGE_PERCENTILE of recent time-to-first-token for its model,
+    counted from when each request was sent. Hedges are paid for from the
+    OpenAI retry budget, so they stop when the upstream is slow for everyone
+    rather than for the odd request.
+    """
+
+    def __init__(self, budget: Optional[RetryBudget] = None, enabled: bool = HEDGE_ENABLED):
+        self.budget = budget or get_retry_budget("openai")
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fired = 0
+        self.hedge_wins = 0
+        self.denied = 0
+        self.saved_seconds = 0.0
+
+    def delay(self, model: str) -> float:
+        """Seconds to wait for a first chunk before hedging"""
+        recent = get_telemetry().recent_values(TTFT_METRIC, model=model)
+        if len(recent) < HEDGE_MIN_SAMPLES:
+            return HEDGE_INITIAL_DELAY
+        deadline = recent[min(len(recent) - 1, int(len(recent) * HEDGE_PERCENTILE))]
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, deadline))
+
+    def open(
+        self, start: StartFunction, model: str, ready: Optional[Callable[[], bool]] = None
+    ) -> Tuple[Any, Any]:
+        """
+        Open a stream via start(), hedging it if its first chunk is late.
+        ready() tells whether a hedge could be sent right away; while it
+        returns False, no hedge is sent.
+        """
+        self.budget.record_request()
+        if not self.enabled:
+            return start(lambda: None)
+
+        delay = self.delay(model)
+        finished: "queue.Queue[_Attempt]" = queue.Queue()
+        primary = _Attempt(start, finished)
+        attempts: List[_Attempt] = [primary]
+
+        primary.dispatched.wait()
+        started_at = primary.dispatched_at or time.perf_counter()
+        try:
+            winner = finished.get(timeout=max(0.0, delay - (time.perf_counter() - started_at)))
+        except queue.Empty:
+            winner = None
+            if self._hedge(model, ready):
+                attempts.append(_Attempt(start, finished))
+
+        outstanding = len(attempts) - (winner is not None)
+        while winner is None or (winner.error is not None and outstanding):
+            winner = finished.get()
+            outstanding -= 1
+
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel()
+        if winner.error is not None:
+            raise winner.error
+
+        self._observe_ttft(model, winner.first_chunk, winner.last_dispatched_at, winner.first_chunk_at)
+        self._record(model, started_at, hedged=len(attempts) > 1, hedge_won=winner is not primary)
+        return HedgedStream(winner.stream, winner.first_chunk), winner.context
+
+    async def aopen(
+        self,
+        start: Callable[[Callable[[], None]], Awaitable[Tuple[Any, Any]]],
+        model: str,
+        ready: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Any, Any]:
+        """async counterpart of open; the losing request is cancelled in flight"""
+        self.budget.record_request()
+        if not self.enabled:
+            return await start(lambda: None)
+
+        async def attempt(dispatched: asyncio.Event):
+            dispatched_at: List[float] = []  # one per request sent; the pool may retry
+
+            def on_dispatch() -> None:
+                dispatched_at.append(time.perf_counter())
+                dispatched.set()
+
+            try:
+                stream, context = await start(on_dispatch)
+            finally:
+                dispatched.set()
+            try:
+                first_chunk = await stream.__anext__()
+            except StopAsyncIteration:
+                first_chunk = _END
+            except BaseException:
+                await stream.close()
+                raise
+            return stream, context, first_chunk, dispatched_at[-1] if dispatched_at else None, time.perf_counter()
+
+        delay = self.delay(model)
+        primary_dispatched = asyncio.Event()
+        primary = asyncio.ensure_future(attempt(primary_dispatched))
+        tasks = [primary]
+        winner = None
+
+        try:
+            await primary_dispatched.wait()
+            started_at = time.perf_counter()
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._hedge(model, ready):
+                tasks.append(asyncio.ensure_future(attempt(asyncio.Event())))
+                pending = set(tasks)
+
+            error = None
+            while winner is None:
+                if done:
+                    for task in done:
+                        if task.exception() is None:
+                            if winner is None:
+                                winner = task
+                        else:
+                            error = error or task.exception()
+                    if winner is not None or not pending:
+                        break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            if winner is None:
+                raise error
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.exception() is None:
+                    # answered at the same moment as the winner
+                    await task.result()[0].close()
+
+        stream, context, first_chunk, dispatched_at, first_chunk_at = winner.result()
+        self._observe_ttft(model, first_chunk, dispatched_at, first_chunk_at)
+        self._record(model, started_at, hedged=len(tasks) > 1, hedge_won=winner is not primary)
+        return AsyncHedgedStream(stream, first_chunk), context
+
+    @staticmethod
+    def _observe_ttft(
+        model: str, first_chunk: Any, dispatched_at: Optional[float], first_chunk_at: Optional[float]
+    ) -> None:
+        """Record the winner's time from its last dispatch to first chunk, which the deadline is drawn from"""
+        if first_chunk is _END or dispatched_at is None or first_chunk_at is None:
+            return
+        get_telemetry().observe(TTFT_METRIC, first_chunk_at - dispatched_at, model=model)
+
+    def _hedge(self, model: str, ready: Optional[Callable[[], bool]]) -> bool:
+        """
+        Whether to hedge a late first chunk: not while the hedge would only
+        queue behind throttled routes, and only if the budget allows it
+        """
+        if ready is not None and not ready():
+            return False
+        if self.budget.try_spend():
+            get_telemetry().increment("prosepilot_hedges_total", model=model, outcome="fired")
+            return True
+        with self._lock:
+            self.denied += 1
+        get_telemetry().increment("prosepilot_hedges_total", model=model, outcome="denied")
+        return False
+
+    def _record(self, model: str, started_at: float, hedged: bool, hedge_won: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if not hedged:
+                return
+            self.fired += 1
+
+        if not hedge_won:
+            # the original answered first; the hedge only cost a request
+            get_telemetry().increment("prosepilot_hedges_total", model=model, outcome="lost")
+            return
+
+        waited = time.perf_counter() - started_at
+        saved = self._estimate_saved(model, waited)
+        with self._lock:
+            self.hedge_wins += 1
+            self.saved_seconds += saved
+        telemetry = get_telemetry()
+        telemetry.increment("prosepilot_hedges_total", model=model, outcome="won")
+        telemetry.increment("prosepilot_hedge_saved_seconds_total", saved, model=model)
+
+    @staticmethod
+    def _estimate_saved(model: str, waited: float) -> float:
+        """
+        The cancelled request had not answered after `waited` seconds, so its
+        own time to first token is estimated as the mean of the recent ones
+        that took longer than that. Without any, nothing is claimed.
+        """
+        slower = [value for value in get_telemetry().recent_values(TTFT_METRIC, model=model) if value > waited]
+        return sum(slower) / len(slower) - waited if slower else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.fired,
+                "hedge_wins": self.hedge_wins,
+                "denied": self.denied,
+                "estimated_saved_seconds": round(self.saved_seconds, 3),
+            }
+
+
+_hedger: Optional[Hedger] = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger() -> Hedger:
+    """Return the process-wide hedger for OpenAI completions"""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger()
+        return _hedger
@@ -0,0 +1,174 @@
+"""Shared, connection-pooled HTTP transport with timeouts, retries and latency metrics"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config.settings import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+    HTTP_RETRY_BASE_DELAY,
+    HTTP_RETRY_MAX_DELAY,
+)
+from utils.telemetry import get_telemetry
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+LATENCY_WINDOW = 200  # recent samples kept per operation for percentiles
+
+
+class HttpTransport:
+    """
+    Keep-alive requests session shared across API client instances.
+    Retries 429/5xx responses and connection failures with jittered
+    exponential backoff, and records per-operation latency.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        max_retries: int = HTTP_MAX_RETRIES,
+        pool_size: int = HTTP_POOL_SIZE,
+    ):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def post(
+        self,
+        url: str,
+        operation: str,
+        idempotent: bool = True,
+        max_retries: Optional[int] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        POST with retries. Non-idempotent calls (e.g. mutations) are only
+        retried when the server certainly did not process them: 429s and
+        connect failures. max_retries=0 leaves retrying to the caller.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        max_retries = self.max_retries if max_retries is None else max_retries
+        started_at = time.perf_counter()
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # A connect timeout means the request never reached the server
+                safe_to_retry = idempotent or isinstance(e, requests.ConnectTimeout)
+                if safe_to_retry and attempt < max_retries:
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+                self._record(operation, started_at, attempt, error=type(e).__name__)
+                raise
+            except requests.RequestException as e:
+                self._record(operation, started_at, attempt, error=type(e).__name__)
+                raise
+
+            retryable = response.status_code in RETRYABLE_STATUS_CODES and (
+                idempotent or response.status_code == 429
+            )
+            if retryable and attempt < max_retries:
+                self._sleep_before_retry(attempt, response.headers.get("Retry-After"))
+                attempt += 1
+                continue
+
+            error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+            self._record(operation, started_at, attempt, error=error)
+            return response
+
+    def _sleep_before_retry(self, attempt: int, retry_after: Optional[str] = None) -> None:
+        """Back off exponentially with full jitter, honouring Retry-After when given"""
+        delay = min(HTTP_RETRY_MAX_DELAY, HTTP_RETRY_BASE_DELAY * (2 ** attempt))
+        delay = random.uniform(0, delay)
+
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), HTTP_RETRY_MAX_DELAY))
+            except ValueError:
+                pass  # HTTP-date form; fall back to our own backoff
+
+        time.sleep(delay)
+
+    def _record(self, operation: str, started_at: float, retries: int, error: Optional[str]) -> None:
+        """Record latency, retry and error counts for an operation"""
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        telemetry = get_telemetry()
+        telemetry.observe(
+            "prosepilot_hashnode_request_seconds", elapsed_ms / 1000,
+            operation=operation, status="error" if error else "ok",
+        )
+        if error:
+            telemetry.increment("prosepilot_errors_total", component="hashnode", error=error)
+
+        with self._lock:
+            metrics = self._metrics.setdefault(
+                operation,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "retries": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "recent_ms": deque(maxlen=LATENCY_WINDOW),
+                },
+            )
+            metrics["calls"] += 1
+            metrics["retries"] += retries
+            metrics["errors"] += 1 if error else 0
+            metrics["total_ms"] += elapsed_ms
+            metrics["max_ms"] = max(metrics["max_ms"], elapsed_ms)
+            metrics["recent_ms"].append(elapsed_ms)
+            metrics["last_error"] = error or metrics.get("last_error")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-operation call counts and latency percentiles in milliseconds"""
+        with self._lock:
+            snapshot = {
+                operation: (dict(metrics), sorted(metrics["recent_ms"]))
+                for operation, metrics in self._metrics.items()
+            }
+
+        stats = {}
+        for operation, (metrics, recent) in snapshot.items():
+            stats[operation] = {
+                "calls": metrics["calls"],
+                "errors": metrics["errors"],
+                "retries": metrics["retries"],
+                "avg_ms": round(metrics["total_ms"] / metrics["calls"], 1),
+                "p50_ms": round(recent[len(recent) // 2], 1),
+                "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1),
+                "max_ms": round(metrics["max_ms"], 1),
+                "last_error": metrics.get("last_error"),
+            }
+        return stats
+
+
+_hashnode_transport: Optional[HttpTransport] = None
+_hashnode_transport_lock = threading.Lock()
+
+
+def get_hashnode_transport() -> HttpTransport:
+    """Return the process-wide transport shared by every HashnodeClient"""
+    global _hashnode_transport
+
+    with _hashnode_transport_lock:
+        if _hashnode_transport is None:
+            _hashnode_transport = HttpTransport()
+        return _hashnode_transport
@@ -1,8 +1,29 @@
-from typing import Any, Dict
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 import openai
-import streamlit as st
-from config.settings import OPENAI_API_KEY
-from knowledge.rag_system import RAGSystem
+from api.content_features import (
+    ContentFeatures,
+    IncrementalContentAnalyzer,
+    extract_features,
+)
+from api.prompt_compiler import PromptCompiler, get_prompt_cache_stats
+from api.hedging import get_hedger
+from api.provider_pool import get_provider_pool
+from api.word_limit import WordLimitGuard
+from config.settings import (
+    CACHE_ENABLED,
+    DEFAULT_MAX_TOKENS,
+    OPENAI_API_KEY,
+    OPENAI_TIMEOUT_SECONDS,
+    SINGLE_FLIGHT_ENABLED,
+)
+from knowledge.rag_system import RAGSystem, get_rag_system
+from models.content import GenerationMetrics
+from utils.masking import api_key_fingerprint
+from utils.response_cache import ResponseCache, get_response_cache, make_cache_key
+from utils.single_flight import get_single_flight
+from utils.telemetry import get_telemetry, timed
+from utils.token_budget import completion_token_budget, estimate_message_tokens
 
 
 class OpenAIClient:
@@ -49,87 +70,462 @@ class OpenAIClient:
 
 
 class EnhancedOpenAIClient:
-    def __init__(self, api_key=None):
+    def __init__(
+        self,
+        api_key=None,
+        response_cache: Optional[ResponseCache] = None,
+        rag_system: Optional[RAGSystem] = None,
+    ):
         self.api_key = api_key or OPENAI_API_KEY
-        self.rag_system = RAGSystem()
+        # the knowledge base is static, so every client shares one RAG system
+        self.rag_system = rag_system or get_rag_system()
+        self.response_cache = response_cache or (
+            get_response_cache() if CACHE_ENABLED else None
+        )
+        self.prompt_compiler = PromptCompiler(self.rag_system)
+        self.last_metrics: Optional[GenerationMetrics] = None
+        self._async_clients: Dict[str, openai.AsyncOpenAI] = {}  # per pooled key
+
+    def _build_messages(
+        self, prompt, content_type, tone, max_length
+    ) -> List[Dict[str, str]]:
+        """build the RAG-enhanced chat messages for a generation request"""
+        # stable guidelines first, request variables last, so prompts share a cacheable prefix
+        return self.prompt_compiler.compile(prompt, content_type, tone, max_length)
+
+    @staticmethod
+    def _apply_budget(metrics: GenerationMetrics, messages, max_length) -> None:
+        """size max_tokens to the word limit and estimate the prompt locally"""
+        metrics.max_tokens = completion_token_budget(max_length)
+        metrics.estimated_prompt_tokens = estimate_message_tokens(messages)
+
+    def _cache_key(self, messages, model, temperature) -> str:
+        """key a generation on the full RAG-enhanced request"""
+        return make_cache_key(
+            {"model": model, "temperature": temperature, "messages": messages}
+        )
+
+    def _key_scope(self) -> str:
+        """
+        who a stored generation belongs to: the deployment's pooled keys
+        share one scope, a key a user brings gets its own
+        """
+        if self.api_key in get_provider_pool().pooled_keys:
+            return "deployment"
+        return api_key_fingerprint(self.api_key)
+
+    def _scoped_key(self, cache_key) -> str:
+        """the cache key of a request, as stored for this client's key"""
+        return make_cache_key({"scope": self._key_scope(), "key": cache_key})
+
+    def _get_cached(self, cache_key, use_cache) -> Optional[str]:
+        """look up a previous generation for this exact request and key"""
+        if not use_cache or self.response_cache is None:
+            return None
+        return self.response_cache.get(self._scoped_key(cache_key))
+
+    def _store_cached(self, cache_key, content) -> None:
+        """remember a successful generation for identical future requests with the same key"""
+        if self.response_cache is not None and content:
+            self.response_cache.set(self._scoped_key(cache_key), content)
 
     def generate_content(
-        self, prompt, content_type, tone, max_length, model, temperature
+        self, prompt, content_type, tone, max_length, model, temperature,
+        use_cache=True
     ):
         """generate content using RAG-enhanced prompting"""
         if not self.api_key:
             return "please enter your OpenAI API key in the sidebar."
 
+        metrics = GenerationMetrics(model=model)
+        self.last_metrics = metrics
+        started_at = time.perf_counter()
+
         try:
-            openai.api_key = self.api_key
+            messages = self._build_messages(
+                prompt, content_type, tone, max_length)
+            cache_key = self._cache_key(messages, model, temperature)
+            self._apply_budget(metrics, messages, max_length)
 
-            # get RAG context
-            rag_context = self.rag_system.build_context_prompt(
-                content_type, tone, prompt
-            )
+            cached = self._get_cached(cache_key, use_cache)
+            if cached is not None:
+                metrics.cache_hit = True
+                return cached
 
-            # build enhanced system message with RAG context
-            enhanced_system_message = f"""
-                CRITICAL REQUIREMENT: The content MUST NOT exceed {max_length} words. This is a hard limit.
+            # streamed upstream so a runaway output can be cut off at the word limit
+            return "".join(self._shared_deltas(
+                cache_key, messages, model, temperature, max_length, metrics))
 
-                You are an expert content creator with access to professional writing guidelines.
+        except Exception as e:
+            return f"Error generating content: {str(e)}"
+        finally:
+            metrics.total_duration = time.perf_counter() - started_at
+
+    def stream_content(
+        self, prompt, content_type, tone, max_length, model, temperature,
+        use_cache=True
+    ) -> Iterator[str]:
+        """stream RAG-enhanced content, yielding text deltas as they arrive"""
+        if not self.api_key:
+            yield "please enter your OpenAI API key in the sidebar."
+            return
 
-                WRITING GUIDELINES AND CONTEXT:
-                {rag_context}
+        metrics = GenerationMetrics(model=model, streamed=True)
+        self.last_metrics = metrics
+        started_at = time.perf_counter()
 
-                TASK: Create a {content_type} with a {tone.lower()} tone about: {prompt}
+        try:
+            messages = self._build_messages(
+                prompt, content_type, tone, max_length)
+            cache_key = self._cache_key(messages, model, temperature)
+            self._apply_budget(metrics, messages, max_length)
+
+            cached = self._get_cached(cache_key, use_cache)
+            if cached is not None:
+                metrics.cache_hit = True
+                metrics.time_to_first_token = time.perf_counter() - started_at
+                metrics.chunk_count = 1
+                yield cached
+                return
+
+            for delta in self._shared_deltas(
+                cache_key, messages, model, temperature, max_length, metrics
+            ):
+                # time-to-first-token is what the user perceives as latency
+                if metrics.time_to_first_token is None:
+                    metrics.time_to_first_token = time.perf_counter() - started_at
+
+                metrics.chunk_count += 1
+                yield delta
 
-                REQUIREMENTS:
-                - Keep the content under {max_length} words
-                - Format the content in Markdown
-                - Follow the structure and best practices provided above
-                - Incorporate SEO optimization naturally
-                - Ensure the tone matches the specified characteristics
-                - Make it engaging and valuable for readers
-                - Optimize for Hashnode platform
+        except Exception as e:
+            yield f"Error generating content: {str(e)}"
+        finally:
+            metrics.total_duration = time.perf_counter() - started_at
+
+    def _shared_deltas(
+        self, cache_key, messages, model, temperature, max_length, metrics: GenerationMetrics
+    ) -> Iterator[str]:
+        """
+        the completion deltas, shared with an identical request already in flight
+        with the same key scope; only the request that starts the completion
+        records and caches it
+        """
+        if not SINGLE_FLIGHT_ENABLED:
+            return self._completion_deltas(cache_key, messages, model, temperature, max_length, metrics)
+        return get_single_flight("openai.generate").stream(
+            (self._key_scope(), cache_key),
+            lambda: self._completion_deltas(cache_key, messages, model, temperature, max_length, metrics),
+            on_join=lambda: setattr(metrics, "coalesced", True),
+        )
 
-                Focus on creating high-quality, professional content that follows industry best practices.
+    @staticmethod
+    def _completion_request(messages, model, temperature, metrics: GenerationMetrics) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": metrics.max_tokens,
+            "stream": True,
+            # the final chunk then carries token usage (with no choices)
+            "stream_options": {"include_usage": True},
+        }
 
-                Remember: This is a TEXT-ONLY content generation. No images, no image sources, no visual references.
-            """
+    @staticmethod
+    def _routed(metrics: GenerationMetrics, route) -> None:
+        if route.model != metrics.model:
+            metrics.fallback_model = route.model
+
+    @staticmethod
+    def _pool_tokens(metrics: GenerationMetrics) -> int:
+        """tokens a call counts against the limits: the prompt plus the whole completion budget"""
+        return (metrics.estimated_prompt_tokens or 0) + (metrics.max_tokens or DEFAULT_MAX_TOKENS)
+
+    def _open_stream(self, messages, model, temperature, metrics: GenerationMetrics):
+        """
+        start a streamed completion on the pool's best key, failing over to
+        another key or model, and hedged if its first chunk is late
+        """
+        pool = get_provider_pool()
+        tokens = self._pool_tokens(metrics)
+
+        def start(dispatched):
+            raw, route = pool.call(
+                self.api_key, model, tokens,
+                lambda api_key, served_model: pool.client(api_key).chat.completions.with_raw_response.create(
+                    **self._completion_request(messages, served_model, temperature, metrics)),
+                on_dispatch=dispatched,
+            )
+            return raw.parse(), route
+
+        stream, route = get_hedger().open(
+            start, model, ready=lambda: pool.wait_time(self.api_key, model, tokens) <= 0)
+        self._routed(metrics, route)
+        return stream
+
+    def _completion_deltas(
+        self, cache_key, messages, model, temperature, max_length, metrics: GenerationMetrics
+    ) -> Iterator[str]:
+        """
+        stream a completion through the word limit guard, closing the upstream
+        request once the output runs past the limit plus its grace margin
+        """
+        telemetry = get_telemetry()
+        started_at = time.perf_counter()
+        first_token_seen = False
 
-            full_prompt = f"Create a {content_type} about: {prompt}"
+        try:
+            stream = self._open_stream(messages, model, temperature, metrics)
+
+            guard = WordLimitGuard(max_length) if max_length else None
+            chunks = []
+            usage = None
+
+            try:
+                for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+
+                    released = guard.feed(delta) if guard else delta
+                    if released:
+                        if not first_token_seen:
+                            first_token_seen = True
+                            telemetry.observe(
+                                "prosepilot_generation_ttft_seconds",
+                                time.perf_counter() - started_at, model=model)
+                        chunks.append(released)
+                        yield released
+
+                    if guard and guard.exceeded:
+                        break
+
+                tail = guard.finish() if guard else ""
+                if tail:
+                    chunks.append(tail)
+                    yield tail
+            finally:
+                # stops token generation (and billing) for an abandoned or cut-off stream
+                stream.close()
+        except Exception as e:
+            telemetry.record_error("openai", e)
+            telemetry.observe(
+                "prosepilot_generation_seconds", time.perf_counter() - started_at,
+                model=model, status="error")
+            raise
+
+        metrics.truncated = bool(guard and guard.truncated)
+        self._record_completion(cache_key, metrics, usage, "".join(chunks), started_at)
+
+    def _record_completion(self, cache_key, metrics: GenerationMetrics, usage, content, started_at) -> None:
+        """record token usage, prompt cache hits, cost and latency for a finished completion, and cache it"""
+        metrics.record_usage(usage, content)
+        self._record_prompt_cache(usage)
+        # a fallback model's answer is not what the request asked for; don't serve it again
+        if not metrics.fallback_model:
+            self._store_cached(cache_key, content)
+
+        # a stream cut off at the word limit has no usage report; fall back to estimates
+        telemetry = get_telemetry()
+        telemetry.observe(
+            "prosepilot_generation_seconds", time.perf_counter() - started_at,
+            model=metrics.model, status="ok")
+        telemetry.record_usage(
+            metrics.fallback_model or metrics.model,
+            prompt_tokens=metrics.prompt_tokens or metrics.estimated_prompt_tokens or 0,
+            completion_tokens=metrics.completion_tokens or metrics.estimated_completion_tokens or 0,
+            cached_tokens=metrics.cached_prompt_tokens or 0,
+        )
 
-            response = openai.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": enhanced_system_message},
-                    {"role": "user", "content": full_prompt},
-                ],
-                temperature=temperature,
+    @staticmethod
+    def _record_prompt_cache(usage) -> None:
+        """count how many prompt tokens the provider served from its prefix cache"""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        get_prompt_cache_stats().record(
+            usage.prompt_tokens, getattr(details, "cached_tokens", None) or 0)
+
+    async def agenerate_content(
+        self, prompt, content_type, tone, max_length, model, temperature,
+        use_cache=True, metrics: Optional[GenerationMetrics] = None
+    ) -> str:
+        """generate content asynchronously; API errors propagate so callers can retry"""
+        chunks = []
+        async for delta in self.astream_content(
+            prompt, content_type, tone, max_length, model, temperature,
+            use_cache=use_cache, metrics=metrics,
+        ):
+            chunks.append(delta)
+        return "".join(chunks)
+
+    async def astream_content(
+        self, prompt, content_type, tone, max_length, model, temperature,
+        use_cache=True, metrics: Optional[GenerationMetrics] = None
+    ) -> AsyncIterator[str]:
+        """stream content asynchronously, yielding text deltas; API errors propagate"""
+        # per call, since concurrent requests share this client
+        metrics = metrics or GenerationMetrics(model=model, streamed=True)
+        started_at = time.perf_counter()
+
+        try:
+            messages = self._build_messages(
+                prompt, content_type, tone, max_length)
+            cache_key = self._cache_key(messages, model, temperature)
+            self._apply_budget(metrics, messages, max_length)
+
+            cached = self._get_cached(cache_key, use_cache)
+            if cached is not None:
+                metrics.cache_hit = True
+                metrics.time_to_first_token = time.perf_counter() - started_at
+                metrics.chunk_count = 1
+                yield cached
+                return
+
+            async for delta in self._ashared_deltas(
+                cache_key, messages, model, temperature, max_length, metrics
+            ):
+                if metrics.time_to_first_token is None:
+                    metrics.time_to_first_token = time.perf_counter() - started_at
+
+                metrics.chunk_count += 1
+                yield delta
+        finally:
+            metrics.total_duration = time.perf_counter() - started_at
+
+    def _ashared_deltas(
+        self, cache_key, messages, model, temperature, max_length, metrics: GenerationMetrics
+    ) -> AsyncIterator[str]:
+        """async counterpart of _shared_deltas"""
+        if not SINGLE_FLIGHT_ENABLED:
+            return self._acompletion_deltas(cache_key, messages, model, temperature, max_length, metrics)
+        return get_single_flight("openai.generate").astream(
+            (self._key_scope(), cache_key),
+            lambda: self._acompletion_deltas(cache_key, messages, model, temperature, max_length, metrics),
+            on_join=lambda: setattr(metrics, "coalesced", True),
+        )
+
+    def _async_client(self, api_key) -> openai.AsyncOpenAI:
+        client = self._async_clients.get(api_key)
+        if client is None:
+            base_url = openai.base_url and str(openai.base_url)
+            client = self._async_clients[api_key] = openai.AsyncOpenAI(
+                api_key=api_key, base_url=base_url, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+        return client
+
+    async def _aopen_stream(self, messages, model, temperature, metrics: GenerationMetrics):
+        """async counterpart of _open_stream"""
+        pool = get_provider_pool()
+        tokens = self._pool_tokens(metrics)
+
+        async def start(dispatched):
+            raw, route = await pool.acall(
+                self.api_key, model, tokens,
+                lambda api_key, served_model: self._async_client(api_key).chat.completions.with_raw_response.create(
+                    **self._completion_request(messages, served_model, temperature, metrics)),
+                on_dispatch=dispatched,
             )
+            return raw.parse(), route
 
-            return response.choices[0].message.content
+        stream, route = await get_hedger().aopen(
+            start, model, ready=lambda: pool.wait_time(self.api_key, model, tokens) <= 0)
+        self._routed(metrics, route)
+        return stream
+
+    async def _acompletion_deltas(
+        self, cache_key, messages, model, temperature, max_length, metrics: GenerationMetrics
+    ) -> AsyncIterator[str]:
+        """async counterpart of _completion_deltas"""
+        telemetry = get_telemetry()
+        started_at = time.perf_counter()
+        first_token_seen = False
 
+        try:
+            stream = await self._aopen_stream(messages, model, temperature, metrics)
+
+            guard = WordLimitGuard(max_length) if max_length else None
+            chunks = []
+            usage = None
+
+            try:
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+
+                    released = guard.feed(delta) if guard else delta
+                    if released:
+                        if not first_token_seen:
+                            first_token_seen = True
+                            telemetry.observe(
+                                "prosepilot_generation_ttft_seconds",
+                                time.perf_counter() - started_at, model=model)
+                        chunks.append(released)
+                        yield released
+
+                    if guard and guard.exceeded:
+                        break
+
+                tail = guard.finish() if guard else ""
+                if tail:
+                    chunks.append(tail)
+                    yield tail
+            finally:
+                # also runs when the consumer goes away mid-stream
+                await stream.close()
         except Exception as e:
-            return f"Error generating content: {str(e)}"
+            telemetry.record_error("openai", e)
+            telemetry.observe(
+                "prosepilot_generation_seconds", time.perf_counter() - started_at,
+                model=model, status="error")
+            raise
+
+        metrics.truncated = bool(guard and guard.truncated)
+        self._record_completion(cache_key, metrics, usage, "".join(chunks), started_at)
+
+    async def aclose(self) -> None:
+        """close the async HTTP clients, if any were created"""
+        for client in self._async_clients.values():
+            await client.close()
+        self._async_clients.clear()
 
     def get_content_analysis(self, content: str, content_type: str) -> Dict[str, Any]:
         """Analyze generated content against RAG guidelines"""
-        guidelines = self.rag_system.retrieve_content_guidelines(
-            content_type, "Professional"
-        )
-
+        # Tokenize once; every check reads from the shared feature record
+        return self.analyze_features(extract_features(content), content_type)
+
+    def create_incremental_analyzer(
+        self, content_type: str, max_length: Optional[int] = None
+    ) -> IncrementalContentAnalyzer:
+        """Create an analyzer that scores content while it streams in"""
+        return IncrementalContentAnalyzer(
+            content_type, self.analyze_features, max_length)
+
+    @timed("prosepilot_analysis_seconds", "analysis")
+    def analyze_features(self, features: ContentFeatures, content_type: str) -> Dict[str, Any]:
+        """Score an extracted feature record"""
         # Perform comprehensive analysis
-        structure_analysis = self._analyze_structure(content, content_type)
-        seo_analysis = self._analyze_seo_elements(content)
-        readability_analysis = self._analyze_readability(content)
+        structure_analysis = self._analyze_structure(features, content_type)
+        seo_analysis = self._analyze_seo_elements(features)
+        readability_analysis = self._analyze_readability(features)
 
         analysis = {
-            "word_count": len(content.split()),
-            "character_count": len(content),
+            "word_count": features.word_count,
+            "character_count": features.character_count,
             "structure_score": structure_analysis["score"],
             "structure_details": structure_analysis["details"],
             "seo_score": seo_analysis["score"],
             "seo_details": seo_analysis["details"],
             "readability_score": readability_analysis["score"],
             "readability_details": readability_analysis["details"],
-            "hashnode_ready": self._check_hashnode_formatting(content),
+            "hashnode_ready": self._check_hashnode_formatting(features),
             "overall_quality": self._calculate_overall_quality(
                 structure_analysis, seo_analysis, readability_analysis
             ),
@@ -137,68 +533,53 @@ class EnhancedOpenAIClient:
 
         return analysis
 
-    def _analyze_structure(self, content: str, content_type: str) -> Dict[str, Any]:
+    def _analyze_structure(self, features: ContentFeatures, content_type: str) -> Dict[str, Any]:
         """Detailed structure analysis"""
-        headers = content.count("#")
-        lines = content.split("\n")
-        non_empty_lines = [line.strip() for line in lines if line.strip()]
-
         structure_checks = {
-            "Blog Post": self._check_blog_post_structure(
-                content, headers, non_empty_lines
-            ),
-            "Technical Article": self._check_technical_article_structure(
-                content, headers, non_empty_lines
-            ),
-            "Tutorial": self._check_tutorial_structure(
-                content, headers, non_empty_lines
-            ),
-            "Opinion Piece": self._check_opinion_piece_structure(
-                content, headers, non_empty_lines
-            ),
+            "Blog Post": self._check_blog_post_structure,
+            "Technical Article": self._check_technical_article_structure,
+            "Tutorial": self._check_tutorial_structure,
+            "Opinion Piece": self._check_opinion_piece_structure,
         }
 
-        # Get the check result for this content type
-        structure_pass = structure_checks.get(
-            content_type,
-            self._check_default_structure(content, headers, non_empty_lines),
-        )
+        # Only run the check for this content type
+        check = structure_checks.get(content_type, self._check_default_structure)
+        structure_pass = check(features)
 
         return {
             "score": 85 if structure_pass else 60,
             "details": {
-                "has_proper_headers": headers >= 2,
-                "appropriate_length": len(non_empty_lines) >= 8,
+                "has_proper_headers": features.hash_count >= 2,
+                "appropriate_length": features.line_count >= 8,
                 "content_type_structure": structure_pass,
-                "header_count": headers,
-                "paragraph_count": len(non_empty_lines),
+                "header_count": features.hash_count,
+                "paragraph_count": features.line_count,
             },
         }
 
-    def _analyze_seo_elements(self, content: str) -> Dict[str, Any]:
+    def _analyze_seo_elements(self, features: ContentFeatures) -> Dict[str, Any]:
         """Analyze SEO optimization elements"""
         seo_checks = {
-            "has_headers": "#" in content,
-            "has_links": "[" in content and "]" in content,
-            "has_bold_text": "**" in content,
-            "has_lists": any(marker in content for marker in ["-", "*", "1.", "2."]),
-            "good_length": 300 <= len(content.split()) <= 2000,
-            "has_code_blocks": "```" in content,
+            "has_headers": features.hash_count > 0,
+            "has_links": features.has_marker("[") and features.has_marker("]"),
+            "has_bold_text": features.has_marker("**"),
+            "has_lists": features.has_marker("-", "*", "1.", "2."),
+            "good_length": 300 <= features.word_count <= 2000,
+            "has_code_blocks": features.has_marker("```"),
         }
 
         score = (sum(seo_checks.values()) / len(seo_checks)) * 100
 
         return {"score": int(score), "details": seo_checks}
 
-    def _analyze_readability(self, content: str) -> Dict[str, Any]:
+    def _analyze_readability(self, features: ContentFeatures) -> Dict[str, Any]:
         """Analyze content readability"""
-        words = content.split()
-        sentences = content.count(".") + content.count("!") + content.count("?")
+        sentences = features.sentence_count
 
         if sentences == 0:
             sentences = 1  # Avoid division by zero
 
-        avg_words_per_sentence = len(words) / sentences
+        avg_words_per_sentence = features.word_count / sentences
 
         readability_checks = {
             "appropriate_sentence_length": 10 <= avg_words_per_sentence <= 20,
@@ -235,163 +616,129 @@ class EnhancedOpenAIClient:
 
     def _check_structure(self, content: str, content_type: str) -> bool:
         """Check if content follows recommended structure for the specific content type"""
-
-        # Count headers and sections
-        headers = content.count("#")
-        lines = content.split("\n")
-        non_empty_lines = [line.strip() for line in lines if line.strip()]
+        features = extract_features(content)
 
         # Content type specific structure checks
         if content_type.lower() == "blog post":
-            return self._check_blog_post_structure(content, headers, non_empty_lines)
+            return self._check_blog_post_structure(features)
 
         elif content_type.lower() == "technical article":
-            return self._check_technical_article_structure(
-                content, headers, non_empty_lines
-            )
+            return self._check_technical_article_structure(features)
 
         elif content_type.lower() == "tutorial":
-            return self._check_tutorial_structure(content, headers, non_empty_lines)
+            return self._check_tutorial_structure(features)
 
         elif content_type.lower() == "opinion piece":
-            return self._check_opinion_piece_structure(
-                content, headers, non_empty_lines
-            )
+            return self._check_opinion_piece_structure(features)
 
         else:
             # Default structure check for custom content types
-            return self._check_default_structure(content, headers, non_empty_lines)
+            return self._check_default_structure(features)
 
-    def _check_blog_post_structure(
-        self, content: str, headers: int, lines: list
-    ) -> bool:
+    def _check_blog_post_structure(self, features: ContentFeatures) -> bool:
         """Check blog post specific structure"""
+        headers = features.hash_count
+        lines = features.line_count
 
         checks = {
             "has_title": headers >= 1,  # At least one main title
             "has_sections": headers >= 3,  # Multiple sections
-            "good_length": len(lines) >= 10,  # Reasonable content length
+            "good_length": lines >= 10,  # Reasonable content length
             "has_conclusion": any(
                 "conclusion" in line.lower() or "summary" in line.lower()
-                for line in lines[-5:]
+                for line in features.tail_lines
             ),  # Check last 5 lines for conclusion
             # Has some introductory content
-            "has_introduction": len(lines) >= 3,
+            "has_introduction": lines >= 3,
         }
 
         # Blog post passes if it meets most criteria
         return sum(checks.values()) >= 3
 
-    def _check_technical_article_structure(
-        self, content: str, headers: int, lines: list
-    ) -> bool:
+    def _check_technical_article_structure(self, features: ContentFeatures) -> bool:
         """Check technical article specific structure"""
         checks = {
-            "has_sections": headers >= 4,  # Technical articles need more sections
-            "has_code_blocks": "```" in content,  # Should have code examples
-            "has_problem_statement": any(
-                keyword in content.lower()
-                for keyword in ["problem", "challenge", "issue", "solution"]
+            "has_sections": features.hash_count >= 4,  # Technical articles need more sections
+            "has_code_blocks": features.has_marker("```"),  # Should have code examples
+            "has_problem_statement": features.has_any(
+                ["problem", "challenge", "issue", "solution"]
             ),
-            "has_implementation": any(
-                keyword in content.lower()
-                for keyword in ["implementation", "code", "example", "setup"]
+            "has_implementation": features.has_any(
+                ["implementation", "code", "example", "setup"]
             ),
             # Technical content is usually longer
-            "good_technical_length": len(lines) >= 15,
+            "good_technical_length": features.line_count >= 15,
             # Links or references
-            "has_references": "[" in content and "]" in content,
+            "has_references": features.has_marker("[") and features.has_marker("]"),
         }
 
         return sum(checks.values()) >= 4
 
-    def _check_tutorial_structure(
-        self, content: str, headers: int, lines: list
-    ) -> bool:
+    def _check_tutorial_structure(self, features: ContentFeatures) -> bool:
         """Check tutorial specific structure"""
 
         checks = {
-            "has_steps": headers >= 3,  # Multiple steps/sections
-            "has_numbered_items": any(
-                line.strip().startswith(("1.", "2.", "3.")) for line in lines
-            ),  # Numbered steps
-            "has_prerequisites": any(
-                keyword in content.lower()
-                for keyword in ["prerequisite", "requirement", "need", "install"]
+            "has_steps": features.hash_count >= 3,  # Multiple steps/sections
+            "has_numbered_items": features.has_numbered_steps,  # Numbered steps
+            "has_prerequisites": features.has_any(
+                ["prerequisite", "requirement", "need", "install"]
             ),
-            "has_examples": "```" in content or "example" in content.lower(),
-            "step_by_step": any(
-                keyword in content.lower()
-                for keyword in ["step", "first", "next", "then", "finally"]
+            "has_examples": features.has_marker("```") or features.has_any(["example"]),
+            "step_by_step": features.has_any(
+                ["step", "first", "next", "then", "finally"]
             ),
-            "has_outcome": any(
-                keyword in content.lower()
-                for keyword in ["result", "output", "complete", "finish"]
+            "has_outcome": features.has_any(
+                ["result", "output", "complete", "finish"]
             ),
         }
 
         return sum(checks.values()) >= 4
 
-    def _check_opinion_piece_structure(
-        self, content: str, headers: int, lines: list
-    ) -> bool:
+    def _check_opinion_piece_structure(self, features: ContentFeatures) -> bool:
         """Check opinion piece specific structure"""
 
         checks = {
-            "has_clear_position": any(
-                keyword in content.lower()
-                for keyword in ["believe", "think", "opinion", "argue", "position"]
+            "has_clear_position": features.has_any(
+                ["believe", "think", "opinion", "argue", "position"]
             ),
-            "has_supporting_evidence": any(
-                keyword in content.lower()
-                for keyword in ["because", "evidence", "research", "study", "data"]
+            "has_supporting_evidence": features.has_any(
+                ["because", "evidence", "research", "study", "data"]
             ),
-            "addresses_counterarguments": any(
-                keyword in content.lower()
-                for keyword in ["however", "although", "critics", "opposing", "counter"]
+            "addresses_counterarguments": features.has_any(
+                ["however", "although", "critics", "opposing", "counter"]
             ),
-            "has_personal_insight": any(
-                keyword in content.lower()
-                for keyword in ["experience", "personally", "i have", "my"]
+            "has_personal_insight": features.has_any(
+                ["experience", "personally", "i have", "my"]
             ),
-            "has_call_to_action": any(
-                keyword in content.lower()
-                for keyword in ["should", "must", "need to", "call", "action"]
+            "has_call_to_action": features.has_any(
+                ["should", "must", "need to", "call", "action"]
             ),
-            "reasonable_structure": headers >= 2,
+            "reasonable_structure": features.hash_count >= 2,
         }
 
         return sum(checks.values()) >= 4
 
-    def _check_default_structure(self, content: str, headers: int, lines: list) -> bool:
+    def _check_default_structure(self, features: ContentFeatures) -> bool:
         """Default structure check for custom content types"""
 
         checks = {
-            "has_headers": headers >= 2,
-            "reasonable_length": len(lines) >= 8,
-            "has_paragraphs": len(
-                [line for line in lines if not line.startswith("#") and len(line) > 50]
-            )
-            >= 3,
-            "good_formatting": any(
-                marker in content for marker in ["**", "*", "-", "1."]
-            ),
+            "has_headers": features.hash_count >= 2,
+            "reasonable_length": features.line_count >= 8,
+            "has_paragraphs": features.long_paragraph_count >= 3,
+            "good_formatting": features.has_marker("**", "*", "-", "1."),
         }
 
         return sum(checks.values()) >= 3
 
-    def _check_seo_elements(self, content: str) -> bool:
+    def _check_seo_elements(self, features: ContentFeatures) -> bool:
         """check for basic SEO elements"""
         # Check for headers, links, etc.
-        has_headers = "#" in content
-        has_links = "[" in content and "]" in content
-        return has_headers or has_links
+        return features.has_marker("#") or (features.has_marker("[") and features.has_marker("]"))
 
-    def _check_hashnode_formatting(self, content: str) -> bool:
+    def _check_hashnode_formatting(self, features: ContentFeatures) -> bool:
         """check if content is properly formatted for Hashnode"""
         # Check for markdown formatting
-        markdown_elements = ["#", "```", "**", "*", "-", "1."]
-        return any(element in content for element in markdown_elements)
+        return features.has_marker("#", "```", "**", "*", "-", "1.")
 
 
 # backward compatibility
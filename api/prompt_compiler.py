@@ -0,0 +1,143 @@
+"""Compile generation prompts with a stable, canonical prefix for provider-side prompt caching"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from knowledge.rag_system import RAGSystem
+
+# Identical for every request, so it always opens the prompt
+STABLE_INSTRUCTIONS = """
+You are an expert content creator with access to professional writing guidelines.
+
+REQUIREMENTS:
+- Format the content in Markdown
+- Follow the structure and best practices in the writing guidelines
+- Incorporate SEO optimization naturally
+- Ensure the tone matches the specified characteristics
+- Make it engaging and valuable for readers
+- Optimize for Hashnode platform
+
+Focus on creating high-quality, professional content that follows industry best practices.
+
+Remember: This is a TEXT-ONLY content generation. No images, no image sources, no visual references.
+"""
+
+
+def normalize_whitespace(text: str) -> str:
+    """Canonical form: no indentation or trailing spaces, at most one blank line in a row"""
+    lines = [line.strip() for line in text.strip().splitlines()]
+
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return "\n".join(normalized)
+
+
+class PromptCompiler:
+    """
+    Lays out the chat messages from most to least stable: the shared
+    instructions, then the guidelines for the content type and tone, then
+    topic-dependent context, and the task and word limit last. Requests
+    that share a content type and tone therefore share a byte-identical
+    prefix, which is what provider prompt caching matches on.
+    """
+
+    def __init__(self, rag_system: RAGSystem):
+        self.rag_system = rag_system
+        self._instructions = normalize_whitespace(STABLE_INSTRUCTIONS)
+        # (content_type, tone) -> (stable context, prefix), for one knowledge version
+        self._stable_prefixes: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self._prefixes_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def compile(self, prompt, content_type, tone, max_length) -> List[Dict[str, str]]:
+        """Build the chat messages for a generation request"""
+        stable_context, variable_context = self.rag_system.build_context_parts(
+            content_type, tone, prompt
+        )
+
+        parts = [self._stable_prefix(content_type, tone, stable_context)]
+        if variable_context:
+            parts.append(normalize_whitespace(variable_context))
+        parts.append(
+            f"TASK: Create a {content_type} with a {tone.lower()} tone about: {prompt}\n\n"
+            f"CRITICAL REQUIREMENT: The content MUST NOT exceed {max_length} words. "
+            "This is a hard limit. Keep the content under "
+            f"{max_length} words."
+        )
+
+        return [
+            {"role": "system", "content": "\n\n".join(parts)},
+            {"role": "user", "content": f"Create a {content_type} about: {prompt}"},
+        ]
+
+    def _stable_prefix(self, content_type: str, tone: str, stable_context: str) -> str:
+        """
+        Instructions plus normalized guidelines, normalized once per content
+        type and tone; a knowledge update drops every prefix built before it
+        """
+        key = (content_type, tone)
+        version = self.rag_system.knowledge_version
+
+        with self._lock:
+            if self._prefixes_version != version:
+                self._stable_prefixes = {}
+                self._prefixes_version = version
+            cached = self._stable_prefixes.get(key)
+
+        if cached is not None and cached[0] == stable_context:
+            return cached[1]
+
+        prefix = self._instructions
+        if stable_context:
+            prefix += "\n\nWRITING GUIDELINES AND CONTEXT:\n" + normalize_whitespace(stable_context)
+        with self._lock:
+            if self._prefixes_version == version:
+                self._stable_prefixes[key] = (stable_context, prefix)
+
+        return prefix
+
+
+class PromptCacheStats:
+    """Process-wide share of prompt tokens the provider served from its prefix cache"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.requests_with_hits = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def record(self, prompt_tokens: int, cached_tokens: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.requests_with_hits += 1 if cached_tokens else 0
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "requests_with_hits": self.requests_with_hits,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "token_hit_rate": (
+                    round(self.cached_tokens / self.prompt_tokens, 3)
+                    if self.prompt_tokens else 0.0
+                ),
+            }
+
+
+_prompt_cache_stats: Optional[PromptCacheStats] = None
+_prompt_cache_stats_lock = threading.Lock()
+
+
+def get_prompt_cache_stats() -> PromptCacheStats:
+    """Return the process-wide prompt cache statistics"""
+    global _prompt_cache_stats
+
+    with _prompt_cache_stats_lock:
+        if _prompt_cache_stats is None:
+            _prompt_cache_stats = PromptCacheStats()
+        return _prompt_cache_stats
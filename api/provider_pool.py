@@ -0,0 +1,445 @@
+"""
+Pool of OpenAI API keys and models. Each key's request and token limits per
+model are tracked in token buckets kept in sync with the x-ratelimit-*
+response headers. Every call goes to the key with the most headroom, and
+falls back to an allowed model while the requested one is throttled on
+every key.
+"""
+
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import openai
+from config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_API_KEYS,
+    OPENAI_FALLBACK_MODELS,
+    OPENAI_TIMEOUT_SECONDS,
+    POOL_ATTEMPTS_PER_ROUTE,
+    POOL_DEFAULT_COOLDOWN,
+    POOL_MAX_USER_KEYS,
+    POOL_MAX_WAIT_SECONDS,
+    POOL_RETRY_BASE_DELAY,
+)
+from utils.masking import mask_sensitive_id
+from utils.retry_budget import RetryBudget, get_retry_budget
+from utils.telemetry import get_telemetry
+
+# Failures another attempt (on this key or another) may get past
+FAILOVER_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class ProviderPoolError(Exception):
+    """No route could take the call"""
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds in an x-ratelimit-reset-* value such as "1s", "6m0s" or "20ms" """
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Local view of one provider limit. Refills continuously between responses
+    and is reset to what the provider reports whenever headers arrive. Until
+    then the limit is unknown and the bucket never holds a call back.
+    """
+
+    def __init__(self):
+        self.capacity: Optional[float] = None
+        self.tokens = 0.0
+        self.refill_rate = 0.0  # per second
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until amount fits; a call larger than the whole limit waits for a full bucket"""
+        if self.capacity is None:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_rate if self.refill_rate else math.inf
+
+    def headroom(self, amount: float, now: float) -> float:
+        """Share of the limit left after amount, 1.0 while the limit is unknown"""
+        if not self.capacity:
+            return 1.0
+        self._refill(now)
+        return (self.tokens - amount) / self.capacity
+
+    def consume(self, amount: float, now: float) -> None:
+        if self.capacity is None:
+            return
+        self._refill(now)
+        # may go into debt, which later calls then wait out
+        self.tokens = max(-self.capacity, self.tokens - amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float], reset: Optional[float], now: float) -> None:
+        """Adopt the provider's numbers; limits are per minute unless the reset says otherwise"""
+        if not limit or remaining is None:
+            return
+        self.capacity = limit
+        self.tokens = remaining
+        self.refill_rate = (limit - remaining) / reset if reset and limit > remaining else limit / 60.0
+        self.updated_at = now
+
+
+class PoolRoute:
+    """One API key serving one model, with that pair's limits"""
+
+    def __init__(self, api_key: str, model: str, label: Optional[str] = None):
+        self.api_key = api_key
+        self.model = model
+        self.label = label or mask_sensitive_id(api_key)
+        self.requests = TokenBucket()
+        self.tokens = TokenBucket()
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        self.calls = 0
+        self.throttled = 0
+
+    def time_until(self, tokens: int, now: float) -> float:
+        return max(
+            self.cooldown_until - now,
+            self.requests.time_until(1, now),
+            self.tokens.time_until(tokens, now),
+        )
+
+    def headroom(self, tokens: int, now: float) -> float:
+        return min(self.requests.headroom(1, now), self.tokens.headroom(tokens, now))
+
+    def reserve(self, tokens: int, now: float) -> None:
+        self.requests.consume(1, now)
+        self.tokens.consume(tokens, now)
+        self.last_used = now
+        self.calls += 1
+
+    def sync(self, headers, now: float) -> None:
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            bucket.sync(
+                _header_number(headers, f"x-ratelimit-limit-{kind}"),
+                _header_number(headers, f"x-ratelimit-remaining-{kind}"),
+                parse_reset(headers.get(f"x-ratelimit-reset-{kind}")),
+                now,
+            )
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        def limit(bucket: TokenBucket) -> Optional[str]:
+            if bucket.capacity is None:
+                return None
+            bucket._refill(now)
+            return f"{max(0, int(bucket.tokens))}/{int(bucket.capacity)}"
+
+        return {
+            "key": self.label,
+            "model": self.model,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "requests_left": limit(self.requests),
+            "tokens_left": limit(self.tokens),
+            "cooling_down_for": round(max(0.0, self.cooldown_until - now), 2),
+        }
+
+
+class ProviderPool:
+    """
+    Routes calls across API keys and fallback models. The deployment's own
+    keys (OPENAI_API_KEY plus OPENAI_API_KEYS) are pooled together; a key a
+    user brings is only ever used for that user's calls. Clients and limits
+    of user keys are kept for the max_user_keys most recently used only, and
+    are left out of stats and metric labels.
+    """
+
+    def __init__(
+        self,
+        api_keys: Optional[List[str]] = None,
+        fallback_models: Optional[Dict[str, List[str]]] = None,
+        max_wait: float = POOL_MAX_WAIT_SECONDS,
+        attempts_per_route: int = POOL_ATTEMPTS_PER_ROUTE,
+        budget: Optional[RetryBudget] = None,
+        max_user_keys: int = POOL_MAX_USER_KEYS,
+    ):
+        keys = [OPENAI_API_KEY, *OPENAI_API_KEYS] if api_keys is None else api_keys
+        self.pooled_keys = list(dict.fromkeys(key for key in keys if key))
+        self.fallback_models = OPENAI_FALLBACK_MODELS if fallback_models is None else fallback_models
+        self.max_wait = max_wait
+        self.attempts_per_route = attempts_per_route
+        self.max_user_keys = max_user_keys
+        # shared with hedging, so retries and hedges together stay within one budget
+        self.budget = budget or get_retry_budget("openai")
+
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], PoolRoute] = {}  # pooled keys only
+        self._clients: Dict[Tuple[str, Optional[str]], openai.OpenAI] = {}
+        # per user key: {"clients": ..., "routes": ...}, least recently used first
+        self._user_keys: "OrderedDict[str, Dict[str, Dict[Any, Any]]]" = OrderedDict()
+
+    def keys_for(self, api_key: str) -> List[str]:
+        return self.pooled_keys if api_key in self.pooled_keys else [api_key]
+
+    def models_for(self, model: str) -> List[str]:
+        return [model, *(fallback for fallback in self.fallback_models.get(model, []) if fallback != model)]
+
+    def client(self, api_key: str) -> openai.OpenAI:
+        """Shared sync client for a key; the pool does the retrying, so the SDK does not"""
+        base_url = openai.base_url and str(openai.base_url)
+        with self._lock:
+            clients = self._clients if api_key in self.pooled_keys else self._user_state(api_key)["clients"]
+            client = clients.get((api_key, base_url))
+            if client is None:
+                client = clients[(api_key, base_url)] = openai.OpenAI(
+                    api_key=api_key, base_url=base_url, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+            return client
+
+    def _user_state(self, api_key: str) -> Dict[str, Dict[Any, Any]]:
+        """Client and routes of a user key; call with the lock held"""
+        state = self._user_keys.get(api_key)
+        if state is None:
+            state = self._user_keys[api_key] = {"clients": {}, "routes": {}}
+            if len(self._user_keys) > self.max_user_keys:
+                # calls in flight keep their own references
+                self._user_keys.popitem(last=False)
+        self._user_keys.move_to_end(api_key)
+        return state
+
+    def _route(self, api_key: str, model: str) -> PoolRoute:
+        if api_key in self.pooled_keys:
+            routes, label = self._routes, None
+        else:
+            routes, label = self._user_state(api_key)["routes"], "user"
+        route = routes.get((api_key, model))
+        if route is None:
+            route = routes[(api_key, model)] = PoolRoute(api_key, model, label)
+        return route
+
+    def _next_route(
+        self, api_keys: List[str], models: List[str], tokens: int, attempts: Dict[Tuple[str, str], int]
+    ) -> Tuple[Optional[PoolRoute], Optional[float]]:
+        """
+        Reserve the route with the most headroom, preferring the requested
+        model (models[0]) as long as one of its routes frees up within
+        max_wait. Without a route ready, returns how long to wait for the
+        earliest one, or None once every route has used up its attempts.
+        """
+        now = time.monotonic()
+        earliest: Optional[float] = None
+
+        with self._lock:
+            for position, model in enumerate(models):
+                best, best_score, model_wait = None, None, None
+                for api_key in api_keys:
+                    if attempts.get((api_key, model), 0) >= self.attempts_per_route:
+                        continue
+                    route = self._route(api_key, model)
+                    wait = route.time_until(tokens, now)
+                    if wait > 0:
+                        model_wait = wait if model_wait is None else min(model_wait, wait)
+                        continue
+                    # least recently used first among equals, so unknown limits still spread out
+                    score = (route.headroom(tokens, now), -route.last_used)
+                    if best_score is None or score > best_score:
+                        best, best_score = route, score
+
+                if best is not None:
+                    best.reserve(tokens, now)
+                    attempts[(best.api_key, model)] = attempts.get((best.api_key, model), 0) + 1
+                    return best, None
+
+                if model_wait is not None:
+                    if position == 0 and model_wait <= self.max_wait:
+                        return None, model_wait
+                    earliest = model_wait if earliest is None else min(earliest, model_wait)
+
+        return None, earliest
+
+    def wait_time(self, api_key: str, model: str, tokens: int) -> float:
+        """
+        Seconds until a call for model could be sent, as _next_route would
+        choose: 0.0 when a route is free now, without reserving it.
+        """
+        now = time.monotonic()
+        earliest = math.inf
+        with self._lock:
+            for position, candidate in enumerate(self.models_for(model)):
+                wait = min(
+                    (self._route(key, candidate).time_until(tokens, now) for key in self.keys_for(api_key)),
+                    default=math.inf,
+                )
+                if wait <= 0:
+                    return 0.0
+                if position == 0 and wait <= self.max_wait:
+                    return wait
+                earliest = min(earliest, wait)
+        return earliest
+
+    def _succeeded(self, route: PoolRoute, requested_model: str, headers) -> None:
+        with self._lock:
+            route.sync(headers, time.monotonic())
+        telemetry = get_telemetry()
+        telemetry.increment("prosepilot_pool_requests_total", key=route.label, model=route.model)
+        if route.model != requested_model:
+            telemetry.increment("prosepilot_pool_fallbacks_total", requested=requested_model, served=route.model)
+
+    def _failed(self, route: PoolRoute, error: Exception) -> None:
+        get_telemetry().increment(
+            "prosepilot_pool_failures_total", key=route.label, model=route.model, error=type(error).__name__)
+        if not isinstance(error, openai.RateLimitError):
+            return
+
+        headers = error.response.headers if error.response is not None else {}
+        now = time.monotonic()
+        retry_after = _header_number(headers, "retry-after")
+        if retry_after is None:
+            resets = [parse_reset(headers.get(f"x-ratelimit-reset-{kind}")) for kind in ("requests", "tokens")]
+            retry_after = max((reset for reset in resets if reset), default=POOL_DEFAULT_COOLDOWN)
+
+        with self._lock:
+            route.sync(headers, now)
+            route.throttled += 1
+            route.cooldown_until = max(route.cooldown_until, now + retry_after)
+
+    def _retry_delay(self, error: Exception, failures: int) -> Optional[float]:
+        """
+        Seconds to back off before another attempt, or None when the retry
+        budget is spent. Throttling needs no backoff here: the throttled
+        route is already cooling down and routing avoids it.
+        """
+        if not self.budget.try_spend():
+            return None
+        if isinstance(error, openai.RateLimitError):
+            return 0.0
+        # jittered, so failed calls don't all come back at once
+        return POOL_RETRY_BASE_DELAY * (2 ** (failures - 1)) * random.uniform(0.5, 1.5)
+
+    def call(
+        self,
+        api_key: str,
+        model: str,
+        tokens: int,
+        request: Callable[[str, str], Any],
+        on_dispatch: Optional[Callable[[], None]] = None,
+    ) -> Tuple[Any, PoolRoute]:
+        """
+        Run request(api_key, model), which must return a raw response (with
+        headers), on the best route, failing over on throttling and transient
+        errors while the retry budget allows. on_dispatch is called each time
+        a request is about to be sent, after any wait for a free route.
+        Returns the response and the route that served it.
+        """
+        api_keys, models = self.keys_for(api_key), self.models_for(model)
+        attempts: Dict[Tuple[str, str], int] = {}
+        last_error: Optional[Exception] = None
+        failures = 0
+
+        while True:
+            route, wait = self._next_route(api_keys, models, tokens, attempts)
+            if route is None:
+                if wait is None or math.isinf(wait):
+                    raise last_error or ProviderPoolError(f"No API key can serve {model}")
+                time.sleep(wait)
+                continue
+            if on_dispatch is not None:
+                on_dispatch()
+            try:
+                raw = request(route.api_key, route.model)
+            except FAILOVER_ERRORS as e:
+                self._failed(route, e)
+                failures += 1
+                last_error = e
+                delay = self._retry_delay(e, failures)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            self._succeeded(route, model, raw.headers)
+            return raw, route
+
+    async def acall(
+        self,
+        api_key: str,
+        model: str,
+        tokens: int,
+        request: Callable[[str, str], Awaitable[Any]],
+        on_dispatch: Optional[Callable[[], None]] = None,
+    ) -> Tuple[Any, PoolRoute]:
+        """async counterpart of call"""
+        api_keys, models = self.keys_for(api_key), self.models_for(model)
+        attempts: Dict[Tuple[str, str], int] = {}
+        last_error: Optional[Exception] = None
+        failures = 0
+
+        while True:
+            route, wait = self._next_route(api_keys, models, tokens, attempts)
+            if route is None:
+                if wait is None or math.isinf(wait):
+                    raise last_error or ProviderPoolError(f"No API key can serve {model}")
+                await asyncio.sleep(wait)
+                continue
+            if on_dispatch is not None:
+                on_dispatch()
+            try:
+                raw = await request(route.api_key, route.model)
+            except FAILOVER_ERRORS as e:
+                self._failed(route, e)
+                failures += 1
+                last_error = e
+                delay = self._retry_delay(e, failures)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            self._succeeded(route, model, raw.headers)
+            return raw, route
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [route.stats(now) for route in self._routes.values()]
+
+
+_provider_pool: Optional[ProviderPool] = None
+_provider_pool_lock = threading.Lock()
+
+
+def get_provider_pool() -> ProviderPool:
+    """Return the process-wide provider pool"""
+    global _provider_pool
+    with _provider_pool_lock:
+        if _provider_pool is None:
+            _provider_pool = ProviderPool()
+        return _provider_pool
@@ -0,0 +1,379 @@
+"""Durable, SQLite-backed queue of Hashnode drafts drained by background workers"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from api.hashnode_client import HashnodeClient, HashnodeRequestError
+from config.settings import (
+    PUBLISH_MAX_ATTEMPTS,
+    PUBLISH_QUEUE_PATH,
+    PUBLISH_REQUESTS_PER_MINUTE,
+    PUBLISH_RETRY_BASE_DELAY,
+    PUBLISH_RETRY_MAX_DELAY,
+    PUBLISH_WORKERS,
+)
+from utils.masking import api_key_fingerprint
+from utils.response_cache import make_cache_key
+from utils.telemetry import get_telemetry
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+WORKER_POLL_INTERVAL = 1.0  # seconds a worker sleeps when no job is due
+
+
+class RatePacer:
+    """
+    Thread-safe request spacing for a requests-per-minute limit. A 429 with
+    Retry-After pauses every worker, not just the one that received it.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block until the next request slot is available"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float) -> None:
+        """Push the next slot back, e.g. after a rate limit response"""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class PublishQueue:
+    """
+    Persistent queue of createDraft jobs. Jobs survive page reruns and
+    restarts; API keys are only held in memory, so after a restart a job
+    resumes once a session with the same key connects again.
+
+    Each job carries an idempotency key derived from its API key and draft
+    input: queueing the same draft twice with the same key returns the
+    existing job, and a job whose earlier attempt may have reached Hashnode
+    first looks for the draft it may already have created before sending the
+    mutation again. Retries happen here only; the transport does not retry
+    createDraft itself.
+    """
+
+    def __init__(
+        self,
+        path: str = PUBLISH_QUEUE_PATH,
+        workers: int = PUBLISH_WORKERS,
+        requests_per_minute: int = PUBLISH_REQUESTS_PER_MINUTE,
+        max_attempts: int = PUBLISH_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.pacer = RatePacer(requests_per_minute)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._api_keys: Dict[str, str] = {}  # fingerprint -> key
+        self._threads: List[threading.Thread] = []
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Workers and Streamlit sessions share the connection, serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                key_fingerprint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                maybe_sent INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                draft TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt_at)"
+        )
+        # A job left running by a previous process may or may not have been sent
+        self._conn.execute(
+            "UPDATE jobs SET status = 'queued', maybe_sent = 1 WHERE status = 'running'"
+        )
+        self._conn.commit()
+
+    def register_api_key(self, api_key: str) -> None:
+        """Make a key available to the workers and start them if needed"""
+        if not api_key:
+            return
+
+        with self._lock:
+            self._api_keys[api_key_fingerprint(api_key)] = api_key
+        self.start()
+        self._wakeup.set()
+
+    def enqueue(
+        self, api_key, title, content, tags=None, publication_id=None, subtitle=None
+    ) -> Dict[str, Any]:
+        """Queue a draft and return its job; an identical draft is only queued once per key"""
+        payload = {
+            "title": title,
+            "content": content,
+            "tags": list(tags or []),
+            "publication_id": publication_id,
+            "subtitle": subtitle,
+        }
+        fingerprint = api_key_fingerprint(api_key)
+        idempotency_key = make_cache_key({"key": fingerprint, **payload})
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR IGNORE INTO jobs (
+                    idempotency_key, key_fingerprint, payload, status,
+                    next_attempt_at, created_at, updated_at
+                ) VALUES (?, ?, ?, 'queued', ?, ?, ?)
+                """,
+                (idempotency_key, fingerprint, json.dumps(payload), now, now, now),
+            )
+            # Re-queueing a failed draft gives it a fresh set of attempts
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = 'queued', attempts = 0, next_attempt_at = ?,
+                    last_error = NULL, updated_at = ?
+                WHERE idempotency_key = ? AND status = 'failed'
+                """,
+                (now, now, idempotency_key),
+            )
+            self._conn.commit()
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+
+        self.register_api_key(api_key)
+        return self._to_job(row)
+
+    def retry(self, job_id: int) -> None:
+        """Put a failed job back in the queue"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = 'queued', attempts = 0, next_attempt_at = ?,
+                    last_error = NULL, updated_at = ?
+                WHERE id = ? AND status = 'failed'
+                """,
+                (now, now, job_id),
+            )
+            self._conn.commit()
+        self._wakeup.set()
+
+    def list_jobs(self, api_key: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recent jobs queued with this API key"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE key_fingerprint = ? ORDER BY id DESC LIMIT ?",
+                (api_key_fingerprint(api_key), limit),
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def get_job(self, job_id: int, api_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return one job by id, or None; with api_key, only a job queued with that key"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (api_key and row["key_fingerprint"] != api_key_fingerprint(api_key)):
+            return None
+        return self._to_job(row)
+
+    def stats(self) -> Dict[str, int]:
+        """Return job counts by status"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        payload = json.loads(row["payload"])
+        return {
+            "id": row["id"],
+            "title": payload["title"],
+            "publication_id": payload["publication_id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "last_error": row["last_error"],
+            "draft": json.loads(row["draft"]) if row["draft"] else None,
+            "next_attempt_at": row["next_attempt_at"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def start(self) -> None:
+        """Start the background workers once per process"""
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"publish-worker-{number}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def _work(self) -> None:
+        """Worker loop: claim the next due job, process it, repeat"""
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                self._wakeup.wait(WORKER_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._process(*claimed)
+
+    def _claim(self):
+        """Atomically mark the oldest due job as running"""
+        now = time.time()
+        with self._lock:
+            fingerprints = list(self._api_keys)
+            if not fingerprints:
+                return None
+
+            placeholders = ", ".join("?" for _ in fingerprints)
+            row = self._conn.execute(
+                f"""
+                SELECT * FROM jobs
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                    AND key_fingerprint IN ({placeholders})
+                ORDER BY next_attempt_at, id LIMIT 1
+                """,
+                (now, *fingerprints),
+            ).fetchone()
+            if row is None:
+                return None
+
+            # Conditional, so a second process draining the same file can't claim it too
+            claimed = self._conn.execute(
+                """
+                UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?
+                WHERE id = ? AND status = 'queued'
+                """,
+                (now, row["id"]),
+            ).rowcount
+            self._conn.commit()
+            if not claimed:
+                return None
+            return row, self._api_keys[row["key_fingerprint"]]
+
+    def _process(self, row: sqlite3.Row, api_key: str) -> None:
+        """Create the draft for one job, or schedule a retry"""
+        payload = json.loads(row["payload"])
+        client = HashnodeClient(api_key)
+        maybe_sent = bool(row["maybe_sent"])
+        started_at = time.perf_counter()
+        status = "failed"
+
+        try:
+            draft = None
+            if maybe_sent:
+                self.pacer.wait()
+                draft = client.find_draft(
+                    payload["publication_id"], payload["title"], payload["content"]
+                )
+
+            if draft is None:
+                # From here on a failure may leave a draft behind on Hashnode
+                self._set_maybe_sent(row["id"])
+                maybe_sent = True
+                self.pacer.wait()
+                draft = client.submit_draft(
+                    title=payload["title"],
+                    content=payload["content"],
+                    tags=payload["tags"],
+                    publication_id=payload["publication_id"],
+                    subtitle=payload["subtitle"],
+                )
+
+            self._finish(row["id"], "succeeded", draft=draft)
+            status = "succeeded"
+        except HashnodeRequestError as e:
+            if e.retry_after:
+                self.pacer.pause(e.retry_after)
+
+            if e.retryable and row["attempts"] + 1 < self.max_attempts:
+                self._reschedule(row["id"], row["attempts"] + 1, e, maybe_sent or e.maybe_sent)
+                status = "retrying"
+            else:
+                self._finish(row["id"], "failed", error=str(e))
+        except Exception as e:
+            get_telemetry().record_error("publish", e)
+            self._finish(row["id"], "failed", error=f"Unexpected error: {e}")
+        finally:
+            # Pacing waits included: this is how long a job holds a worker
+            get_telemetry().observe(
+                "prosepilot_publish_seconds", time.perf_counter() - started_at, status=status)
+
+    def _set_maybe_sent(self, job_id: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET maybe_sent = 1 WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def _reschedule(self, job_id: int, attempts: int, error: HashnodeRequestError, maybe_sent: bool) -> None:
+        """Queue a job again after jittered exponential backoff (or Retry-After)"""
+        delay = min(PUBLISH_RETRY_MAX_DELAY, PUBLISH_RETRY_BASE_DELAY * (2 ** (attempts - 1)))
+        delay = random.uniform(delay / 2, delay)
+        if error.retry_after:
+            delay = max(delay, error.retry_after)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = 'queued', next_attempt_at = ?, last_error = ?,
+                    maybe_sent = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (now + delay, str(error), int(maybe_sent), now, job_id),
+            )
+            self._conn.commit()
+
+    def _finish(self, job_id: int, status: str, draft=None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, draft = ?, last_error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                (status, json.dumps(draft) if draft else None, error, time.time(), job_id),
+            )
+            self._conn.commit()
+
+
+_publish_queue: Optional[PublishQueue] = None
+_publish_queue_lock = threading.Lock()
+
+
+def get_publish_queue() -> PublishQueue:
+    """Return the process-wide publish queue shared by all sessions"""
+    global _publish_queue
+
+    with _publish_queue_lock:
+        if _publish_queue is None:
+            _publish_queue = PublishQueue()
+        return _publish_queue
@@ -0,0 +1,191 @@
+"""Local, prefix/trigram-indexed cache of Hashnode tags"""
+
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+from config.settings import (
+    TAG_CACHE_TTL_SECONDS,
+    TAG_FAILURE_TTL_SECONDS,
+    TAG_SEARCH_DEBOUNCE_SECONDS,
+    TAG_UPSTREAM_PAGE_SIZE,
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+PREFIX_INDEX_LENGTH = 2  # shorter queries use the prefix index, longer ones trigrams
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TagCatalog:
+    """
+    Caches tagCategories results and answers searches locally whenever a
+    fresh upstream result already covers the query, including an empty one.
+    A failed fetch is not retried for failure_ttl_seconds. Tags are indexed by
+    token prefix (for one or two character queries) and by trigram (for
+    substring queries such as "script" -> "JavaScript").
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = TAG_CACHE_TTL_SECONDS,
+        debounce_seconds: float = TAG_SEARCH_DEBOUNCE_SECONDS,
+        failure_ttl_seconds: float = TAG_FAILURE_TTL_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.debounce_seconds = debounce_seconds
+        self.local_hits = 0
+        self.upstream_calls = 0
+
+        self._lock = threading.Lock()
+        self._tags: Dict[str, Dict[str, str]] = {}
+        self._search_keys: Dict[str, str] = {}  # tag id -> lowercase "name slug"
+        self._prefix_index: Dict[str, Set[str]] = {}
+        self._trigram_index: Dict[str, Set[str]] = {}
+        self._fetched_at: Dict[str, float] = {}  # upstream query -> fetch time
+        self._complete: Set[str] = set()  # queries whose results fit in one page
+        self._failed_at: Dict[str, float] = {}  # upstream query -> last failed fetch
+        self._upstream_calls_at: Dict[str, float] = {}  # query -> last upstream call, within the debounce
+
+    def add_tags(self, tags: List[Dict[str, str]]) -> None:
+        """Add tags to the catalog and its indexes"""
+        with self._lock:
+            for tag in tags:
+                tag_id = tag.get("_id")
+                if not tag_id or tag_id in self._tags:
+                    continue
+
+                search_key = _normalize(f"{tag.get('name', '')} {tag.get('slug', '')}")
+                self._tags[tag_id] = tag
+                self._search_keys[tag_id] = search_key
+
+                for token in TOKEN_PATTERN.findall(search_key):
+                    for length in range(1, min(PREFIX_INDEX_LENGTH, len(token)) + 1):
+                        self._prefix_index.setdefault(token[:length], set()).add(tag_id)
+
+                for trigram in _trigrams(search_key):
+                    self._trigram_index.setdefault(trigram, set()).add(tag_id)
+
+    def search_local(self, query: str) -> List[Dict[str, str]]:
+        """Search cached tags only, best matches first"""
+        query = _normalize(query)
+        if not query:
+            return []
+
+        with self._lock:
+            if len(query) <= PREFIX_INDEX_LENGTH:
+                candidates = set(self._prefix_index.get(query, ()))
+            else:
+                trigram_sets = [self._trigram_index.get(t, set()) for t in _trigrams(query)]
+                candidates = set.intersection(*trigram_sets) if trigram_sets else set()
+                candidates = {tag_id for tag_id in candidates if query in self._search_keys[tag_id]}
+
+            tags = [self._tags[tag_id] for tag_id in candidates]
+
+        def rank(tag):
+            name = tag.get("name", "").lower()
+            return (name != query, not name.startswith(query), len(name), name)
+
+        return sorted(tags, key=rank)
+
+    def _is_covered(self, query: str, now: float) -> bool:
+        """
+        A fresh upstream result for the query covers it. So does a fresh
+        result for a shorter prefix, as long as that result was a complete
+        (single, partial) page, since every match for the longer query is in it.
+        """
+        for length in range(len(query), 0, -1):
+            prefix = query[:length]
+            fetched_at = self._fetched_at.get(prefix)
+            if fetched_at is None or now - fetched_at > self.ttl_seconds:
+                continue
+            if prefix == query or prefix in self._complete:
+                return True
+        return False
+
+    def search(
+        self, query: str, fetch: Callable[[str], Optional[List[Dict[str, str]]]]
+    ) -> List[Dict[str, str]]:
+        """
+        Answer from the local catalog when it is fresh for the query;
+        otherwise call fetch(query) upstream, at most once per query per
+        debounce window.
+        fetch returns None when the request failed.
+        """
+        query = _normalize(query)
+        if not query:
+            return []
+
+        now = time.time()
+        with self._lock:
+            covered = self._is_covered(query, now)
+            debounced = now - self._upstream_calls_at.get(query, float("-inf")) < self.debounce_seconds
+            recently_failed = now - self._failed_at.get(query, float("-inf")) < self.failure_ttl_seconds
+
+        if covered or debounced or recently_failed:
+            self.local_hits += 1
+            return self.search_local(query)
+
+        with self._lock:
+            self._upstream_calls_at = {
+                recent: called_at for recent, called_at in self._upstream_calls_at.items()
+                if now - called_at < self.debounce_seconds
+            }
+            self._upstream_calls_at[query] = now
+        self.upstream_calls += 1
+
+        fetched = fetch(query)
+        if fetched is None:
+            with self._lock:
+                self._failed_at = {
+                    failed: failed_at for failed, failed_at in self._failed_at.items()
+                    if now - failed_at < self.failure_ttl_seconds
+                }
+                self._failed_at[query] = now
+            return self.search_local(query)
+
+        self.prime(query, fetched, now)
+        return self.search_local(query) or fetched
+
+    def prime(self, query: str, tags: List[Dict[str, str]], fetched_at: Optional[float] = None) -> None:
+        """Record an upstream result for a query, e.g. tags prefetched at connect time"""
+        query = _normalize(query)
+        if not query:
+            return
+
+        # An empty result is an answer too: no tag matches the query
+        self.add_tags(tags)
+        with self._lock:
+            self._fetched_at[query] = time.time() if fetched_at is None else fetched_at
+            self._failed_at.pop(query, None)
+            if len(tags) < TAG_UPSTREAM_PAGE_SIZE:
+                self._complete.add(query)
+
+    def stats(self) -> Dict[str, int]:
+        """Return catalog size and how many searches were answered locally"""
+        return {
+            "tags": len(self._tags),
+            "local_hits": self.local_hits,
+            "upstream_calls": self.upstream_calls,
+        }
+
+
+_tag_catalog: Optional[TagCatalog] = None
+_tag_catalog_lock = threading.Lock()
+
+
+def get_tag_catalog() -> TagCatalog:
+    """Return the process-wide tag catalog (tags are public, so all sessions share it)"""
+    global _tag_catalog
+
+    with _tag_catalog_lock:
+        if _tag_catalog is None:
+            _tag_catalog = TagCatalog()
+        return _tag_catalog
@@ -0,0 +1,120 @@
+"""Word limit enforcement for streamed generations"""
+
+import re
+from typing import List, Optional
+from config.settings import WORD_LIMIT_GRACE_MIN_WORDS, WORD_LIMIT_GRACE_RATIO
+
+# End of a sentence (with closing quotes/brackets) or of a paragraph/section
+BOUNDARY_PATTERN = re.compile(r"[.!?][\"')\]*_]*(?=\s)|\n[ \t]*\n")
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def grace_words(max_words: int) -> int:
+    """Words tolerated past the limit before the upstream request is cancelled"""
+    return max(WORD_LIMIT_GRACE_MIN_WORDS, int(max_words * WORD_LIMIT_GRACE_RATIO))
+
+
+def last_clean_boundary(text: str, start: int = 0, max_words: Optional[int] = None) -> Optional[int]:
+    """
+    Return the end of the last sentence or section in text[start:] that is not
+    inside a code block and, if max_words is given, keeps text within that many words.
+    """
+    best = None
+    for match in BOUNDARY_PATTERN.finditer(text, start):
+        end = match.end()
+        if max_words is not None and len(text[:end].split()) > max_words:
+            break
+        if text.count("```", 0, end) % 2 == 0:
+            best = end
+    return best
+
+
+def trim_to_word_limit(text: str, max_words: int) -> str:
+    """Trim finished text back to a clean boundary within the word limit"""
+    if len(text.split()) <= max_words:
+        return text
+
+    boundary = last_clean_boundary(text, 0, max_words)
+    if boundary is None:
+        # No sentence ends within the limit; cut after the last allowed word
+        boundary = [match.end() for match in WORD_PATTERN.finditer(text)][max_words - 1]
+    return text[:boundary].rstrip()
+
+
+class WordLimitGuard:
+    """
+    Counts words as deltas stream in and decides what may be shown. Text is
+    released as it arrives until the output gets within the grace margin of
+    the limit; from there it is only released up to clean sentence or section
+    boundaries that stay within the limit, so what was shown never has to be
+    taken back. Once the limit plus the grace margin is passed, `exceeded`
+    tells the caller to cancel the upstream request.
+    """
+
+    def __init__(self, max_words: int, grace: Optional[int] = None):
+        self.max_words = max_words
+        self.grace = grace_words(max_words) if grace is None else grace
+        self.word_count = 0
+        self.truncated = False
+
+        self._parts: List[str] = []
+        self._released = 0  # characters of the text already handed out
+        self._length = 0
+        self._in_word = False
+
+    @property
+    def exceeded(self) -> bool:
+        return self.word_count > self.max_words + self.grace
+
+    def feed(self, delta: str) -> str:
+        """Add a delta and return the text that can be shown now"""
+        if not delta:
+            return ""
+
+        words = len(delta.split())
+        if words and self._in_word and not delta[0].isspace():
+            words -= 1  # continues the previous delta's last word
+        self.word_count += words
+        self._in_word = not delta[-1].isspace()
+
+        self._parts.append(delta)
+        self._length += len(delta)
+
+        if self.word_count < self.max_words - self.grace:
+            if self._released == self._length - len(delta):
+                # Common case, far from the limit: pass the delta straight through
+                self._released = self._length
+                return delta
+            return self._release(self._length)
+
+        boundary = last_clean_boundary(self._text(), self._released, self.max_words)
+        return self._release(boundary) if boundary is not None else ""
+
+    def finish(self) -> str:
+        """The model stopped on its own: release the rest if it is within the grace margin"""
+        if not self.exceeded:
+            return self._release(self._length)
+        return self.stop()
+
+    def stop(self) -> str:
+        """The request is cancelled past the limit; release what still fits cleanly"""
+        self.truncated = True
+        text = self._text()
+
+        boundary = last_clean_boundary(text, self._released, self.max_words)
+        if boundary is None and self._released == 0:
+            # Nothing shown yet and no clean boundary: fall back to a word cut
+            boundary = len(trim_to_word_limit(text, self.max_words))
+        return self._release(boundary) if boundary is not None else ""
+
+    def _text(self) -> str:
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+
+    def _release(self, end: int) -> str:
+        if end <= self._released:
+            return ""
+        released = self._text()[self._released:end]
+        self._released = end
+        return released
@@ -0,0 +1 @@
+# Benchmarks package: offline timing of the hot paths against local fake services
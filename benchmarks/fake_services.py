@@ -0,0 +1,520 @@
+"""
+Local fake OpenAI and Hashnode HTTP services, so benchmarks and load tests
+run offline. Run as a stand-in server with:
+
+    python -m benchmarks.fake_services --port 8765 --error-rate 0.02 --rate-limit-rate 0.05
+    python -m benchmarks.fake_services --rpm-limit 60 --tpm-limit 40000
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+OPENAI_COMPLETIONS_PATH = "/v1/chat/completions"
+HASHNODE_GRAPHQL_PATH = "/graphql"
+
+COMPLETION_SENTENCES = [
+    "Python makes it easy to build reliable web APIs.",
+    "Start with a small, well-tested core and grow it step by step.",
+    "Measure before you optimize, and keep the numbers in version control.",
+    "Clear error messages save hours of debugging later.",
+    "Caching helps most when the same work is repeated often.",
+]
+
+
+def completion_text(words: int) -> str:
+    """Deterministic markdown reply of about the given number of words"""
+    parts = ["# A Practical Guide", ""]
+    count = 4
+    for number, sentence in enumerate(itertools.cycle(COMPLETION_SENTENCES)):
+        if count >= words:
+            break
+        if number and number % 8 == 0:
+            parts.append(f"\n## Section {number // 8}\n")
+        parts.append(sentence)
+        count += len(sentence.split())
+    return " ".join(parts)
+
+
+class FakeOpenAIService:
+    """
+    Answers chat completion requests with canned markdown, streamed or not.
+    Replies are as long as completion_words, capped by the request's
+    max_tokens, and report token usage like the real API.
+    """
+
+    def __init__(self, completion_words: int = 400):
+        self.completion_words = completion_words
+
+    def completion(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        text, usage = self._reply(body)
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    def completion_chunks(self, body: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Stream chunks: one per word, then a usage chunk when include_usage is set"""
+        text, usage = self._reply(body)
+        base = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+        }
+
+        yield {**base, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+        for word in text.split(" "):
+            yield {**base, "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+        yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+
+        if (body.get("stream_options") or {}).get("include_usage"):
+            yield {**base, "choices": [], "usage": usage}
+
+    def _reply(self, body: Dict[str, Any]):
+        words = self.completion_words
+        if body.get("max_tokens"):
+            words = min(words, int(body["max_tokens"] / 1.35))
+        text = completion_text(words)
+
+        prompt_tokens = sum(len(m.get("content", "").split()) + 4 for m in body.get("messages", []))
+        completion_tokens = int(len(text.split()) * 1.35)
+        return text, {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+
+class FakeHashnodeService:
+    """Resolves the GraphQL operations HashnodeClient sends, keeping drafts in memory"""
+
+    def __init__(self, publications: int = 2, tags_per_query: int = 20):
+        self.publications = [
+            {"id": f"pub{number}", "title": f"Publication {number}", "isDefault": number == 0}
+            for number in range(publications)
+        ]
+        self.tags_per_query = tags_per_query
+        self._drafts: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def execute(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = payload.get("query", "")
+        variables = payload.get("variables") or {}
+        data: Dict[str, Any] = {}
+
+        if "createDraft" in query:
+            data["createDraft"] = {"draft": self._create_draft(variables["input"])}
+        elif "drafts(" in query:
+            data["publication"] = {"drafts": {"edges": self._draft_edges(variables.get("first", 50))}}
+        else:
+            if "me" in query:
+                data["me"] = {
+                    "username": "benchmark",
+                    "name": "Benchmark User",
+                    "publications": {"edges": [{"node": dict(p)} for p in self.publications]},
+                }
+            if "tagCategories" in query:
+                if "query" in variables:
+                    data["tagCategories"] = self._tags(variables["query"])
+                for name, value in variables.items():
+                    if name.startswith("tagQuery"):
+                        data[f"tags{name[len('tagQuery'):]}"] = self._tags(value)
+
+        return {"data": data}
+
+    def _tags(self, search: Optional[str]) -> List[Dict[str, str]]:
+        slug = (search or "tag").lower().replace(" ", "-")
+        return [
+            {"_id": f"{slug}-{number}", "name": f"{search or 'tag'} {number}", "slug": f"{slug}-{number}"}
+            for number in range(self.tags_per_query)
+        ]
+
+    def _create_draft(self, draft_input: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            number = len(self._drafts)
+            draft = {
+                "id": f"draft{number}",
+                "title": draft_input.get("title", ""),
+                "slug": f"draft-{number}",
+                "updatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "content": {"markdown": draft_input.get("contentMarkdown", "")},
+            }
+            self._drafts.append(draft)
+        return {key: value for key, value in draft.items() if key != "content"}
+
+    def _draft_edges(self, first: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"node": dict(draft)} for draft in reversed(self._drafts[-first:])]
+
+
+class LatencyModel:
+    """
+    A latency distribution in seconds, written as "kind:params":
+    fixed:0.05, uniform:0.1,0.5, normal:0.3,0.05 (mean, stddev),
+    lognormal:0.3,0.5 (median, sigma) or exponential:0.2 (mean).
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"Expected {kind} with {self.KINDS.get(kind, '?')} parameter(s)")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        if not params:
+            # A bare number is a fixed latency
+            return cls("fixed", float(kind))
+        return cls(kind, *(float(param) for param in params.split(",")))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            value = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            value = median * math.exp(rng.gauss(0, sigma))
+        else:
+            value = rng.expovariate(1 / self.params[0]) if self.params[0] else 0.0
+        return max(0.0, value)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(str(param) for param in self.params)}"
+
+
+class FaultProfile:
+    """How one fake service misbehaves: latency before the first byte, 5xx and 429 rates"""
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        token_interval: float = 0.0,
+    ):
+        self.latency = latency or LatencyModel("fixed", 0.0)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.token_interval = token_interval  # seconds between streamed chunks
+
+    def outcome(self, rng: random.Random) -> str:
+        """Roll for this request: ok, error or rate_limited"""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+class RateLimits:
+    """
+    Per-minute request and token limits for each API key and model, enforced
+    like the real API: every answer carries x-ratelimit-* headers, and a
+    request over either limit gets a 429 instead. A request counts its
+    prompt plus its whole max_tokens against the token limit.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.limits = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self._remaining: Dict[tuple, Dict[str, float]] = {}  # (key, model) -> left under each limit
+        self._updated: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return any(self.limits.values())
+
+    def check(self, api_key: str, body: Dict[str, Any]):
+        """Admit or refuse one request; returns (allowed, headers)"""
+        cost = {
+            "requests": 1,
+            "tokens": sum(len(m.get("content", "").split()) + 4 for m in body.get("messages", []))
+            + int(body.get("max_tokens") or 0),
+        }
+        route = (api_key, body.get("model"))
+        now = time.monotonic()
+
+        with self._lock:
+            remaining = self._remaining.setdefault(route, {kind: float(limit) for kind, limit in self.limits.items()})
+            elapsed = now - self._updated.get(route, now)
+            self._updated[route] = now
+            for kind, limit in self.limits.items():
+                remaining[kind] = min(limit, remaining[kind] + elapsed * limit / 60.0)
+
+            allowed = all(
+                remaining[kind] >= min(cost[kind], limit)
+                for kind, limit in self.limits.items() if limit
+            )
+            if allowed:
+                for kind in self.limits:
+                    remaining[kind] -= cost[kind]
+
+            headers = {}
+            for kind, limit in self.limits.items():
+                if not limit:
+                    continue
+                left = max(0.0, remaining[kind])
+                headers[f"x-ratelimit-limit-{kind}"] = str(limit)
+                headers[f"x-ratelimit-remaining-{kind}"] = str(int(left))
+                headers[f"x-ratelimit-reset-{kind}"] = f"{(limit - left) * 60.0 / limit:.3f}s"
+            if not allowed:
+                waits = [
+                    (min(cost[kind], limit) - remaining[kind]) * 60.0 / limit
+                    for kind, limit in self.limits.items() if limit
+                ]
+                headers["Retry-After"] = f"{max(0.0, max(waits)):.3f}"
+        return allowed, headers
+
+
+class FakeServices:
+    """
+    Serves both fakes on a local port from a background thread. Each service
+    has a FaultProfile: every request waits a sampled latency before its
+    first byte, standing in for the network and model time of the real
+    services, and may be answered with a 5xx or a 429 instead.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        openai_service: Optional[FakeOpenAIService] = None,
+        hashnode_service: Optional[FakeHashnodeService] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        openai_faults: Optional[FaultProfile] = None,
+        hashnode_faults: Optional[FaultProfile] = None,
+        seed: Optional[int] = None,
+        openai_limits: Optional[RateLimits] = None,
+    ):
+        self.openai = openai_service or FakeOpenAIService()
+        self.hashnode = hashnode_service or FakeHashnodeService()
+        self.openai_faults = openai_faults or FaultProfile(LatencyModel("fixed", latency))
+        self.hashnode_faults = hashnode_faults or FaultProfile(LatencyModel("fixed", latency))
+        self.openai_limits = openai_limits or RateLimits()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+        self._server = _StandInHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.url}/v1/"
+
+    @property
+    def hashnode_url(self) -> str:
+        return f"{self.url}{HASHNODE_GRAPHQL_PATH}"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeServices":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests served per service and outcome"""
+        with self._lock:
+            return {service: dict(counts) for service, counts in self._counts.items()}
+
+    def _count(self, service: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(service, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def _roll(self, service: str, faults: FaultProfile):
+        """Sample this request's latency and outcome, and count it"""
+        with self._lock:
+            delay = faults.latency.sample(self._rng)
+            outcome = faults.outcome(self._rng)
+            counts = self._counts.setdefault(service, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return delay, outcome
+
+    def _handler_class(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+            disable_nagle_algorithm = True  # small writes would otherwise wait on delayed ACKs
+
+            limit_headers: Dict[str, str] = {}
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path.startswith(OPENAI_COMPLETIONS_PATH):
+                    faults = services.openai_faults
+                    limit_headers = {}
+                    if services.openai_limits:
+                        allowed, limit_headers = services.openai_limits.check(
+                            self.headers.get("Authorization", ""), body)
+                        if not allowed:
+                            services._count("openai", "over_limit")
+                            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                                            limit_headers)
+                            return
+                    self.limit_headers = limit_headers
+
+                    delay, outcome = services._roll("openai", faults)
+                    time.sleep(delay)
+                    if outcome == "rate_limited":
+                        self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                        {"Retry-After": str(faults.retry_after)})
+                    elif outcome == "error":
+                        self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+                    elif body.get("stream"):
+                        self._send_stream(services.openai.completion_chunks(body), faults.token_interval,
+                                          self.limit_headers)
+                    else:
+                        self._send_json(200, services.openai.completion(body), self.limit_headers)
+                elif self.path.startswith(HASHNODE_GRAPHQL_PATH):
+                    faults = services.hashnode_faults
+                    delay, outcome = services._roll("hashnode", faults)
+                    time.sleep(delay)
+                    if outcome == "rate_limited":
+                        self._send_json(429, {"errors": [{"message": "Too many requests"}]},
+                                        {"Retry-After": str(faults.retry_after)})
+                    elif outcome == "error":
+                        self._send_json(502, {"errors": [{"message": "Injected server error"}]})
+                    else:
+                        self._send_json(200, services.hashnode.execute(body))
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, chunks: Iterator[Dict[str, Any]], token_interval: float = 0.0, headers=None):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    for chunk in chunks:
+                        if token_interval and chunk["choices"]:
+                            time.sleep(token_interval)
+                        self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the stream, e.g. at the word limit
+                    self.close_connection = True
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+        return Handler
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # load tests open many connections at once
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is normal, not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def main(argv=None) -> None:
+    """Run the stand-in services in the foreground"""
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the OpenAI chat completions and Hashnode GraphQL APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--openai-latency", type=LatencyModel.parse, default=LatencyModel.parse("lognormal:0.4,0.5"),
+                        help="time to first token, e.g. fixed:0.2 or lognormal:0.4,0.5 (default)")
+    parser.add_argument("--token-interval", type=float, default=0.0,
+                        help="seconds between streamed chunks (default 0)")
+    parser.add_argument("--hashnode-latency", type=LatencyModel.parse, default=LatencyModel.parse("lognormal:0.15,0.4"),
+                        help="Hashnode response latency (default lognormal:0.15,0.4)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--rpm-limit", type=int, default=0, help="OpenAI requests per minute per key and model")
+    parser.add_argument("--tpm-limit", type=int, default=0, help="OpenAI tokens per minute per key and model")
+    parser.add_argument("--completion-words", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    services = FakeServices(
+        openai_service=FakeOpenAIService(args.completion_words),
+        host=args.host,
+        port=args.port,
+        openai_faults=FaultProfile(args.openai_latency, args.error_rate, args.rate_limit_rate,
+                                   args.retry_after, args.token_interval),
+        hashnode_faults=FaultProfile(args.hashnode_latency, args.error_rate, args.rate_limit_rate,
+                                     args.retry_after),
+        seed=args.seed,
+        openai_limits=RateLimits(args.rpm_limit, args.tpm_limit),
+    )
+    print(f"Serving OpenAI at {services.openai_base_url} and Hashnode at {services.hashnode_url}")
+    print(f"Point the app at them with OPENAI_BASE_URL={services.openai_base_url} "
+          f"PROSEPILOT_HASHNODE_URL={services.hashnode_url}")
+    try:
+        services._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        services._server.server_close()
+        print(f"Requests served: {services.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Load generator: N concurrent simulated users drive EnhancedOpenAIClient and
+HashnodeClient against the stand-in services, then throughput and latency
+percentiles are reported per operation.
+
+    python -m benchmarks.load --users 20 --duration 30 --mix generate=3,connect=1,publish=1
+    python -m benchmarks.load --users 50 --error-rate 0.02 --rate-limit-rate 0.05
+
+Without --target an in-process stand-in is started with the given latency and
+fault options; with --target the users hit an already running one
+(python -m benchmarks.fake_services).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fake_services import FakeOpenAIService, FakeServices, FaultProfile, LatencyModel
+
+GENERATION_ERROR_PREFIX = "Error generating content:"  # how EnhancedOpenAIClient reports failures
+
+TOPICS = [
+    "Building fast Python APIs with FastAPI",
+    "A beginner's guide to React hooks",
+    "Scaling PostgreSQL for write-heavy workloads",
+    "Why every team needs code review",
+    "Deploying containers to Kubernetes",
+    "Getting started with machine learning in Python",
+]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "generate=3,connect=1" into operation weights"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class SimulatedUser:
+    """One session: its own OpenAI client, a Hashnode client on the shared transport"""
+
+    def __init__(self, number: int, hashnode_url: str, max_length: int):
+        from api.hashnode_client import HashnodeClient
+        from api.openai_client import EnhancedOpenAIClient
+
+        self.number = number
+        self.max_length = max_length
+        self.openai_client = EnhancedOpenAIClient(api_key="load-test")
+        self.hashnode_client = HashnodeClient("load-test")
+        self.hashnode_client.graphql_url = hashnode_url
+        self.rng = random.Random(number)
+
+    def generate(self) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        first_at = None
+        chunks = []
+        for delta in self.openai_client.stream_content(
+            self.rng.choice(TOPICS), "Blog Post", "Professional", self.max_length,
+            "gpt-3.5-turbo", 0.7, use_cache=False,
+        ):
+            if first_at is None:
+                first_at = time.perf_counter()
+            chunks.append(delta)
+
+        content = "".join(chunks)
+        if content.startswith(GENERATION_ERROR_PREFIX):
+            return {"error": content[len(GENERATION_ERROR_PREFIX):].strip()[:80]}
+        return {"ttft": first_at - started_at if first_at else None}
+
+    def connect(self) -> Dict[str, Any]:
+        self.hashnode_client.connect()
+        return {}
+
+    def publish(self) -> Dict[str, Any]:
+        self.hashnode_client.submit_draft(
+            f"Load test draft from user {self.number}", "Draft body", publication_id="pub0")
+        return {}
+
+
+OPERATIONS = {
+    "generate": SimulatedUser.generate,
+    "connect": SimulatedUser.connect,
+    "publish": SimulatedUser.publish,
+}
+
+
+class LoadGenerator:
+    """Runs users on threads until the duration or request budget runs out"""
+
+    def __init__(
+        self,
+        users: int,
+        duration: float,
+        mix: Dict[str, float],
+        hashnode_url: str,
+        max_requests: Optional[int] = None,
+        think_time: float = 0.0,
+        ramp_up: float = 0.0,
+        max_length: int = 400,
+    ):
+        self.users = users
+        self.duration = duration
+        self.mix = mix
+        self.hashnode_url = hashnode_url
+        self.max_requests = max_requests
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.max_length = max_length
+
+        self._lock = threading.Lock()
+        self._samples: List[Dict[str, Any]] = []
+        self._issued = 0
+
+    def run(self) -> Dict[str, Any]:
+        started_at = time.perf_counter()
+        deadline = started_at + self.ramp_up + self.duration
+
+        threads = [
+            threading.Thread(target=self._user_loop, args=(number, started_at, deadline), daemon=True)
+            for number in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.report(time.perf_counter() - started_at)
+
+    def _take_request(self) -> bool:
+        with self._lock:
+            if self.max_requests is not None and self._issued >= self.max_requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _user_loop(self, number: int, started_at: float, deadline: float) -> None:
+        # Users join evenly spread over the ramp-up period
+        if self.ramp_up and self.users > 1:
+            time.sleep(self.ramp_up * number / (self.users - 1))
+
+        user = SimulatedUser(number, self.hashnode_url, self.max_length)
+        operations, weights = zip(*self.mix.items())
+
+        while time.perf_counter() < deadline and self._take_request():
+            operation = user.rng.choices(operations, weights)[0]
+            request_started_at = time.perf_counter()
+            try:
+                outcome = OPERATIONS[operation](user)
+            except Exception as e:
+                outcome = {"error": f"{type(e).__name__}: {e}"[:80]}
+
+            sample = {
+                "operation": operation,
+                "latency": time.perf_counter() - request_started_at,
+                "at": request_started_at - started_at,
+                **outcome,
+            }
+            with self._lock:
+                self._samples.append(sample)
+
+            if self.think_time:
+                time.sleep(user.rng.expovariate(1 / self.think_time))
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+
+        def summarize(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+            ok = [s for s in group if "error" not in s]
+            latencies = [s["latency"] for s in ok]
+            ttfts = [s["ttft"] for s in ok if s.get("ttft") is not None]
+
+            errors: Dict[str, int] = {}
+            for sample in group:
+                if "error" in sample:
+                    errors[sample["error"]] = errors.get(sample["error"], 0) + 1
+
+            summary = {
+                "requests": len(group),
+                "errors": len(group) - len(ok),
+                "throughput_rps": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+                "p50_ms": _ms(percentile(latencies, 0.5)),
+                "p95_ms": _ms(percentile(latencies, 0.95)),
+                "p99_ms": _ms(percentile(latencies, 0.99)),
+                "max_ms": _ms(max(latencies, default=None)),
+            }
+            if ttfts:
+                summary.update({
+                    "ttft_p50_ms": _ms(percentile(ttfts, 0.5)),
+                    "ttft_p95_ms": _ms(percentile(ttfts, 0.95)),
+                    "ttft_p99_ms": _ms(percentile(ttfts, 0.99)),
+                })
+            if errors:
+                summary["error_types"] = dict(sorted(errors.items(), key=lambda item: -item[1])[:5])
+            return summary
+
+        operations = sorted({sample["operation"] for sample in samples})
+        return {
+            "users": self.users,
+            "elapsed_seconds": round(elapsed, 3),
+            "total": summarize(samples),
+            "operations": {
+                operation: summarize([s for s in samples if s["operation"] == operation])
+                for operation in operations
+            },
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['users']} users, {report['elapsed_seconds']:.1f}s")
+    header = f"{'operation':10} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+
+    rows = list(report["operations"].items()) + [("total", report["total"])]
+    for name, summary in rows:
+        print(
+            f"{name:10} {summary['requests']:>9} {summary['errors']:>7} {summary['throughput_rps']:>8.2f} "
+            f"{_fmt(summary['p50_ms']):>9} {_fmt(summary['p95_ms']):>9} {_fmt(summary['p99_ms']):>9}"
+        )
+
+    generate = report["operations"].get("generate", {})
+    if "ttft_p50_ms" in generate:
+        print(
+            f"\nTime to first token: p50 {_fmt(generate['ttft_p50_ms'])} ms, "
+            f"p95 {_fmt(generate['ttft_p95_ms'])} ms, p99 {_fmt(generate['ttft_p99_ms'])} ms"
+        )
+    for name, summary in rows:
+        for error, count in summary.get("error_types", {}).items():
+            if name != "total":
+                print(f"  {name}: {count} x {error}")
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the ProsePilot AI clients against stand-in services")
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run after ramp-up")
+    parser.add_argument("--requests", type=int, default=None, help="stop after this many requests in total")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which users join")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("generate=3,connect=1,publish=1"),
+                        help="operation weights (default generate=3,connect=1,publish=1)")
+    parser.add_argument("--max-length", type=int, default=400, help="word limit of generations")
+    parser.add_argument("--target", metavar="URL",
+                        help="base URL of a running stand-in; by default one is started in-process")
+    parser.add_argument("--openai-latency", type=LatencyModel.parse, default=LatencyModel.parse("lognormal:0.4,0.5"))
+    parser.add_argument("--token-interval", type=float, default=0.005)
+    parser.add_argument("--hashnode-latency", type=LatencyModel.parse, default=LatencyModel.parse("lognormal:0.15,0.4"))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    import openai
+
+    services = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+    else:
+        services = FakeServices(
+            openai_service=FakeOpenAIService(completion_words=args.max_length),
+            openai_faults=FaultProfile(args.openai_latency, args.error_rate, args.rate_limit_rate,
+                                       args.retry_after, args.token_interval),
+            hashnode_faults=FaultProfile(args.hashnode_latency, args.error_rate, args.rate_limit_rate,
+                                         args.retry_after),
+            seed=args.seed,
+        ).start()
+        base_url = services.url
+
+    openai.base_url = f"{base_url}/v1/"
+    generator = LoadGenerator(
+        users=args.users,
+        duration=args.duration,
+        mix=args.mix,
+        hashnode_url=f"{base_url}/graphql",
+        max_requests=args.requests,
+        think_time=args.think_time,
+        ramp_up=args.ramp_up,
+        max_length=args.max_length,
+    )
+
+    try:
+        report = generator.run()
+    finally:
+        if services is not None:
+            services.stop()
+
+    _print_report(report)
+    if services is not None:
+        report["served"] = services.stats()
+        print(f"\nStand-in outcomes: {report['served']}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
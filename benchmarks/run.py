@@ -0,0 +1,82 @@
+"""
+Run the benchmark suite, save a JSON baseline, or compare against one.
+
+    python -m benchmarks.run --save benchmarks/baselines/local.json
+    python -m benchmarks.run --compare benchmarks/baselines/local.json --threshold 0.2
+
+Comparing exits with status 1 when any case regressed beyond the threshold.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.suite import compare, run_suite
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)
+
+
+def _save(path: str, report: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as baseline_file:
+        json.dump(report, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+
+def _print_comparison(rows: List[Dict[str, Any]], threshold: float) -> None:
+    print(f"\nComparison (threshold {threshold:.0%}):")
+    for row in rows:
+        if row["status"] == "new":
+            print(f"  {row['name']:48} {'':>12} -> {row['current_ms']:>12.3f} ms  new")
+            continue
+        print(
+            f"  {row['name']:48} {row['baseline_ms']:>12.3f} -> {row['current_ms']:>12.3f} ms"
+            f"  {row['change']:+.1%}  {row['status']}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ProsePilot AI offline benchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (default 0.2)")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many milliseconds")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="fixed fake service latency in seconds (default 0.05)")
+    parser.add_argument("--quick", action="store_true", help="skip the 50k-word documents, shorter runs")
+    parser.add_argument("--only", metavar="TEXT", help="only run cases whose name contains TEXT")
+    args = parser.parse_args(argv)
+
+    baseline = _load(args.compare) if args.compare else None
+    report = run_suite(quick=args.quick, latency=args.latency, only=args.only)
+
+    if args.save:
+        _save(args.save, report)
+        print(f"\nSaved baseline to {args.save}")
+
+    if baseline is None:
+        return 0
+
+    if baseline.get("environment", {}).get("platform") != report["environment"]["platform"]:
+        print("\nWarning: the baseline was recorded on a different platform")
+
+    rows = compare(baseline, report, args.threshold, args.noise_floor_ms)
+    _print_comparison(rows, args.threshold)
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Benchmark cases for the RAG, content analysis and client hot paths"""
+
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DOCUMENT_SIZES = [100, 1_000, 10_000, 50_000]  # words
+QUICK_DOCUMENT_SIZES = [100, 1_000, 10_000]
+
+VOCABULARY = (
+    "python javascript api database testing performance security cloud docker "
+    "kubernetes react frontend backend deployment tutorial guide example code "
+    "function service request response cache latency model data pipeline user "
+    "application framework library developer production monitoring error build "
+    "the a and of to in for with on is that this we you it can how when"
+).split()
+
+
+def synthetic_document(words: int, seed: int = 0) -> str:
+    """
+    Deterministic markdown of about the given number of words, with the
+    headings, lists, links and code blocks generated articles contain.
+    """
+    rng = random.Random(seed + words)
+    parts = ["# " + " ".join(rng.choice(VOCABULARY).title() for _ in range(5)), ""]
+    count = 5
+
+    while count < words:
+        if rng.random() < 0.1:
+            parts.append("## " + " ".join(rng.choice(VOCABULARY).title() for _ in range(4)))
+            count += 4
+        elif rng.random() < 0.1:
+            parts.extend(f"- {' '.join(rng.choices(VOCABULARY, k=6))}" for _ in range(3))
+            count += 18
+        elif rng.random() < 0.05:
+            parts.extend(["```python", "def handler(request):", "    return response", "```"])
+            count += 4
+        else:
+            sentences = []
+            for _ in range(rng.randint(2, 5)):
+                sentence = rng.choices(VOCABULARY, k=rng.randint(8, 18))
+                sentences.append(" ".join(sentence).capitalize() + ".")
+                count += len(sentence)
+            if rng.random() < 0.2:
+                sentences.append("See [the docs](https://example.com/docs) for details.")
+                count += 6
+            parts.append(" ".join(sentences))
+        parts.append("")
+
+    return "\n".join(parts)
+
+
+def measure(
+    func: Callable[[], Any],
+    min_runs: int = 5,
+    max_runs: int = 200,
+    min_time: float = 0.5,
+) -> Dict[str, Any]:
+    """Time func after one warm-up call, for at least min_runs and min_time seconds"""
+    func()
+
+    samples: List[float] = []
+    started_at = time.perf_counter()
+    while len(samples) < max_runs and (
+        len(samples) < min_runs or time.perf_counter() - started_at < min_time
+    ):
+        call_started_at = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - call_started_at) * 1000)
+
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "min_ms": round(samples[0], 4),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Where the numbers were taken; baselines only compare well on the same machine"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def _hot_path_cases(sizes: List[int]) -> List[Tuple[str, Callable[[], Any]]]:
+    from api.openai_client import EnhancedOpenAIClient
+    from knowledge.rag_system import get_rag_system
+
+    rag_system = get_rag_system()
+    client = EnhancedOpenAIClient(api_key="benchmark")
+
+    cases = []
+    for size in sizes:
+        document = synthetic_document(size)
+        cases.extend([
+            (f"rag.build_context_prompt[{size}w]",
+             lambda d=document: rag_system.build_context_prompt("Blog Post", "Professional", d)),
+            (f"rag.extract_topic_keywords[{size}w]",
+             lambda d=document: rag_system._extract_topic_keywords(d)),
+            (f"analysis.get_content_analysis[{size}w]",
+             lambda d=document: client.get_content_analysis(d, "Blog Post")),
+        ])
+    return cases
+
+
+def _client_cases(latency: float) -> Tuple[List[Tuple[str, Callable[[], Any]]], Callable[[], None]]:
+    """End-to-end client calls against the fake services; returns the cases and a cleanup"""
+    import openai
+    from api.hashnode_client import HashnodeClient
+    from api.http_transport import HttpTransport
+    from api.openai_client import EnhancedOpenAIClient
+    from benchmarks.fake_services import FakeOpenAIService, FakeServices
+
+    services = FakeServices(latency=latency, openai_service=FakeOpenAIService(completion_words=300)).start()
+    openai.base_url = services.openai_base_url
+
+    client = EnhancedOpenAIClient(api_key="benchmark")
+    sdk = openai.OpenAI(api_key="benchmark", base_url=services.openai_base_url)
+    hashnode = HashnodeClient("benchmark", transport=HttpTransport())
+    hashnode.graphql_url = services.hashnode_url
+
+    messages = client._build_messages("Building fast Python APIs", "Blog Post", "Professional", 400)
+
+    def sdk_stream():
+        stream = sdk.chat.completions.create(
+            model="gpt-3.5-turbo", messages=messages, max_tokens=700, stream=True,
+            stream_options={"include_usage": True})
+        return "".join(c.choices[0].delta.content or "" for c in stream if c.choices)
+
+    cases = [
+        ("client.openai_sdk_stream", sdk_stream),
+        ("client.generate_content", lambda: client.generate_content(
+            "Building fast Python APIs", "Blog Post", "Professional", 400,
+            "gpt-3.5-turbo", 0.7, use_cache=False)),
+        ("client.hashnode_connect", hashnode.connect),
+        ("client.hashnode_submit_draft", lambda: hashnode.submit_draft(
+            "Benchmark draft", "Draft body", publication_id="pub0")),
+    ]
+
+    def cleanup():
+        sdk.close()
+        services.stop()
+        openai.base_url = None
+
+    return cases, cleanup
+
+
+def run_suite(
+    quick: bool = False,
+    latency: float = 0.05,
+    only: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Any]:
+    """Run every case and return {"environment", "settings", "results"}"""
+    sizes = QUICK_DOCUMENT_SIZES if quick else DOCUMENT_SIZES
+    min_time = 0.2 if quick else 0.5
+
+    cases = _hot_path_cases(sizes)
+    client_cases, cleanup = _client_cases(latency)
+    cases.extend(client_cases)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name, func in cases:
+            if only and only not in name:
+                continue
+            results[name] = measure(func, min_time=min_time)
+            log(f"{name:48} {results[name]['median_ms']:>12.3f} ms  (p95 {results[name]['p95_ms']:.3f}, {results[name]['runs']} runs)")
+    finally:
+        cleanup()
+
+    # Client overhead: our call minus a bare SDK call to the same fake
+    sdk = results.get("client.openai_sdk_stream")
+    generate = results.get("client.generate_content")
+    if sdk and generate:
+        results["client.generate_content_overhead"] = {
+            "runs": generate["runs"],
+            "median_ms": round(max(0.0, generate["median_ms"] - sdk["median_ms"]), 4),
+        }
+        log(f"{'client.generate_content_overhead':48} {results['client.generate_content_overhead']['median_ms']:>12.3f} ms")
+
+    return {
+        "environment": environment(),
+        "settings": {"quick": quick, "latency_seconds": latency, "argv": sys.argv[1:]},
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.2,
+    noise_floor_ms: float = 0.05,
+) -> List[Dict[str, Any]]:
+    """
+    Compare median timings case by case. A case regresses when it is more
+    than threshold slower and by more than noise_floor_ms in absolute terms,
+    so sub-microsecond jitter on fast cases is not reported.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append({"name": name, "status": "new", "current_ms": result["median_ms"]})
+            continue
+
+        base_ms, current_ms = base["median_ms"], result["median_ms"]
+        ratio = current_ms / base_ms if base_ms else float("inf")
+        delta = current_ms - base_ms
+
+        status = "ok"
+        if ratio > 1 + threshold and delta > noise_floor_ms:
+            status = "regression"
+        elif ratio < 1 - threshold and -delta > noise_floor_ms:
+            status = "improvement"
+
+        rows.append({
+            "name": name,
+            "status": status,
+            "baseline_ms": base_ms,
+            "current_ms": current_ms,
+            "change": round(ratio - 1, 4),
+        })
+    return rows
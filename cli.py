@@ -0,0 +1,269 @@
+"""
+Headless command line for ProsePilot AI: generate, analyze and publish
+articles without the Streamlit UI, e.g. from cron.
+
+    python cli.py generate --prompt "Building fast Python APIs" --output-dir articles/
+    python cli.py generate --input prompts.jsonl --workers 8 --output-dir articles/ --manifest articles/results.jsonl
+    python cli.py analyze articles/*.md --content-type "Blog Post"
+    python cli.py publish articles/*.md --workers 2 --publication-id <id>
+
+Progress goes to stderr; results (articles, analyses) go to stdout or files.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import (
+    BATCH_MAX_RETRIES,
+    BATCH_REQUESTS_PER_MINUTE,
+    DEFAULT_CONTENT_TYPE,
+    DEFAULT_MODEL,
+    DEFAULT_TEMPERATURE,
+    DEFAULT_TONE,
+    HASHNODE_API_KEY,
+    HASHNODE_PUBLICATION_ID,
+    OPENAI_API_KEY,
+    PUBLISH_QUEUE_PATH,
+    PUBLISH_REQUESTS_PER_MINUTE,
+)
+from models.content import BatchRequest
+
+PUBLISH_POLL_INTERVAL = 1.0  # seconds between job status checks
+
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def slugify(text: str, max_length: int = 60) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+    return slug[:max_length].rstrip("-") or "article"
+
+
+def write_file(path: str, text: str) -> None:
+    """Write via a temporary file, so readers never see a half-written article"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as output_file:
+        output_file.write(text)
+    os.replace(temp_path, path)
+
+
+def extract_title(markdown: str, fallback: str) -> str:
+    """The first top-level heading, or the fallback"""
+    match = re.search(r"^#\s+(.+?)\s*#*\s*$", markdown, re.MULTILINE)
+    return match.group(1) if match else fallback
+
+
+def _generate(args) -> int:
+    from api.batch_generator import BatchGenerator, load_batch_requests
+
+    requests: List[BatchRequest] = [
+        BatchRequest(
+            prompt=prompt,
+            content_type=args.content_type,
+            tone=args.tone,
+            max_length=args.max_length,
+            model=args.model,
+            temperature=args.temperature,
+        )
+        for prompt in args.prompt or []
+    ]
+    if args.input:
+        requests.extend(load_batch_requests(args.input))
+    if not requests:
+        log("Nothing to generate: pass --prompt or --input")
+        return 2
+
+    api_key = args.api_key or OPENAI_API_KEY
+    if not api_key:
+        log("No OpenAI API key: set OPENAI_API_KEY or pass --api-key")
+        return 2
+
+    generator = BatchGenerator(
+        api_key,
+        max_concurrency=args.workers,
+        requests_per_minute=args.rpm,
+        max_retries=args.retries,
+    )
+    manifest = None
+    if args.manifest:
+        os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+        manifest = open(args.manifest, "a", encoding="utf-8")
+
+    async def run() -> Dict[str, int]:
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+        async for record in generator.generate(requests):
+            summary["total"] += 1
+            position = f"[{summary['total']}/{len(requests)}]"
+
+            if record["error"]:
+                summary["failed"] += 1
+                log(f"{position} failed: {record['prompt'][:60]!r}: {record['error']}")
+            else:
+                summary["succeeded"] += 1
+                record["path"] = _emit_article(args.output_dir, record)
+                words = len(record["content"].split())
+                log(f"{position} {record['path'] or 'stdout'} ({words} words, {record['duration']}s)")
+
+            if manifest:
+                # Articles live in their own files; the manifest only points at them
+                entry = {key: value for key, value in record.items() if key != "content"}
+                manifest.write(json.dumps(entry) + "\n")
+                manifest.flush()
+        return summary
+
+    started_at = time.perf_counter()
+    try:
+        summary = asyncio.run(run())
+    finally:
+        if manifest:
+            manifest.close()
+
+    log(
+        f"Generated {summary['succeeded']} of {summary['total']} article(s) "
+        f"in {time.perf_counter() - started_at:.1f}s with {args.workers} worker(s)"
+    )
+    return 1 if summary["failed"] else 0
+
+
+def _emit_article(output_dir: Optional[str], record: Dict[str, Any]) -> Optional[str]:
+    """Write one finished article to its own file, or to stdout without an output dir"""
+    if not output_dir:
+        sys.stdout.write(record["content"].rstrip() + "\n\n")
+        sys.stdout.flush()
+        return None
+
+    path = os.path.join(output_dir, f"{record['index'] + 1:04d}-{slugify(record['prompt'])}.md")
+    write_file(path, record["content"])
+    return path
+
+
+def _analyze(args) -> int:
+    from api.openai_client import EnhancedOpenAIClient
+
+    # Analysis is local; no API key or network is needed
+    client = EnhancedOpenAIClient()
+    status = 0
+
+    for path in args.files:
+        try:
+            with open(path, "r", encoding="utf-8") as article_file:
+                content = article_file.read()
+        except OSError as e:
+            log(f"Could not read {path}: {e}")
+            status = 1
+            continue
+
+        analysis = client.get_content_analysis(content, args.content_type)
+        print(json.dumps({"path": path, "analysis": analysis}, indent=2 if args.pretty else None))
+        log(f"{path}: overall quality {analysis['overall_quality']}/100")
+
+    return status
+
+
+def _publish(args) -> int:
+    from api.publish_queue import PublishQueue
+
+    api_key = args.api_key or HASHNODE_API_KEY
+    publication_id = args.publication_id or HASHNODE_PUBLICATION_ID
+    if not api_key or not publication_id:
+        log("Publishing needs HASHNODE_API_KEY and HASHNODE_PUBLICATION_ID (or --api-key and --publication-id)")
+        return 2
+
+    # The durable queue makes reruns safe: a draft already created is not created again
+    queue = PublishQueue(
+        path=args.queue,
+        workers=args.workers,
+        requests_per_minute=args.rpm,
+    )
+
+    # Identical drafts share one job, so a job may stand for several files
+    jobs: Dict[int, List[str]] = {}
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as article_file:
+            content = article_file.read()
+        title = extract_title(content, os.path.splitext(os.path.basename(path))[0])
+        job = queue.enqueue(api_key, title, content, tags=args.tag_id, publication_id=publication_id)
+        jobs.setdefault(job["id"], []).append(path)
+
+    deadline = time.monotonic() + args.timeout
+    pending = dict(jobs)
+    failed = 0
+
+    while pending and time.monotonic() < deadline:
+        for job_id, paths in list(pending.items()):
+            job = queue.get_job(job_id)
+            path = ", ".join(paths)
+            if job["status"] == "succeeded":
+                log(f"{path}: draft {job['draft']['id']} ({job['draft'].get('slug')})")
+            elif job["status"] == "failed":
+                failed += 1
+                log(f"{path}: failed after {job['attempts']} attempt(s): {job['last_error']}")
+            else:
+                continue
+            del pending[job_id]
+
+        if pending:
+            time.sleep(PUBLISH_POLL_INTERVAL)
+
+    for paths in pending.values():
+        log(f"{', '.join(paths)}: still queued after {args.timeout:.0f}s; run again to resume")
+
+    log(f"Published {len(jobs) - failed - len(pending)} of {len(jobs)} draft(s)")
+    return 1 if failed or pending else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ProsePilot AI command line")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="generate articles")
+    generate.add_argument("--prompt", action="append", help="topic to write about (repeatable)")
+    generate.add_argument("--input", metavar="FILE", help="JSONL or CSV prompt file, as for batch generation")
+    generate.add_argument("--content-type", default=DEFAULT_CONTENT_TYPE)
+    generate.add_argument("--tone", default=DEFAULT_TONE)
+    generate.add_argument("--max-length", type=int, default=500, help="word limit")
+    generate.add_argument("--model", default=DEFAULT_MODEL)
+    generate.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE)
+    generate.add_argument("--workers", type=int, default=1, help="articles generated in parallel")
+    generate.add_argument("--rpm", type=int, default=BATCH_REQUESTS_PER_MINUTE, help="requests per minute")
+    generate.add_argument("--retries", type=int, default=BATCH_MAX_RETRIES)
+    generate.add_argument("--output-dir", help="write each article to its own markdown file as it finishes")
+    generate.add_argument("--manifest", metavar="FILE", help="append one JSON line per result")
+    generate.add_argument("--api-key", help="OpenAI API key (default: OPENAI_API_KEY)")
+    generate.set_defaults(handler=_generate)
+
+    analyze = subparsers.add_parser("analyze", help="score markdown articles")
+    analyze.add_argument("files", nargs="+")
+    analyze.add_argument("--content-type", default=DEFAULT_CONTENT_TYPE)
+    analyze.add_argument("--pretty", action="store_true", help="indent the JSON output")
+    analyze.set_defaults(handler=_analyze)
+
+    publish = subparsers.add_parser("publish", help="create Hashnode drafts from markdown files")
+    publish.add_argument("files", nargs="+")
+    publish.add_argument("--publication-id", help="default: HASHNODE_PUBLICATION_ID")
+    publish.add_argument("--tag-id", action="append", help="Hashnode tag id (repeatable)")
+    publish.add_argument("--workers", type=int, default=1, help="drafts created in parallel")
+    publish.add_argument("--rpm", type=int, default=PUBLISH_REQUESTS_PER_MINUTE, help="requests per minute")
+    publish.add_argument("--queue", default=PUBLISH_QUEUE_PATH, help="publish queue database")
+    publish.add_argument("--timeout", type=float, default=900.0, help="seconds to wait for the drafts")
+    publish.add_argument("--api-key", help="Hashnode API key (default: HASHNODE_API_KEY)")
+    publish.set_defaults(handler=_publish)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,23 +6,132 @@ load_dotenv()
 
 # API Keys
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# More keys (comma-separated) pooled with OPENAI_API_KEY; see Provider Pool Settings
+OPENAI_API_KEYS = [key.strip() for key in os.getenv("OPENAI_API_KEYS", "").split(",") if key.strip()]
 HASHNODE_API_KEY = os.getenv("HASHNODE_API_KEY", "")
 HASHNODE_PUBLICATION_ID = os.getenv("HASHNODE_PUBLICATION_ID", "")
 
 # API Endpoints
-HASHNODE_GRAPHQL_URL = "https://gql.hashnode.com/"
+# Overridable to point at a local stand-in (see benchmarks/fake_services.py);
+# the OpenAI SDK reads OPENAI_BASE_URL itself
+HASHNODE_GRAPHQL_URL = os.getenv("PROSEPILOT_HASHNODE_URL", "https://gql.hashnode.com/")
+
+# Tag searches prefetched together with the account when connecting
+HASHNODE_COMMON_TAG_QUERIES = ["javascript", "python", "web development", "programming", "ai"]
+HASHNODE_ACCOUNT_TTL_SECONDS = 15 * 60  # refresh account data older than this
+
+# HTTP Transport Settings (Hashnode)
+HTTP_CONNECT_TIMEOUT = 5.0  # seconds
+HTTP_READ_TIMEOUT = 30.0  # seconds
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+HTTP_RETRY_MAX_DELAY = 10.0  # seconds
+HTTP_POOL_SIZE = 10
+
+# Tag Catalog Settings
+TAG_CACHE_TTL_SECONDS = 60 * 60  # 1 hour
+TAG_FAILURE_TTL_SECONDS = 30.0  # how long a failed tag search is not retried
+TAG_SEARCH_DEBOUNCE_SECONDS = 1.0  # minimum gap between upstream searches for the same query
+TAG_UPSTREAM_PAGE_SIZE = 20  # results per tagCategories page
+
+# Publish Queue Settings
+PUBLISH_QUEUE_PATH = os.getenv("PROSEPILOT_PUBLISH_QUEUE_PATH", ".cache/publish_queue.sqlite3")
+PUBLISH_WORKERS = 2
+PUBLISH_REQUESTS_PER_MINUTE = 20  # createDraft calls across all workers
+PUBLISH_MAX_ATTEMPTS = 5
+PUBLISH_RETRY_BASE_DELAY = 5.0  # seconds, doubled per attempt
+PUBLISH_RETRY_MAX_DELAY = 300.0  # seconds
 
 # Content Generation Settings
 DEFAULT_MODEL = "gpt-3.5-turbo"
 DEFAULT_TEMPERATURE = 0.7
-DEFAULT_MAX_TOKENS = 2000
+DEFAULT_MAX_TOKENS = 2000  # completion budget when no word limit is given
+TOKENS_PER_WORD = 1.35  # typical English prose, including punctuation
+COMPLETION_HEADROOM = 1.25  # markdown syntax and slack above the word limit
+COMPLETION_OVERHEAD_TOKENS = 50
 DEFAULT_TONE = "Professional"
 DEFAULT_CONTENT_TYPE = "Blog Post"
+WORD_LIMIT_GRACE_RATIO = 0.1  # streamed output may run this far past max_length before it is cut off
+WORD_LIMIT_GRACE_MIN_WORDS = 15
+STREAM_RENDER_INTERVAL = 0.05  # seconds between live re-renders while streaming
+
+# Batch Generation Settings
+BATCH_MAX_CONCURRENCY = 8  # max in-flight OpenAI requests per batch
+BATCH_REQUESTS_PER_MINUTE = 60  # request pacing per pooled key, to stay under provider limits
+BATCH_MAX_RETRIES = 3
+BATCH_RETRY_BASE_DELAY = 2.0  # seconds, doubled per attempt
+
+# Provider Pool Settings
+# A model may fall back to these while it is throttled on every key
+OPENAI_FALLBACK_MODELS = {
+    "gpt-4.1": ["gpt-4.1-mini"],
+    "gpt-3.5-turbo": ["gpt-4o-mini"],
+}
+POOL_MAX_WAIT_SECONDS = 2.0  # wait this long for the requested model before falling back
+POOL_ATTEMPTS_PER_ROUTE = 2  # tries per key and model within one call
+POOL_DEFAULT_COOLDOWN = 1.0  # seconds a key rests after a 429 without Retry-After
+POOL_RETRY_BASE_DELAY = 0.2  # seconds before retrying a 5xx or timeout, doubled per attempt
+POOL_MAX_USER_KEYS = 64  # user-supplied keys whose clients and limits are kept, least recently used evicted
+OPENAI_TIMEOUT_SECONDS = 60.0  # per connect, and per read while streaming
+
+# Tail Latency Settings
+# A generation whose first token is later than most recent ones gets a hedged
+# duplicate request; whichever answers first is used and the other cancelled
+HEDGE_ENABLED = True
+HEDGE_PERCENTILE = 0.95  # hedge once the wait passes this percentile of recent time-to-first-token
+HEDGE_MIN_SAMPLES = 20  # recent samples needed before the deadline adapts
+HEDGE_INITIAL_DELAY = 4.0  # seconds, used until then
+HEDGE_MIN_DELAY = 0.25  # seconds
+HEDGE_MAX_DELAY = 15.0  # seconds
+# Retries and hedges together may add this share of recent requests, plus a floor
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MIN_PER_SECOND = 1.0
+RETRY_BUDGET_WINDOW_SECONDS = 10.0
+
+# Generation Service Settings
+SERVICE_HOST = os.getenv("PROSEPILOT_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("PROSEPILOT_SERVICE_PORT", "8000"))
+SERVICE_MAX_CONCURRENT_GENERATIONS = 32  # upstream generations in flight; more requests wait
+SERVICE_MAX_CLIENTS = 64  # OpenAI clients kept per API key, least recently used evicted
+# Off by default: callers without key headers would otherwise spend the deployment's keys
+SERVICE_USE_SERVER_KEYS = os.getenv("PROSEPILOT_SERVICE_USE_SERVER_KEYS", "").lower() in ("1", "true", "yes")
+
+# Response Cache Settings
+CACHE_ENABLED = True
+CACHE_PATH = os.getenv("PROSEPILOT_CACHE_PATH", ".cache/generations.sqlite3")
+CACHE_MAX_ENTRIES = 500
+CACHE_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # 7 days
+
+# Single-Flight Settings
+# Identical generations and Hashnode lookups already in flight are joined, not repeated
+SINGLE_FLIGHT_ENABLED = True
+
+# Conversation History Settings
+HISTORY_PATH = os.getenv("PROSEPILOT_HISTORY_PATH", ".cache/history.sqlite3")
+HISTORY_PAGE_SIZE = 10
+HISTORY_PREVIEW_LENGTH = 300  # characters of each response shown before expanding
+
+# Memory Accounting Settings
+MEMORY_SESSION_TTL_SECONDS = 60 * 60  # sessions idle longer than this drop out of the report
 
 # RAG Settings
 RAG_ENABLED = True
-RAG_MAX_CONTEXT_LENGTH = 2000
-RAG_SIMILARITY_THRESHOLD = 0.7
+RAG_MAX_CONTEXT_LENGTH = 2000  # token budget for the retrieved context
+RAG_SIMILARITY_THRESHOLD = 0.7  # minimum BM25 score relative to the best match
+RAG_TOP_K = 5
+
+# Telemetry Settings
+TELEMETRY_LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]  # seconds
+TELEMETRY_WINDOW_SECONDS = 15 * 60  # percentiles cover this rolling window
+TELEMETRY_EXPORT_PATH = os.getenv("PROSEPILOT_METRICS_PATH", ".cache/metrics.json")
+# USD per 1M tokens: (input, cached input, output)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
 
 # UI Settings
 PAGE_TITLE = "ProsePilot AI"
@@ -272,3 +272,65 @@ SEO_KEYWORDS = {
         "knowledge", "expertise", "fundamentals", "basics"
     ]
 }
+
+
+# Topic terms mapped to the SEO keywords they suggest
+TOPIC_KEYWORDS = {
+    # Technology-related keywords
+    "python": ["python programming", "python development", "python tutorial", "python guide"],
+    "javascript": ["javascript", "js", "web development", "frontend"],
+    "react": ["react js", "react development", "react tutorial", "react guide"],
+    "ai": ["artificial intelligence", "machine learning", "AI development", "ML"],
+    "web": ["web development", "website", "web design", "frontend", "backend"],
+    "api": ["API development", "REST API", "GraphQL", "web services"],
+    "database": ["database design", "SQL", "NoSQL", "data management"],
+    "cloud": ["cloud computing", "AWS", "Azure", "cloud deployment"],
+    "mobile": ["mobile development", "app development", "iOS", "Android"],
+    "data": ["data science", "data analysis", "big data", "analytics"],
+
+    # Business and productivity keywords
+    "productivity": ["productivity tips", "efficiency", "workflow", "time management"],
+    "marketing": ["digital marketing", "content marketing", "SEO", "social media"],
+    "business": ["business strategy", "entrepreneurship", "startup", "growth"],
+    "design": ["UI design", "UX design", "graphic design", "design principles"],
+    "project": ["project management", "agile", "scrum", "team collaboration"],
+    "career": ["career development", "professional growth", "job search", "skills"],
+
+    # Content and writing keywords
+    "writing": ["content writing", "copywriting", "blog writing", "technical writing"],
+    "seo": ["SEO optimization", "search engine optimization", "keyword research"],
+    "content": ["content creation", "content strategy", "content marketing"],
+    "blog": ["blogging", "blog post", "blogger", "blog strategy"],
+    "social": ["social media", "social media marketing", "engagement", "audience"]
+}
+
+# Topic terms that trigger extra writing guidance
+TOPIC_GUIDANCE = {
+    "technology": {
+        "terms": ["python", "javascript", "react", "api", "programming", "code"],
+        "guidance": [
+            "Include practical code examples and explanations",
+            "Reference official documentation and best practices",
+            "Consider different skill levels of readers",
+            "Mention version compatibility and requirements"
+        ]
+    },
+    "business": {
+        "terms": ["productivity", "business", "marketing", "strategy"],
+        "guidance": [
+            "Include actionable strategies and frameworks",
+            "Use data and statistics to support points",
+            "Provide real-world examples and case studies",
+            "Focus on measurable outcomes and ROI"
+        ]
+    },
+    "tutorial": {
+        "terms": ["how to"],
+        "guidance": [
+            "Break down complex processes into simple steps",
+            "Include prerequisites and required tools",
+            "Add troubleshooting tips for common issues",
+            "Provide next steps for further learning"
+        ]
+    }
+}
@@ -1,30 +1,124 @@
 """RAG (Retrieval-Augmented Generation) system for ProsePilot AI"""
 
-from typing import List, Dict, Any
-from .content_knowledge import WRITING_GUIDELINES, TONE_GUIDELINES, CONTENT_EXAMPLES, SEO_KEYWORDS
+import copy
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from config.settings import (
+    DEFAULT_CONTENT_TYPE,
+    RAG_MAX_CONTEXT_LENGTH,
+    RAG_SIMILARITY_THRESHOLD,
+    RAG_TOP_K,
+)
+from utils.telemetry import timed
+from utils.token_budget import ContextSection, fit_sections
+from .content_knowledge import (
+    WRITING_GUIDELINES, TONE_GUIDELINES, CONTENT_EXAMPLES, SEO_KEYWORDS,
+    TOPIC_GUIDANCE, TOPIC_KEYWORDS
+)
+from .retrieval_index import Passage, RetrievalIndex
+from .topic_matcher import TopicMatcher
+
+# Which context sections survive a tight token budget (lower is kept longer)
+SECTION_PRIORITIES = {
+    "STRUCTURE": 0,
+    "TONE CHARACTERISTICS": 1,
+    "BEST PRACTICES": 2,
+    "TOPIC-SPECIFIC GUIDANCE": 3,
+    "RELEVANT KEYWORDS": 4,
+    "AVOID": 5,
+    "SEO OPTIMIZATION": 6,
+    "RELEVANT GUIDANCE": 7,
+    "HASHNODE OPTIMIZATION": 8,
+}
+
+
+def _section(title: str, text: str) -> ContextSection:
+    return ContextSection.create(text, SECTION_PRIORITIES[title])
 
 
 class RAGSystem:
     """
     RAG implementation using keyword matching and content relevance.
-    Can be enhanced later with vector embeddings for more sophisticated retrieval.
+    Guideline passages are retrieved with a BM25 index over the knowledge base.
     """
 
     def __init__(self):
+        self._lock = threading.Lock()
         self.knowledge_base = self._build_knowledge_base()
+        self.knowledge_version = 0
+        self.retrieval_index = RetrievalIndex.from_knowledge_base(
+            self.knowledge_base)
+        self._static_context: Dict[Tuple[str, str], Tuple[ContextSection, ...]] = {}
+        # compiled once: keyword terms plus the guidance trigger terms
+        self.topic_matcher = TopicMatcher({
+            "keywords": TOPIC_KEYWORDS.keys(),
+            **{group: rule["terms"] for group, rule in TOPIC_GUIDANCE.items()}
+        })
 
     def _build_knowledge_base(self) -> Dict[str, Any]:
         """Build searchable knowledge base from content guidelines"""
-        return {
+        # Copied so runtime updates never mutate the module-level guidelines
+        return copy.deepcopy({
             "writing_guidelines": WRITING_GUIDELINES,
             "tone_guidelines": TONE_GUIDELINES,
             "content_examples": CONTENT_EXAMPLES,
             "seo_keywords": SEO_KEYWORDS
-        }
+        })
+
+    def update_knowledge(self, section: str, key: str, value: Any) -> None:
+        """Add or replace a knowledge base entry and invalidate derived state"""
+        if section not in self.knowledge_base:
+            raise KeyError(f"Unknown knowledge base section: {section}")
+
+        with self._lock:
+            self.knowledge_base[section][key] = value
+            self._invalidate()
+
+    def reload_knowledge_base(self) -> None:
+        """Rebuild the knowledge base from the content guidelines modules"""
+        with self._lock:
+            self.knowledge_base = self._build_knowledge_base()
+            self._invalidate()
+
+    def _invalidate(self) -> None:
+        """Rebuild the retrieval index and drop precompiled context (lock held)"""
+        self.retrieval_index = RetrievalIndex.from_knowledge_base(
+            self.knowledge_base)
+        self._static_context = {}
+        self.knowledge_version += 1
+
+    def retrieve_relevant_passages(
+        self, query: str, k: int = RAG_TOP_K, sources: Optional[Iterable[str]] = None
+    ) -> List[Tuple[Passage, float]]:
+        """Retrieve the knowledge base passages most similar to the query"""
+        return self.retrieval_index.search(
+            query, k=k, threshold=RAG_SIMILARITY_THRESHOLD, sources=sources)
+
+    def resolve_content_type(self, content_type: str, topic: str = "") -> str:
+        """Map custom content types onto the closest known guideline set"""
+        if content_type in self.knowledge_base["writing_guidelines"]:
+            return content_type
+
+        matches = self.retrieve_relevant_passages(
+            f"{content_type} {topic}",
+            k=RAG_TOP_K * 2,
+            sources=["writing_guidelines", "content_examples"],
+        )
+
+        label_scores: Dict[str, float] = {}
+        for passage, score in matches:
+            label_scores[passage.label] = label_scores.get(
+                passage.label, 0.0) + score
+
+        if label_scores:
+            return max(label_scores, key=label_scores.get)
 
-    def retrieve_content_guidelines(self, content_type: str, tone: str) -> Dict[str, Any]:
+        return DEFAULT_CONTENT_TYPE
+
+    def retrieve_content_guidelines(self, content_type: str, tone: str, topic: str = "") -> Dict[str, Any]:
         """Retrieve specific guidelines for content type and tone"""
         guidelines = {}
+        content_type = self.resolve_content_type(content_type, topic)
 
         # Get content type specific guidelines
         if content_type in self.knowledge_base["writing_guidelines"]:
@@ -40,7 +134,10 @@ class RAGSystem:
 
         return guidelines
 
-    def retrieve_seo_keywords(self, content_type: str, topic: str) -> List[str]:
+    def retrieve_seo_keywords(
+        self, content_type: str, topic: str,
+        topic_matches: Optional[Dict[str, List[str]]] = None
+    ) -> List[str]:
         """Retrieve relevant SEO keywords based on content type and topic"""
         keywords = []
 
@@ -57,7 +154,8 @@ class RAGSystem:
                 self.knowledge_base["seo_keywords"]["content_creation"])
 
         # Topic-specific keyword enhancement
-        topic_keywords = self._extract_topic_keywords(topic.lower())
+        topic_keywords = self._extract_topic_keywords(
+            topic.lower(), topic_matches)
         keywords.extend(topic_keywords)
 
         # Remove duplicates while preserving order
@@ -70,54 +168,28 @@ class RAGSystem:
 
         return unique_keywords[:15]  # Return top 15 relevant keywords
 
-    def _extract_topic_keywords(self, topic: str) -> List[str]:
+    def match_topic(self, topic: str) -> Dict[str, List[str]]:
+        """Match every topic term group against the topic in one pass"""
+        return self.topic_matcher.match(topic)
+
+    def _extract_topic_keywords(
+        self, topic: str, topic_matches: Optional[Dict[str, List[str]]] = None
+    ) -> List[str]:
         """Extract and suggest keywords based on the topic content"""
         topic_keywords = []
 
-        # Technology-related keywords
-        tech_terms = {
-            'python': ['python programming', 'python development', 'python tutorial', 'python guide'],
-            'javascript': ['javascript', 'js', 'web development', 'frontend'],
-            'react': ['react js', 'react development', 'react tutorial', 'react guide'],
-            'ai': ['artificial intelligence', 'machine learning', 'AI development', 'ML'],
-            'web': ['web development', 'website', 'web design', 'frontend', 'backend'],
-            'api': ['API development', 'REST API', 'GraphQL', 'web services'],
-            'database': ['database design', 'SQL', 'NoSQL', 'data management'],
-            'cloud': ['cloud computing', 'AWS', 'Azure', 'cloud deployment'],
-            'mobile': ['mobile development', 'app development', 'iOS', 'Android'],
-            'data': ['data science', 'data analysis', 'big data', 'analytics']
-        }
-
-        # Business and productivity keywords
-        business_terms = {
-            'productivity': ['productivity tips', 'efficiency', 'workflow', 'time management'],
-            'marketing': ['digital marketing', 'content marketing', 'SEO', 'social media'],
-            'business': ['business strategy', 'entrepreneurship', 'startup', 'growth'],
-            'design': ['UI design', 'UX design', 'graphic design', 'design principles'],
-            'project': ['project management', 'agile', 'scrum', 'team collaboration'],
-            'career': ['career development', 'professional growth', 'job search', 'skills']
-        }
-
-        # Content and writing keywords
-        content_terms = {
-            'writing': ['content writing', 'copywriting', 'blog writing', 'technical writing'],
-            'seo': ['SEO optimization', 'search engine optimization', 'keyword research'],
-            'content': ['content creation', 'content strategy', 'content marketing'],
-            'blog': ['blogging', 'blog post', 'blogger', 'blog strategy'],
-            'social': ['social media', 'social media marketing', 'engagement', 'audience']
-        }
-
-        # Combine all term dictionaries
-        all_terms = {**tech_terms, **business_terms, **content_terms}
+        if topic_matches is None:
+            topic_matches = self.match_topic(topic)
 
         # Check topic against known terms
-        for key, keywords in all_terms.items():
-            if key in topic:
-                topic_keywords.extend(keywords)
+        for key in topic_matches.get("keywords", []):
+            topic_keywords.extend(TOPIC_KEYWORDS[key])
 
         # Extract important words from the topic itself
         topic_words = topic.split()
         for word in topic_words:
+            if len(topic_keywords) >= 10:
+                break  # long briefs would otherwise build keywords that are cut anyway
             if len(word) > 3:  # Only include meaningful words
                 topic_keywords.append(word)
                 topic_keywords.append(f"{word} guide")
@@ -132,94 +204,176 @@ class RAGSystem:
             content_type, {})
         return guidelines.get("hashnode_specific", [])
 
-    def build_context_prompt(self, content_type: str, tone: str, topic: str) -> str:
-        """Build enhanced context for content generation"""
-        guidelines = self.retrieve_content_guidelines(content_type, tone)
+    def build_context_prompt(
+        self, content_type: str, tone: str, topic: str,
+        max_tokens: Optional[int] = RAG_MAX_CONTEXT_LENGTH
+    ) -> str:
+        """Build enhanced context for content generation, within max_tokens (None: unbounded)"""
+        stable, variable = self.build_context_parts(content_type, tone, topic, max_tokens)
+        return "\n\n".join(part for part in (stable, variable) if part)
+
+    @timed("prosepilot_rag_build_seconds", "rag")
+    def build_context_parts(
+        self, content_type: str, tone: str, topic: str,
+        max_tokens: Optional[int] = RAG_MAX_CONTEXT_LENGTH
+    ) -> Tuple[str, str]:
+        """
+        Build the context split into the part shared by every request for this
+        content type and tone, and the topic-dependent remainder
+        """
+        guideline_type = self.resolve_content_type(content_type, topic)
+        topic_matches = self.match_topic(topic)
+
+        # Static sections depend only on (content type, tone) and are precompiled
+        static_sections = self.get_static_sections(guideline_type, tone)
+        sections = list(static_sections)
+
+        # Add relevant keywords (now topic-aware)
         seo_keywords = self.retrieve_seo_keywords(
-            content_type, topic)  # Now properly uses topic
+            guideline_type, topic, topic_matches)  # Now properly uses topic
+        if seo_keywords:
+            keyword_list = ", ".join(seo_keywords)
+            sections.append(_section(
+                "RELEVANT KEYWORDS",
+                f"RELEVANT KEYWORDS (incorporate naturally): {keyword_list}"))
+
+        # Add guidance retrieved from other content types and tones for this topic
+        relevant_guidance = self._get_relevant_guidance(
+            topic, guideline_type, tone)
+        if relevant_guidance:
+            sections.append(_section(
+                "RELEVANT GUIDANCE", f"RELEVANT GUIDANCE:\n{relevant_guidance}"))
+
+        # Add topic-specific guidance
+        topic_guidance = self._get_topic_specific_guidance(
+            topic, content_type, topic_matches)
+        if topic_guidance:
+            sections.append(_section(
+                "TOPIC-SPECIFIC GUIDANCE", f"TOPIC-SPECIFIC GUIDANCE:\n{topic_guidance}"))
+
+        # Over budget, the least important sections are trimmed or dropped first
+        kept = [section for section in fit_sections(sections, max_tokens) if section.text]
+
+        # The stable part ends at the first section that isn't an untouched static one
+        split = 0
+        while split < len(kept) and split < len(static_sections) and kept[split] is static_sections[split]:
+            split += 1
+
+        return (
+            "\n\n".join(section.text for section in kept[:split]),
+            "\n\n".join(section.text for section in kept[split:]),
+        )
+
+    def get_static_context(self, content_type: str, tone: str) -> str:
+        """Return the precompiled topic-independent context for a content type and tone"""
+        return "\n\n".join(
+            section.text for section in self.get_static_sections(content_type, tone)
+        )
+
+    def get_static_sections(self, content_type: str, tone: str) -> Tuple[ContextSection, ...]:
+        """Return the precompiled topic-independent sections, with their token estimates"""
+        key = (content_type, tone)
+        sections = self._static_context.get(key)
+
+        if sections is None:
+            version = self.knowledge_version
+            sections = self._compile_static_context(content_type, tone)
+            with self._lock:
+                # Don't cache sections compiled from a knowledge base that changed meanwhile
+                if version == self.knowledge_version:
+                    self._static_context[key] = sections
+
+        return sections
+
+    def _compile_static_context(self, content_type: str, tone: str) -> Tuple[ContextSection, ...]:
+        """Build the structure, best practice, tone, SEO and Hashnode sections"""
+        guidelines = self.retrieve_content_guidelines(content_type, tone)
         hashnode_tips = self.retrieve_hashnode_optimization(content_type)
 
         context_parts = []
 
         # Add content structure
         if "content_guidelines" in guidelines and "structure" in guidelines["content_guidelines"]:
-            context_parts.append(
-                f"STRUCTURE:\n{guidelines['content_guidelines']['structure']}")
+            context_parts.append(_section(
+                "STRUCTURE",
+                f"STRUCTURE:\n{guidelines['content_guidelines']['structure']}"))
 
         # Add best practices
         if "content_guidelines" in guidelines and "best_practices" in guidelines["content_guidelines"]:
             practices = "\n".join(
                 [f"- {practice}" for practice in guidelines["content_guidelines"]["best_practices"]])
-            context_parts.append(f"BEST PRACTICES:\n{practices}")
+            context_parts.append(_section(
+                "BEST PRACTICES", f"BEST PRACTICES:\n{practices}"))
 
         # Add tone guidelines
         if "tone_guidelines" in guidelines:
             tone_chars = "\n".join(
                 [f"- {char}" for char in guidelines["tone_guidelines"]["characteristics"]])
-            context_parts.append(f"TONE CHARACTERISTICS:\n{tone_chars}")
+            context_parts.append(_section(
+                "TONE CHARACTERISTICS", f"TONE CHARACTERISTICS:\n{tone_chars}"))
 
             tone_avoid = "\n".join(
                 [f"- {avoid}" for avoid in guidelines["tone_guidelines"]["avoid"]])
-            context_parts.append(f"AVOID:\n{tone_avoid}")
+            context_parts.append(_section("AVOID", f"AVOID:\n{tone_avoid}"))
 
         # Add SEO guidelines
         if "content_guidelines" in guidelines and "seo_tips" in guidelines["content_guidelines"]:
             seo_tips = "\n".join(
                 [f"- {tip}" for tip in guidelines["content_guidelines"]["seo_tips"]])
-            context_parts.append(f"SEO OPTIMIZATION:\n{seo_tips}")
+            context_parts.append(_section(
+                "SEO OPTIMIZATION", f"SEO OPTIMIZATION:\n{seo_tips}"))
 
         # Add Hashnode-specific tips
         if hashnode_tips:
             hashnode_formatted = "\n".join(
                 [f"- {tip}" for tip in hashnode_tips])
-            context_parts.append(
-                f"HASHNODE OPTIMIZATION:\n{hashnode_formatted}")
+            context_parts.append(_section(
+                "HASHNODE OPTIMIZATION", f"HASHNODE OPTIMIZATION:\n{hashnode_formatted}"))
+
+        return tuple(context_parts)
+
+    def _get_relevant_guidance(self, topic: str, content_type: str, tone: str) -> str:
+        """Retrieve topic-relevant passages not already covered by the selected guidelines"""
+        matches = self.retrieve_relevant_passages(
+            topic, sources=["writing_guidelines", "tone_guidelines"])
+
+        return "\n".join(
+            f"- {passage.text}"
+            for passage, _ in matches
+            if passage.label not in (content_type, tone) and passage.section != "structure"
+        )
+
+    def _get_topic_specific_guidance(
+        self, topic: str, content_type: str,
+        topic_matches: Optional[Dict[str, List[str]]] = None
+    ) -> str:
+        """Provide topic-specific writing guidance"""
+        if topic_matches is None:
+            topic_matches = self.match_topic(topic)
 
-        # Add relevant keywords (now topic-aware)
-        if seo_keywords:
-            keyword_list = ", ".join(seo_keywords)
-            context_parts.append(
-                f"RELEVANT KEYWORDS (incorporate naturally): {keyword_list}")
+        guidance_parts = []
+        for group, rule in TOPIC_GUIDANCE.items():
+            triggered = group in topic_matches
 
-        # Add topic-specific guidance
-        topic_guidance = self._get_topic_specific_guidance(topic, content_type)
-        if topic_guidance:
-            context_parts.append(f"TOPIC-SPECIFIC GUIDANCE:\n{topic_guidance}")
+            # Tutorial guidance also applies to tutorial/guide content types
+            if group == "tutorial" and content_type.lower() in ['tutorial', 'guide']:
+                triggered = True
 
-        return "\n\n".join(context_parts)
+            if triggered:
+                guidance_parts.extend(f"- {line}" for line in rule["guidance"])
 
-    def _get_topic_specific_guidance(self, topic: str, content_type: str) -> str:
-        """Provide topic-specific writing guidance"""
-        guidance_parts = []
+        return "\n".join(guidance_parts) if guidance_parts else ""
 
-        # Technology topics
-        if any(tech in topic.lower() for tech in ['python', 'javascript', 'react', 'api', 'programming', 'code']):
-            guidance_parts.append(
-                "- Include practical code examples and explanations")
-            guidance_parts.append(
-                "- Reference official documentation and best practices")
-            guidance_parts.append(
-                "- Consider different skill levels of readers")
-            guidance_parts.append(
-                "- Mention version compatibility and requirements")
-
-        # Business/productivity topics
-        if any(biz in topic.lower() for biz in ['productivity', 'business', 'marketing', 'strategy']):
-            guidance_parts.append(
-                "- Include actionable strategies and frameworks")
-            guidance_parts.append(
-                "- Use data and statistics to support points")
-            guidance_parts.append(
-                "- Provide real-world examples and case studies")
-            guidance_parts.append("- Focus on measurable outcomes and ROI")
-
-        # Tutorial/educational topics
-        if content_type.lower() in ['tutorial', 'guide'] or 'how to' in topic.lower():
-            guidance_parts.append(
-                "- Break down complex processes into simple steps")
-            guidance_parts.append("- Include prerequisites and required tools")
-            guidance_parts.append(
-                "- Add troubleshooting tips for common issues")
-            guidance_parts.append("- Provide next steps for further learning")
 
-        return "\n".join(guidance_parts) if guidance_parts else ""
+_shared_rag_system: Optional[RAGSystem] = None
+_shared_rag_system_lock = threading.Lock()
+
+
+def get_rag_system() -> RAGSystem:
+    """Return the process-wide RAG system shared by all sessions and reruns"""
+    global _shared_rag_system
+
+    with _shared_rag_system_lock:
+        if _shared_rag_system is None:
+            _shared_rag_system = RAGSystem()
+        return _shared_rag_system
@@ -0,0 +1,190 @@
+"""BM25 retrieval index over the writing knowledge base"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have in into is it its of on or
+    over so than that the their them then there these this to under up use
+    using was what when where which while with your you
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and fold plurals"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Light plural folding so "examples" matches "example"
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass(frozen=True)
+class Passage:
+    """A retrievable chunk of the knowledge base"""
+    text: str
+    source: str  # e.g. "writing_guidelines"
+    label: str  # content type, tone or keyword category
+    section: str  # e.g. "best_practices"
+
+
+def chunk_knowledge_base(knowledge_base: Dict[str, Any]) -> List[Passage]:
+    """Split the knowledge base into passages, one per guideline item"""
+    passages = []
+
+    for content_type, guidelines in knowledge_base["writing_guidelines"].items():
+        for section, value in guidelines.items():
+            if isinstance(value, str):
+                # Structures are numbered outlines; keep them whole
+                text = "\n".join(line.strip() for line in value.strip().splitlines())
+                passages.append(Passage(text, "writing_guidelines", content_type, section))
+            else:
+                passages.extend(
+                    Passage(item, "writing_guidelines", content_type, section)
+                    for item in value
+                )
+
+    for tone, guidelines in knowledge_base["tone_guidelines"].items():
+        for section, items in guidelines.items():
+            passages.extend(
+                Passage(item, "tone_guidelines", tone, section) for item in items
+            )
+
+    for content_type, examples in knowledge_base["content_examples"].items():
+        for example in examples:
+            text = "\n".join(f"{key}: {value}" for key, value in example.items())
+            passages.append(Passage(text, "content_examples", content_type, "example"))
+
+    for category, keywords in knowledge_base["seo_keywords"].items():
+        passages.append(
+            Passage(", ".join(keywords), "seo_keywords", category, "keywords")
+        )
+
+    return passages
+
+
+class RetrievalIndex:
+    """
+    Okapi BM25 index stored as a column-compressed term x passage weight matrix.
+    Weights are precomputed once, so a query only gathers the postings of its
+    own terms and accumulates them with a single vectorized bincount.
+    """
+
+    def __init__(self, passages: Sequence[Passage], k1: float = 1.5, b: float = 0.75):
+        self.passages = list(passages)
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self._build()
+
+    @classmethod
+    def from_knowledge_base(cls, knowledge_base: Dict[str, Any]) -> "RetrievalIndex":
+        """Build an index over every passage of the knowledge base"""
+        return cls(chunk_knowledge_base(knowledge_base))
+
+    def _build(self) -> None:
+        """Precompute BM25 term weights for every (term, passage) pair"""
+        postings: Dict[int, Dict[int, int]] = {}
+        lengths = np.zeros(len(self.passages), dtype=np.float32)
+
+        for doc_id, passage in enumerate(self.passages):
+            tokens = tokenize(f"{passage.label} {passage.text}")
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+                term_postings = postings.setdefault(term_id, {})
+                term_postings[doc_id] = term_postings.get(doc_id, 0) + 1
+
+        doc_count = len(self.passages)
+        avg_length = float(lengths.mean()) if doc_count else 0.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / max(avg_length, 1.0))
+
+        indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        doc_ids, weights = [], []
+
+        for term_id in range(len(self.vocabulary)):
+            term_postings = postings[term_id]
+            ids = np.fromiter(term_postings.keys(), dtype=np.int32)
+            tf = np.fromiter(term_postings.values(), dtype=np.float32)
+            idf = np.log(1 + (doc_count - len(ids) + 0.5) / (len(ids) + 0.5))
+
+            doc_ids.append(ids)
+            weights.append(idf * tf * (self.k1 + 1) / (tf + norm[ids]))
+            indptr[term_id + 1] = indptr[term_id] + len(ids)
+
+        self._indptr = indptr
+        self._doc_ids = np.concatenate(doc_ids) if doc_ids else np.zeros(0, np.int32)
+        self._weights = (
+            np.concatenate(weights).astype(np.float32)
+            if weights else np.zeros(0, np.float32)
+        )
+        self._source_codes: Dict[str, int] = {}
+        self._source_ids = np.array(
+            [
+                self._source_codes.setdefault(passage.source, len(self._source_codes))
+                for passage in self.passages
+            ],
+            dtype=np.int16,
+        )
+
+    def score(self, query: str) -> np.ndarray:
+        """Return the BM25 score of every passage for the query"""
+        term_ids = {
+            self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary
+        }
+        if not term_ids:
+            return np.zeros(len(self.passages), dtype=np.float32)
+
+        slices = [
+            np.arange(self._indptr[term_id], self._indptr[term_id + 1])
+            for term_id in term_ids
+        ]
+        positions = np.concatenate(slices)
+
+        return np.bincount(
+            self._doc_ids[positions],
+            weights=self._weights[positions],
+            minlength=len(self.passages),
+        )
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        threshold: float = 0.0,
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[Passage, float]]:
+        """
+        Return the top-k passages for the query. Scores are normalized to the
+        best match, and passages below the threshold are dropped.
+        """
+        scores = self.score(query)
+
+        if sources is not None:
+            codes = [self._source_codes[source] for source in sources if source in self._source_codes]
+            scores = np.where(np.isin(self._source_ids, codes), scores, 0.0)
+
+        best = float(scores.max()) if len(scores) else 0.0
+        if best <= 0 or k <= 0:
+            return []
+
+        scores = scores / best
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (self.passages[doc_id], float(scores[doc_id]))
+            for doc_id in top
+            if scores[doc_id] > 0 and scores[doc_id] >= threshold
+        ]
@@ -0,0 +1,51 @@
+"""Compiled multi-pattern matcher for topic term lookup"""
+
+import re
+from typing import Dict, Iterable, List, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class TopicMatcher:
+    """
+    Inverted phrase index over several named term groups. Terms match whole
+    words only (plus a plural "s"), so "ai" no longer matches "maintain", and
+    every group is matched in a single pass over the topic tokens.
+    """
+
+    def __init__(self, term_groups: Dict[str, Iterable[str]]):
+        self._group_terms: Dict[str, List[str]] = {}
+        self._phrases: Dict[Tuple[str, ...], List[Tuple[str, int]]] = {}
+        self._max_phrase_length = 1
+
+        for group, terms in term_groups.items():
+            self._group_terms[group] = list(terms)
+            for rank, term in enumerate(self._group_terms[group]):
+                phrase = tuple(WORD_PATTERN.findall(term.lower()))
+                if not phrase:
+                    continue
+
+                variants = [phrase]
+                if len(phrase) == 1:
+                    variants.append((phrase[0] + "s",))
+
+                for variant in variants:
+                    self._phrases.setdefault(variant, []).append((group, rank))
+                self._max_phrase_length = max(self._max_phrase_length, len(phrase))
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Return the matched terms of every group, in declaration order"""
+        tokens = WORD_PATTERN.findall(text.lower())
+        matched: Dict[str, set] = {}
+
+        for start in range(len(tokens)):
+            for length in range(1, self._max_phrase_length + 1):
+                if start + length > len(tokens):
+                    break
+                for group, rank in self._phrases.get(tuple(tokens[start:start + length]), ()):
+                    matched.setdefault(group, set()).add(rank)
+
+        return {
+            group: [self._group_terms[group][rank] for rank in sorted(ranks)]
+            for group, ranks in matched.items()
+        }
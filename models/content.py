@@ -1,15 +1,58 @@
+import zlib
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Dict, Optional
+from config.settings import (
+    DEFAULT_CONTENT_TYPE,
+    DEFAULT_MODEL,
+    DEFAULT_TEMPERATURE,
+    DEFAULT_TONE,
+)
+from utils.token_budget import estimate_tokens
+
+COMPRESSION_LEVEL = 6
+COMPRESSION_MIN_BYTES = 256  # shorter text doesn't shrink enough to be worth it
+
+
+class CompressedText:
+    """Text held zlib-compressed in memory and decompressed on every read"""
+    __slots__ = ("_data", "_compressed", "length")
+
+    def __init__(self, text: str):
+        data = text.encode("utf-8")
+        packed = zlib.compress(data, COMPRESSION_LEVEL) if len(data) >= COMPRESSION_MIN_BYTES else data
+        # Keep whichever is smaller; short text would only grow
+        self._compressed = len(packed) < len(data)
+        self._data = packed if self._compressed else data
+        self.length = len(text)
+
+    @property
+    def text(self) -> str:
+        data = zlib.decompress(self._data) if self._compressed else self._data
+        return data.decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held for the text itself"""
+        return len(self._data)
+
+    def __len__(self) -> int:
+        return self.length
 
 
-@dataclass
 class ContentItem:
-    """Model representing generated content"""
-    timestamp: str
-    prompt: str
-    content_type: str
-    tone: str
-    response: str
+    """
+    Model representing generated content. Slotted, with the response kept
+    compressed; it is only decompressed when .response is read.
+    """
+    __slots__ = ("timestamp", "prompt", "content_type", "tone", "_response")
+
+    def __init__(self, timestamp, prompt, content_type, tone, response):
+        self.timestamp = timestamp
+        self.prompt = prompt
+        self.content_type = content_type
+        self.tone = tone
+        self._response = CompressedText(response)
 
     @classmethod
     def create_from_generation(cls, prompt, content_type, tone, response):
@@ -21,3 +64,95 @@ class ContentItem:
             tone=tone,
             response=response
         )
+
+    @property
+    def response(self) -> str:
+        return self._response.text
+
+    @property
+    def response_length(self) -> int:
+        """Length of the response in characters, without decompressing it"""
+        return self._response.length
+
+    def to_dict(self) -> Dict[str, str]:
+        return {
+            "timestamp": self.timestamp,
+            "prompt": self.prompt,
+            "content_type": self.content_type,
+            "tone": self.tone,
+            "response": self.response,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, ContentItem):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return (
+            f"ContentItem(timestamp={self.timestamp!r}, prompt={self.prompt!r}, "
+            f"content_type={self.content_type!r}, tone={self.tone!r}, "
+            f"response=<{self.response_length} chars>)"
+        )
+
+
+@dataclass
+class GenerationMetrics:
+    """Model representing latency measurements for a single generation"""
+    model: str
+    streamed: bool = False
+    cache_hit: bool = False
+    coalesced: bool = False  # joined an identical generation already in flight
+    fallback_model: Optional[str] = None  # served by this model while the requested one was throttled
+    time_to_first_token: Optional[float] = None
+    total_duration: Optional[float] = None
+    chunk_count: int = 0
+    truncated: bool = False  # cut off at the word limit
+    # Token budget: local estimates next to what the API reported
+    max_tokens: Optional[int] = None
+    estimated_prompt_tokens: Optional[int] = None
+    estimated_completion_tokens: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_prompt_tokens: Optional[int] = None  # served from the provider's prefix cache
+
+    def record_usage(self, usage, content: str) -> None:
+        """Store API-reported usage (if any) and the local estimate for the output"""
+        self.estimated_completion_tokens = estimate_tokens(content)
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens
+            self.completion_tokens = usage.completion_tokens
+            details = getattr(usage, "prompt_tokens_details", None)
+            self.cached_prompt_tokens = getattr(details, "cached_tokens", None)
+
+
+@dataclass
+class BatchRequest:
+    """Model representing one row of a bulk generation job"""
+    prompt: str
+    content_type: str = DEFAULT_CONTENT_TYPE
+    tone: str = DEFAULT_TONE
+    max_length: int = 500
+    model: str = DEFAULT_MODEL
+    temperature: float = DEFAULT_TEMPERATURE
+
+    @classmethod
+    def from_row(cls, row):
+        """Create a batch request from a parsed JSONL object or CSV row"""
+        prompt = str(row.get("prompt") or "").strip()
+        if not prompt:
+            raise ValueError("Batch row is missing a prompt")
+
+        # CSV cells arrive as strings and may be blank, so fall back to defaults
+        return cls(
+            prompt=prompt,
+            content_type=row.get("content_type") or DEFAULT_CONTENT_TYPE,
+            tone=row.get("tone") or DEFAULT_TONE,
+            max_length=int(row.get("max_length") or 500),
+            model=row.get("model") or DEFAULT_MODEL,
+            temperature=float(
+                row["temperature"]
+                if row.get("temperature") not in (None, "")
+                else DEFAULT_TEMPERATURE
+            )
+        )
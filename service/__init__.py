@@ -0,0 +1 @@
+# Service package: async HTTP API in front of the shared clients
@@ -0,0 +1,22 @@
+"""Run the generation service: python -m service [--host HOST] [--port PORT]"""
+
+import argparse
+
+import uvicorn
+
+from config.settings import SERVICE_HOST, SERVICE_PORT
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="ProsePilot AI generation service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    # One process on purpose: its clients, caches and pools are what every user shares
+    uvicorn.run("service.app:app", host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Async HTTP service exposing generation, analysis and publishing as JSON
+endpoints. One process holds the clients, caches and connection pools for
+every user, so concurrent requests share them instead of each Streamlit
+session building its own.
+
+    POST /v1/generate          {"prompt", "content_type", "tone", "max_length", "model",
+                                "temperature", "stream", "use_cache", "analyze"}
+    POST /v1/analyze           {"content", "content_type"}
+    POST /v1/publish           {"title", "content", "tags", "publication_id", "subtitle"}
+    GET  /v1/publish           jobs queued with the caller's Hashnode key
+    GET  /v1/publish/{job_id}
+    GET  /metrics              Prometheus text
+    GET  /health
+
+Keys come from the X-OpenAI-Api-Key / X-Hashnode-Api-Key headers. Only with
+PROSEPILOT_SERVICE_USE_SERVER_KEYS set do requests without them fall back to
+the server's own OPENAI_API_KEY / HASHNODE_API_KEY.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import openai
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from api.hedging import get_hedger
+from api.openai_client import EnhancedOpenAIClient
+from api.provider_pool import ProviderPoolError, get_provider_pool
+from api.publish_queue import get_publish_queue
+from config.settings import (
+    HASHNODE_API_KEY,
+    HASHNODE_PUBLICATION_ID,
+    OPENAI_API_KEY,
+    SERVICE_MAX_CLIENTS,
+    SERVICE_MAX_CONCURRENT_GENERATIONS,
+    SERVICE_USE_SERVER_KEYS,
+)
+from knowledge.rag_system import get_rag_system
+from models.content import BatchRequest, GenerationMetrics
+from utils.retry_budget import get_retry_budget
+from utils.single_flight import single_flight_stats
+from utils.telemetry import get_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """
+    One EnhancedOpenAIClient per OpenAI key, so requests with the same key
+    share its async connection pool. Only touched from the event loop.
+
+    The least recently used client is evicted past max_clients and closed
+    once the last request using it has finished.
+    """
+
+    def __init__(self, max_clients: int = SERVICE_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients: "OrderedDict[str, EnhancedOpenAIClient]" = OrderedDict()
+        self._in_use: Dict[EnhancedOpenAIClient, int] = {}
+        self._evicted: Set[EnhancedOpenAIClient] = set()
+
+    @asynccontextmanager
+    async def use(self, api_key: str) -> AsyncIterator[EnhancedOpenAIClient]:
+        """Borrow the key's client for the length of one request"""
+        client = self._clients.get(api_key)
+        if client is None:
+            client = self._clients[api_key] = EnhancedOpenAIClient(api_key)
+            if len(self._clients) > self.max_clients:
+                _, evicted = self._clients.popitem(last=False)
+                self._evicted.add(evicted)
+                await self._close_if_idle(evicted)
+        self._clients.move_to_end(api_key)
+
+        self._in_use[client] = self._in_use.get(client, 0) + 1
+        try:
+            yield client
+        finally:
+            self._in_use[client] -= 1
+            if not self._in_use[client]:
+                del self._in_use[client]
+            await self._close_if_idle(client)
+
+    async def _close_if_idle(self, client: EnhancedOpenAIClient) -> None:
+        if client in self._evicted and client not in self._in_use:
+            self._evicted.discard(client)
+            await client.aclose()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose(self) -> None:
+        for client in [*self._clients.values(), *self._evicted]:
+            await client.aclose()
+        self._clients.clear()
+        self._evicted.clear()
+
+
+clients = ClientRegistry()
+generation_slots = asyncio.Semaphore(SERVICE_MAX_CONCURRENT_GENERATIONS)
+# Analysis is local, so one shared client serves every caller
+analysis_client: Optional[EnhancedOpenAIClient] = None
+
+
+def error_response(status: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse({"error": message}, status_code=status, headers=headers)
+
+
+def upstream_error_response(error: Exception) -> JSONResponse:
+    """Map an OpenAI failure onto the status a caller should act on"""
+    if isinstance(error, ProviderPoolError):
+        return error_response(429, str(error))
+    if isinstance(error, openai.RateLimitError):
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+        return error_response(429, f"OpenAI rate limit: {error}", {"Retry-After": retry_after} if retry_after else None)
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return error_response(504, f"OpenAI did not respond: {error}")
+    if isinstance(error, openai.AuthenticationError):
+        return error_response(401, f"OpenAI rejected the API key: {error}")
+    return error_response(502, f"OpenAI request failed: {error}")
+
+
+async def read_json(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise ValueError("Request body must be JSON")
+    if not isinstance(body, dict):
+        raise ValueError("Request body must be a JSON object")
+    return body
+
+
+def openai_key(request: Request) -> str:
+    return request.headers.get("x-openai-api-key") or (OPENAI_API_KEY if SERVICE_USE_SERVER_KEYS else "")
+
+
+async def generate(request: Request) -> Response:
+    try:
+        body = await read_json(request)
+        generation = BatchRequest.from_row(body)
+    except (ValueError, TypeError) as e:
+        return error_response(400, str(e))
+
+    api_key = openai_key(request)
+    if not api_key:
+        return error_response(401, "No OpenAI API key: send X-OpenAI-Api-Key")
+
+    options = {
+        "use_cache": bool(body.get("use_cache", True)),
+        "analyze": bool(body.get("analyze", True)),
+    }
+
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_generation(api_key, generation, options), media_type="application/x-ndjson")
+
+    metrics = GenerationMetrics(model=generation.model, streamed=True)
+    async with generation_slots, clients.use(api_key) as client:
+        try:
+            content = await client.agenerate_content(
+                generation.prompt, generation.content_type, generation.tone,
+                generation.max_length, generation.model, generation.temperature,
+                use_cache=options["use_cache"], metrics=metrics,
+            )
+        except (openai.OpenAIError, ProviderPoolError) as e:
+            return upstream_error_response(e)
+
+    return JSONResponse({
+        "content": content,
+        "metrics": metrics.__dict__,
+        "analysis": await analyze_content(content, generation.content_type) if options["analyze"] else None,
+    })
+
+
+async def stream_generation(
+    api_key: str, generation: BatchRequest, options: Dict[str, bool]
+) -> AsyncIterator[str]:
+    """
+    NDJSON: {"delta": ...} lines while the text streams, then one
+    {"done": true, "metrics", "analysis"} line, or {"error": ...} on failure.
+    """
+    metrics = GenerationMetrics(model=generation.model, streamed=True)
+    chunks = []
+
+    try:
+        async with generation_slots, clients.use(api_key) as client:
+            async for delta in client.astream_content(
+                generation.prompt, generation.content_type, generation.tone,
+                generation.max_length, generation.model, generation.temperature,
+                use_cache=options["use_cache"], metrics=metrics,
+            ):
+                chunks.append(delta)
+                yield json.dumps({"delta": delta}) + "\n"
+
+        content = "".join(chunks)
+        analysis = await analyze_content(content, generation.content_type) if options["analyze"] else None
+    except (openai.OpenAIError, ProviderPoolError) as e:
+        yield json.dumps({"error": str(e), "status": upstream_error_response(e).status_code}) + "\n"
+        return
+    except Exception as e:
+        # The 200 status is already sent, so the failure has to go in the stream
+        logger.exception("Streamed generation failed")
+        get_telemetry().record_error("service", e)
+        yield json.dumps({"error": f"Internal error: {type(e).__name__}", "status": 500}) + "\n"
+        return
+
+    yield json.dumps({"done": True, "metrics": metrics.__dict__, "analysis": analysis}) + "\n"
+
+
+async def analyze_content(content: str, content_type: str) -> Dict[str, Any]:
+    # CPU work; off the event loop so streams keep flowing
+    return await run_in_threadpool(analysis_client.get_content_analysis, content, content_type)
+
+
+async def analyze(request: Request) -> Response:
+    try:
+        body = await read_json(request)
+    except ValueError as e:
+        return error_response(400, str(e))
+
+    content = body.get("content")
+    if not isinstance(content, str) or not content.strip():
+        return error_response(400, "Missing content")
+
+    return JSONResponse(await analyze_content(content, body.get("content_type") or "Blog Post"))
+
+
+def hashnode_key(request: Request) -> str:
+    return request.headers.get("x-hashnode-api-key") or (HASHNODE_API_KEY if SERVICE_USE_SERVER_KEYS else "")
+
+
+async def publish(request: Request) -> Response:
+    try:
+        body = await read_json(request)
+    except ValueError as e:
+        return error_response(400, str(e))
+
+    api_key = hashnode_key(request)
+    if not api_key:
+        return error_response(401, "No Hashnode API key: send X-Hashnode-Api-Key")
+
+    title, content = body.get("title"), body.get("content")
+    publication_id = body.get("publication_id") or HASHNODE_PUBLICATION_ID
+    if not title or not content or not publication_id:
+        return error_response(400, "title, content and publication_id are required")
+
+    tags = body.get("tags")
+    if tags is not None and not (isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+        return error_response(400, "tags must be a list of tag ids")
+
+    # The queue's workers create the draft; callers poll the job
+    job = await run_in_threadpool(
+        get_publish_queue().enqueue,
+        api_key, title, content,
+        tags=tags, publication_id=publication_id, subtitle=body.get("subtitle"),
+    )
+    return JSONResponse(job, status_code=202)
+
+
+async def list_publish_jobs(request: Request) -> Response:
+    api_key = hashnode_key(request)
+    if not api_key:
+        return error_response(401, "No Hashnode API key: send X-Hashnode-Api-Key")
+    return JSONResponse(await run_in_threadpool(get_publish_queue().list_jobs, api_key))
+
+
+async def get_publish_job(request: Request) -> Response:
+    api_key = hashnode_key(request)
+    if not api_key:
+        return error_response(401, "No Hashnode API key: send X-Hashnode-Api-Key")
+
+    job = await run_in_threadpool(get_publish_queue().get_job, request.path_params["job_id"], api_key)
+    if job is None:
+        return error_response(404, "No such job")
+    return JSONResponse(job)
+
+
+async def metrics(request: Request) -> Response:
+    return PlainTextResponse(get_telemetry().prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+async def health(request: Request) -> Response:
+    return JSONResponse({
+        "status": "ok",
+        "openai_clients": len(clients),
+        "publish_jobs": await run_in_threadpool(get_publish_queue().stats),
+        "single_flight": single_flight_stats(),
+        "provider_pool": get_provider_pool().stats(),
+        "hedging": get_hedger().stats(),
+        "retry_budget": get_retry_budget("openai").stats(),
+    })
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    global analysis_client
+
+    # Build the shared RAG indexes before the first request needs them
+    await run_in_threadpool(get_rag_system)
+    analysis_client = EnhancedOpenAIClient(OPENAI_API_KEY)
+    yield
+    await clients.aclose()
+
+
+routes = [
+    Route("/v1/generate", generate, methods=["POST"]),
+    Route("/v1/analyze", analyze, methods=["POST"]),
+    Route("/v1/publish", publish, methods=["POST"]),
+    Route("/v1/publish", list_publish_jobs, methods=["GET"]),
+    Route("/v1/publish/{job_id:int}", get_publish_job, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+    Route("/health", health, methods=["GET"]),
+]
+
+app = Starlette(routes=routes, lifespan=lifespan)
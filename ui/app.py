@@ -1,9 +1,10 @@
 import streamlit as st
 from config.settings import PAGE_TITLE, PAGE_ICON, LAYOUT
 from ui.state.session_state import initialize_session_state
-from ui.components.sidebar import render_sidebar
+from ui.components.sidebar import render_sidebar, render_memory_usage, render_telemetry_panel
 from ui.components.content_generator import render_content_generator, render_conversation_history
-from ui.components.publisher import render_publisher
+from ui.components.publisher import render_publisher, render_publish_queue
+from ui.components.batch_generator import render_batch_generator
 
 
 def setup_page() -> None:
@@ -38,9 +39,19 @@ def run_app() -> None:
     if st.session_state.generated_content:
         render_publisher(content_params["user_prompt"])
 
+    # Render the status of queued Hashnode drafts
+    render_publish_queue()
+
+    # Render bulk generation from a prompt file
+    render_batch_generator(user_settings["api_key"])
+
     # Render conversation history
     render_conversation_history()
 
+    # Measured last, so it includes everything this run stored
+    render_memory_usage()
+    render_telemetry_panel()
+
     # Footer
     st.markdown("------")
     st.caption("Made with ❤️ by ProsePilot AI")
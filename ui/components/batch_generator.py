@@ -0,0 +1,76 @@
+import asyncio
+import io
+import json
+from datetime import datetime
+import streamlit as st
+from api.batch_generator import BatchGenerator, parse_batch_requests
+from config.settings import BATCH_MAX_CONCURRENCY
+from models.content import CompressedText
+
+
+def render_batch_generator(api_key) -> None:
+    """Render the bulk generation UI for JSONL/CSV prompt files"""
+    with st.expander("Batch Generation", expanded=False):
+        st.write(
+            "Upload a JSONL or CSV file with `prompt`, `content_type`, `tone`, "
+            "`max_length`, `model` and `temperature` columns."
+        )
+
+        batch_file = st.file_uploader("Prompt file", type=["jsonl", "csv"])
+        max_concurrency = st.number_input(
+            "Concurrent requests", min_value=1, max_value=32,
+            value=BATCH_MAX_CONCURRENCY, step=1)
+
+        if not st.button("Run Batch", disabled=batch_file is None):
+            if st.session_state.batch_results:
+                _render_batch_download()
+            return
+
+        if not api_key:
+            st.error("Please enter your OpenAI API key in the sidebar.")
+            return
+
+        file_format = "csv" if batch_file.name.lower().endswith(".csv") else "jsonl"
+        text = io.StringIO(batch_file.getvalue().decode("utf-8"))
+
+        try:
+            requests = list(parse_batch_requests(text, file_format))
+        except (ValueError, KeyError) as e:
+            st.error(f"Could not read prompt file: {str(e)}")
+            return
+
+        progress = st.progress(0.0, text=f"Generating 0/{len(requests)}..")
+        generator = BatchGenerator(api_key, max_concurrency=int(max_concurrency))
+
+        async def collect():
+            results = []
+            async for record in generator.generate(requests):
+                results.append(record)
+                progress.progress(
+                    len(results) / len(requests),
+                    text=f"Generating {len(results)}/{len(requests)}..")
+            return results
+
+        results = asyncio.run(collect()) if requests else []
+        # Bulk output is kept compressed in the session until downloaded
+        st.session_state.batch_results = CompressedText("\n".join(
+            json.dumps(record) for record in sorted(results, key=lambda r: r["index"])
+        ))
+
+        failed = sum(1 for record in results if record["error"])
+        if failed:
+            st.warning(f"Generated {len(results) - failed} items, {failed} failed.")
+        else:
+            st.success(f"Generated {len(results)} items.")
+
+        _render_batch_download()
+
+
+def _render_batch_download() -> None:
+    """Render the download button for the last batch results"""
+    st.download_button(
+        label="Download results as JSONL",
+        data=st.session_state.batch_results.text,
+        file_name=f"batch_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+        mime="application/jsonl"
+    )
@@ -1,8 +1,14 @@
+import math
+import time
 from typing import Any
 import streamlit as st
 from datetime import datetime
 from models.content import ContentItem
 from api.openai_client import EnhancedOpenAIClient
+from api.prompt_compiler import get_prompt_cache_stats
+from config.settings import CACHE_ENABLED, HISTORY_PAGE_SIZE, STREAM_RENDER_INTERVAL
+from utils.history_store import get_history_store
+from utils.response_cache import get_response_cache
 
 
 def render_content_generator(api_key, content_type, model, temperature) -> dict[str, Any]:
@@ -34,34 +40,115 @@ def render_content_generator(api_key, content_type, model, temperature) -> dict[
         # RAG enhancement indicator
         st.info("🧠 RAG Enhancement: ON\nUsing writing best practices and guidelines")
 
+        use_cache = st.checkbox(
+            "Reuse cached results", value=True,
+            help="Serve identical requests from the local response cache instead of calling OpenAI again")
+
     generate_pressed = st.button("Generate Content")
 
     # Generate content when the button is pressed
     if generate_pressed and user_prompt:
-        with st.spinner("Generating content with RAG enhancement.."):
-            openai_client = EnhancedOpenAIClient(api_key)
-            generated_text = openai_client.generate_content(
-                user_prompt, content_type, tone, max_length, model, temperature
-            )
+        openai_client = EnhancedOpenAIClient(api_key)
 
-            # Analyze content
-            content_analysis = openai_client.get_content_analysis(
-                generated_text, content_type)
+        # Render deltas as they arrive instead of blocking on the full article
+        stream_area = st.empty()
+        with stream_area.container():
+            st.subheader("Generated Content")
+            live_stats = st.empty()
+            live_output = st.empty()
+            live_output.caption("Generating content with RAG enhancement..")
 
-            st.session_state.generated_content = generated_text
-            st.session_state.content_analysis = content_analysis
+            # Scores update per delta, so analysis is ready when the stream ends
+            analyzer = openai_client.create_incremental_analyzer(
+                content_type, max_length)
 
-            # Add to conversation history
-            content_item = ContentItem.create_from_generation(
-                user_prompt, content_type, tone, generated_text
-            )
-            st.session_state.conversation_history.append(content_item.__dict__)
+            chunks = []
+            last_render = 0.0
+            for delta in openai_client.stream_content(
+                user_prompt, content_type, tone, max_length, model, temperature,
+                use_cache=use_cache
+            ):
+                chunks.append(delta)
+                analyzer.update(delta)
+
+                # Throttle re-renders so long articles don't flood the browser
+                now = time.monotonic()
+                if now - last_render >= STREAM_RENDER_INTERVAL:
+                    render_live_stats(live_stats, analyzer.snapshot())
+                    live_output.markdown("".join(chunks) + "▌")
+                    last_render = now
+
+        stream_area.empty()
+        generated_text = "".join(chunks)
+
+        # Analyze content
+        content_analysis = analyzer.snapshot()
+
+        st.session_state.generated_content = generated_text
+        st.session_state.content_analysis = content_analysis
+        st.session_state.generation_metrics = openai_client.last_metrics
+
+        # Add to conversation history
+        content_item = ContentItem.create_from_generation(
+            user_prompt, content_type, tone, generated_text
+        )
+        get_history_store().add(st.session_state.history_session_id, content_item)
+        st.session_state.history_page = 1
 
     # Display generated content
     if st.session_state.generated_content:
         st.subheader("Generated Content")
         st.markdown(st.session_state.generated_content)
 
+        # Show perceived latency for the last generation
+        metrics = st.session_state.generation_metrics
+        if metrics and metrics.cache_hit:
+            st.caption(f"⚡ Served from response cache ({metrics.model})")
+        elif metrics and metrics.total_duration is not None:
+            if metrics.time_to_first_token is not None:
+                st.caption(
+                    f"⏱️ First token in {metrics.time_to_first_token:.2f}s · "
+                    f"completed in {metrics.total_duration:.2f}s ({metrics.model})")
+            else:
+                st.caption(
+                    f"⏱️ Completed in {metrics.total_duration:.2f}s ({metrics.model})")
+            if metrics.coalesced:
+                st.caption("🔗 Joined an identical generation already in progress")
+            if metrics.fallback_model:
+                st.caption(f"↪️ Written by {metrics.fallback_model}: {metrics.model} was rate limited on every key")
+
+        # Token budget: local estimates vs. what the API reported
+        if metrics and not metrics.cache_hit and metrics.estimated_completion_tokens is not None:
+            # A stream cut off at the word limit ends before the usage report arrives
+            prompt_actual = metrics.prompt_tokens if metrics.prompt_tokens is not None else "n/a"
+            completion_actual = metrics.completion_tokens if metrics.completion_tokens is not None else "n/a"
+            st.caption(
+                f"🔢 Prompt tokens: ~{metrics.estimated_prompt_tokens} estimated · "
+                f"{prompt_actual} actual | Completion tokens: "
+                f"~{metrics.estimated_completion_tokens} estimated · "
+                f"{completion_actual} actual (budget {metrics.max_tokens})")
+
+        prompt_cache = get_prompt_cache_stats().stats()
+        if prompt_cache["requests"]:
+            last_cached = (
+                f"{metrics.cached_prompt_tokens} cached tokens on the last request · "
+                if metrics and metrics.cached_prompt_tokens is not None else ""
+            )
+            st.caption(
+                f"🧩 Prompt prefix cache: {last_cached}"
+                f"{prompt_cache['token_hit_rate']:.0%} of prompt tokens cached across "
+                f"{prompt_cache['requests']} requests")
+
+        if metrics and metrics.truncated:
+            st.caption(
+                "✂️ Generation was stopped at the word limit and trimmed to the last complete sentence")
+
+        if CACHE_ENABLED:
+            cache_stats = get_response_cache().stats()
+            st.caption(
+                f"Response cache: {cache_stats['hits']} hits · "
+                f"{cache_stats['misses']} misses · {cache_stats['entries']} entries")
+
         # Show content analysis
         if hasattr(st.session_state, 'content_analysis'):
             with st.expander("Content Analysis", expanded=False):
@@ -121,14 +208,52 @@ def render_content_generator(api_key, content_type, model, temperature) -> dict[
     }
 
 
+def render_live_stats(placeholder, analysis) -> None:
+    """Render running analysis counters while content streams in"""
+    stats = (
+        f"📊 {analysis['word_count']} words · "
+        f"structure {analysis['structure_score']}/100 · "
+        f"SEO {analysis['seo_score']}/100 · "
+        f"readability {analysis['readability_score']}/100"
+    )
+
+    if analysis["signals"]["length_exceeded"]:
+        placeholder.warning(
+            f"{stats} — over the {analysis['signals']['max_length']} word limit")
+    else:
+        placeholder.caption(stats)
+
+
 def render_conversation_history() -> None:
-    """Render the conversation history"""
-    if st.session_state.conversation_history:
-        with st.expander("Conversation History", expanded=False):
-            for i, exchange in enumerate(reversed(st.session_state.conversation_history)):
+    """Render the conversation history, one page at a time"""
+    history_store = get_history_store()
+    session_id = st.session_state.history_session_id
+    total = history_store.count(session_id)
+
+    if total:
+        with st.expander(f"Conversation History ({total})", expanded=False):
+            page_count = math.ceil(total / HISTORY_PAGE_SIZE)
+            page = 0
+
+            if page_count > 1:
+                page = int(st.number_input(
+                    f"Page (of {page_count})", min_value=1, max_value=page_count,
+                    step=1, key="history_page"
+                )) - 1
+
+            # Only the visible page is loaded, with previews; full responses load on demand
+            for exchange in history_store.page(session_id, page, HISTORY_PAGE_SIZE):
                 st.write(
                     f"**[{exchange['timestamp']}] {exchange['content_type']} ({exchange['tone']})**")
                 st.write(f"Prompt: {exchange['prompt']}")
-                st.write("Response:")
-                st.markdown(exchange['response'])
+
+                if exchange["response_length"] > len(exchange["preview"]):
+                    if st.toggle("Show full response", key=f"history_item_{exchange['id']}"):
+                        item = history_store.get(session_id, exchange["id"])
+                        st.markdown(item.response if item else exchange["preview"])
+                    else:
+                        st.write(f"Response: {exchange['preview']}…")
+                else:
+                    st.write("Response:")
+                    st.markdown(exchange["preview"])
                 st.divider()
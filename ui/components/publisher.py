@@ -1,6 +1,13 @@
 from typing import Any
 import streamlit as st
 from api.hashnode_client import HashnodeClient
+from api.publish_queue import get_publish_queue
+from api.tag_catalog import get_tag_catalog
+from ui.state.session_state import (
+    hashnode_account_age,
+    hashnode_account_is_fresh,
+    load_hashnode_account,
+)
 from utils.masking import mask_sensitive_id
 
 
@@ -34,44 +41,60 @@ def render_publisher(user_prompt) -> None:
         st.button("Publish to Hashnode", disabled=True)
     else:
         if st.button("Publish to Hashnode"):
-            with st.spinner("Publishing to Hashnode..."):
-                hashnode_client = HashnodeClient(
-                    st.session_state.hashnode_api_key
-                )
-                post_result = hashnode_client.create_draft(
-                    title=title,
-                    content=st.session_state.generated_content,
-                    tags=selected_tag_ids,
-                    publication_id=selected_pub_id,
-                    subtitle=subtitle
+            # Drafts are created by background workers, so editors can keep working
+            job = get_publish_queue().enqueue(
+                st.session_state.hashnode_api_key,
+                title=title,
+                content=st.session_state.generated_content,
+                tags=selected_tag_ids,
+                publication_id=selected_pub_id,
+                subtitle=subtitle
+            )
+
+            if job["status"] == "succeeded":
+                st.info("This draft has already been created on Hashnode.")
+            else:
+                st.success(
+                    f"Queued \"{job['title']}\" for publishing. Track it in the publishing queue below."
                 )
 
-                if post_result:
-                    st.success(f"Successfully created draft on Hashnode!")
-                    st.write(f"Title: {post_result['title']}")
-                    st.write(f"Slug: {post_result['slug']}")
-
-                    # Use updatedAt instead of dateUpdated
-                    if 'updatedAt' in post_result:
-                        st.write(f"Last updated: {post_result['updatedAt']}")
-
-                    username = st.session_state.hashnode_user_info.get(
-                        "username"
-                    )
-                    if username:
-                        st.write(
-                            f"Once published, you can view your post at: https://{username}.hashnode.dev/{post_result['slug']}"
-                        )
-                        st.info(
-                            "Go to your Hashnode dashboard to publish this draft when ready."
-                        )
-                else:
-                    st.error(
-                        "Failed to publish to Hashnode. Please check your publication ID and try again."
-                    )
-                    st.info(
-                        "Hashnode's API requires a valid publication ID for publishing content."
-                    )
+
+def render_publish_queue() -> None:
+    """Render the status of drafts queued with the connected Hashnode account"""
+    api_key = st.session_state.hashnode_api_key
+    if not st.session_state.hashnode_user_info or not api_key:
+        return
+
+    publish_queue = get_publish_queue()
+    # Lets jobs left over from a previous run resume for this account
+    publish_queue.register_api_key(api_key)
+
+    jobs = publish_queue.list_jobs(api_key)
+    if not jobs:
+        return
+
+    st.subheader("Publishing Queue")
+    if st.button("Refresh status"):
+        st.rerun()
+
+    username = st.session_state.hashnode_user_info.get("username")
+    status_icons = {"queued": "⏳", "running": "🔄", "succeeded": "✅", "failed": "❌"}
+
+    for job in jobs:
+        icon = status_icons.get(job["status"], "")
+        st.write(f"{icon} **{job['title']}** — {job['status']} (attempts: {job['attempts']})")
+
+        if job["status"] == "succeeded" and job["draft"] and username:
+            st.caption(
+                f"Once published, you can view your post at: https://{username}.hashnode.dev/{job['draft']['slug']}"
+            )
+        elif job["status"] == "queued" and job["last_error"]:
+            st.caption(f"Retrying: {job['last_error']}")
+        elif job["status"] == "failed":
+            st.caption(f"Failed: {job['last_error']}")
+            if st.button("Retry", key=f"retry_publish_{job['id']}"):
+                publish_queue.retry(job["id"])
+                st.rerun()
 
 
 def render_publication_selector():
@@ -86,12 +109,18 @@ def render_publication_selector():
         help="This field is required. You cannot publish without a valid publication ID."
     )
 
-    # Get available publications for selection
+    # Publications are loaded at connect time; the button refreshes them (and the user and tags) in one request
+    account_age = hashnode_account_age()
+    if account_age is not None:
+        st.caption(
+            f"Publications loaded {int(account_age // 60)} min ago"
+            + ("" if hashnode_account_is_fresh() else " — consider reloading")
+        )
+
     if st.button("Load My Publications"):
-        hashnode_client = HashnodeClient(st.session_state.hashnode_api_key)
-        publications = hashnode_client.get_publications()
-        if publications:
-            st.session_state.hashnode_publications = publications
+        error = load_hashnode_account(st.session_state.hashnode_api_key)
+        publications = st.session_state.hashnode_publications
+        if error is None and publications:
             st.success(
                 f"Found {len(publications)} publications. Select one from the dropdown below.")
         else:
@@ -135,8 +164,12 @@ def render_tag_selector() -> list[Any]:
 
     selected_tag_ids = []
     if tag_search:
-        hashnode_client = HashnodeClient(st.session_state.hashnode_api_key)
-        available_tags = hashnode_client.get_tags(tag_search)
+        # Reruns are answered from the shared local catalog; only misses hit Hashnode
+        available_tags = get_tag_catalog().search(
+            tag_search,
+            lambda query: HashnodeClient(
+                st.session_state.hashnode_api_key).get_tags(query),
+        )
 
         if available_tags:
             tag_options = {tag["name"]: tag["_id"] for tag in available_tags}
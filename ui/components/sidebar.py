@@ -1,7 +1,21 @@
 from typing import Any
 import streamlit as st
-from api.hashnode_client import HashnodeClient
-from config.settings import OPENAI_API_KEY
+from api.hedging import get_hedger
+from api.provider_pool import get_provider_pool
+from ui.state.session_state import load_hashnode_account, record_session_memory
+from utils.memory import get_memory_tracker
+from utils.history_store import get_history_store
+from utils.telemetry import get_telemetry
+from config.settings import OPENAI_API_KEY, TELEMETRY_EXPORT_PATH
+
+TELEMETRY_EXPORT_INTERVAL = 10  # seconds between refreshes of the JSON export file
+
+LATENCY_PANEL_METRICS = [
+    ("Time to first token", "prosepilot_generation_ttft_seconds"),
+    ("Generation", "prosepilot_generation_seconds"),
+    ("RAG context", "prosepilot_rag_build_seconds"),
+    ("Hashnode requests", "prosepilot_hashnode_request_seconds"),
+]
 
 
 def render_sidebar() -> dict[str, Any]:
@@ -37,7 +51,8 @@ def render_sidebar() -> dict[str, Any]:
 
     # Clear conversation button
     if st.sidebar.button("Clear Conversation"):
-        st.session_state.conversation_history = []
+        get_history_store().clear(st.session_state.history_session_id)
+        st.session_state.history_page = 1
         st.session_state.generated_content = ""
         st.rerun()
 
@@ -62,6 +77,8 @@ def render_hashnode_connection() -> None:
         if st.sidebar.button("Disconnect Hashnode"):
             st.session_state.hashnode_user_info = None
             st.session_state.hashnode_api_key = ""
+            st.session_state.hashnode_publications = []
+            st.session_state.hashnode_account_loaded_at = None
             st.rerun()
     else:
         st.sidebar.write("### Connect to Hashnode")
@@ -106,16 +123,92 @@ def render_hashnode_connection() -> None:
         if st.sidebar.button("Connect to Hashnode"):
             st.sidebar.write("Attempting to connect to Hashnode...")
 
-            hashnode_client = HashnodeClient(input_hashnode_api_key)
-            user_info = hashnode_client.authenticate()
+            # One request loads the user, publications and common tags
+            error = load_hashnode_account(input_hashnode_api_key)
 
-            if user_info:
-                st.session_state.hashnode_user_info = user_info
+            if error is None:
                 st.session_state.hashnode_api_key = input_hashnode_api_key
                 st.session_state.hashnode_publication_id = input_hashnode_publication_id
                 st.sidebar.success(
-                    f"Connected as: {user_info.get('name', '')}")
+                    f"Connected as: {st.session_state.hashnode_user_info.get('name', '')}")
                 st.rerun()
             else:
                 st.sidebar.error(
-                    "Failed to connect to Hashnode. Check your API key and try again.")
+                    f"Failed to connect to Hashnode ({error}). Check your API key and try again.")
+
+
+def render_memory_usage() -> None:
+    """Render per-session and process-wide session state memory in the sidebar"""
+    session_bytes = record_session_memory()
+    report = get_memory_tracker().report()
+
+    with st.sidebar.expander("Memory Usage", expanded=False):
+        st.write(f"This session: {session_bytes / 1024:.1f} KB")
+        st.write(f"Active sessions: {report['sessions']}")
+        st.write(f"All sessions: {report['total_bytes'] / (1024 * 1024):.2f} MB")
+        st.caption(
+            f"Average {report['avg_bytes'] / 1024:.1f} KB · largest {report['max_bytes'] / 1024:.1f} KB per session")
+
+
+def _latency_summary(series: list) -> str:
+    """p50/p95 of the busiest label set of a metric, as a short string"""
+    busiest = max(series, key=lambda entry: entry["window_count"], default=None)
+    if not busiest or busiest["p50"] is None:
+        return "no data"
+    return f"p50 {busiest['p50']:.2f}s · p95 {busiest['p95']:.2f}s"
+
+
+def render_telemetry_panel() -> None:
+    """Render latency percentiles, token usage and cost, with metrics downloads"""
+    telemetry = get_telemetry()
+    try:
+        telemetry.export_if_stale(TELEMETRY_EXPORT_PATH, TELEMETRY_EXPORT_INTERVAL)
+    except OSError as e:
+        st.sidebar.caption(f"Metrics export failed: {e}")
+
+    snapshot = telemetry.snapshot()
+    histograms = snapshot["histograms"]
+    counters = snapshot["counters"]
+
+    with st.sidebar.expander("Latency & Cost", expanded=False):
+        for label, metric in LATENCY_PANEL_METRICS:
+            st.write(f"{label}: {_latency_summary(histograms.get(metric, []))}")
+
+        tokens = sum(entry["value"] for entry in counters.get("prosepilot_tokens_total", [])
+                     if entry["labels"].get("kind") in ("prompt", "completion"))
+        cost = sum(entry["value"] for entry in counters.get("prosepilot_cost_usd_total", []))
+        errors = sum(entry["value"] for entry in counters.get("prosepilot_errors_total", []))
+        coalesced = sum(entry["value"] for entry in counters.get("prosepilot_coalesced_total", []))
+        st.write(f"Tokens: {int(tokens):,} · estimated cost ${cost:.4f}")
+        if coalesced:
+            st.write(f"Duplicate calls joined in flight: {int(coalesced)}")
+        st.caption(f"Errors: {int(errors)} · percentiles cover the last {telemetry.window_seconds // 60:.0f} minutes")
+
+        hedging = get_hedger().stats()
+        if hedging["hedged"] or hedging["denied"]:
+            st.caption(
+                f"🏁 Hedged {hedging['hedged']} of {hedging['requests']} generations · "
+                f"hedge answered first {hedging['hedge_wins']} times, saving ~{hedging['estimated_saved_seconds']:.1f}s · "
+                f"{hedging['denied']} held back by the retry budget")
+
+        # Learned limits of each pooled key and model
+        for route in get_provider_pool().stats():
+            limits = " · ".join(
+                f"{label} {route[field]}" for label, field in (("requests", "requests_left"), ("tokens", "tokens_left"))
+                if route[field] is not None
+            ) or "limits not reported yet"
+            cooling = f" · cooling down {route['cooling_down_for']:.0f}s" if route["cooling_down_for"] else ""
+            st.caption(f"🔑 {route['key']} {route['model']}: {route['calls']} calls, {limits}{cooling}")
+
+        st.download_button(
+            "Download Prometheus metrics",
+            data=telemetry.prometheus_text(),
+            file_name="prosepilot_metrics.prom",
+            mime="text/plain",
+        )
+        st.download_button(
+            "Download JSON metrics",
+            data=telemetry.to_json(),
+            file_name="prosepilot_metrics.json",
+            mime="application/json",
+        )
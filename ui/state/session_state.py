@@ -1,5 +1,16 @@
+import time
+import uuid
+from typing import Optional
 import streamlit as st
-from config.settings import HASHNODE_API_KEY, HASHNODE_PUBLICATION_ID
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from api.hashnode_client import HashnodeClient, HashnodeRequestError
+from api.tag_catalog import get_tag_catalog
+from utils.memory import estimate_size, get_memory_tracker
+from config.settings import (
+    HASHNODE_ACCOUNT_TTL_SECONDS,
+    HASHNODE_API_KEY,
+    HASHNODE_PUBLICATION_ID,
+)
 
 
 def initialize_session_state() -> None:
@@ -7,8 +18,22 @@ def initialize_session_state() -> None:
     if "generated_content" not in st.session_state:
         st.session_state.generated_content = ""
 
-    if "conversation_history" not in st.session_state:
-        st.session_state.conversation_history = []
+    if "generation_metrics" not in st.session_state:
+        st.session_state.generation_metrics = None
+
+    if "batch_results" not in st.session_state:
+        st.session_state.batch_results = None  # CompressedText of the last batch's JSONL
+
+    if "history_session_id" not in st.session_state:
+        # Kept in the URL so a page refresh reopens the same on-disk history
+        history_session_id = st.query_params.get("history")
+        if not history_session_id:
+            history_session_id = uuid.uuid4().hex
+            st.query_params["history"] = history_session_id
+        st.session_state.history_session_id = history_session_id
+
+    if "history_page" not in st.session_state:
+        st.session_state.history_page = 1
 
     if "hashnode_user_info" not in st.session_state:
         st.session_state.hashnode_user_info = None
@@ -21,3 +46,51 @@ def initialize_session_state() -> None:
 
     if "hashnode_publications" not in st.session_state:
         st.session_state.hashnode_publications = []
+
+    if "hashnode_account_loaded_at" not in st.session_state:
+        st.session_state.hashnode_account_loaded_at = None
+
+
+def load_hashnode_account(api_key: str) -> Optional[str]:
+    """
+    Fetch the Hashnode user, publications and common tags in one request and
+    store them in session state. Returns an error message on failure.
+    """
+    try:
+        account = HashnodeClient(api_key).connect()
+    except HashnodeRequestError as e:
+        return str(e)
+
+    st.session_state.hashnode_user_info = account["user"]
+    st.session_state.hashnode_publications = account["publications"]
+    st.session_state.hashnode_account_loaded_at = time.time()
+
+    # Prefetched tag pages let the tag search answer these queries locally
+    tag_catalog = get_tag_catalog()
+    for tag_query, tags in account["tags"].items():
+        tag_catalog.prime(tag_query, tags)
+
+    return None
+
+
+def hashnode_account_age() -> Optional[float]:
+    """Seconds since the Hashnode account data was loaded, or None if never"""
+    loaded_at = st.session_state.hashnode_account_loaded_at
+    return None if loaded_at is None else time.time() - loaded_at
+
+
+def hashnode_account_is_fresh() -> bool:
+    """Check whether the stored Hashnode account data is still within its TTL"""
+    age = hashnode_account_age()
+    return age is not None and age <= HASHNODE_ACCOUNT_TTL_SECONDS
+
+
+def record_session_memory() -> int:
+    """Estimate this session's state size, report it to the process-wide tracker and return it"""
+    state = {key: st.session_state[key] for key in st.session_state.keys()}
+    nbytes = estimate_size(state)
+
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_memory_tracker().record(ctx.session_id, nbytes)
+    return nbytes
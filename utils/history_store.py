@@ -0,0 +1,119 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from config.settings import HISTORY_PATH, HISTORY_PREVIEW_LENGTH
+from models.content import ContentItem
+
+
+class HistoryStore:
+    """
+    Disk-backed (SQLite) conversation history, keyed by history session.
+    Pages only carry a short preview of each response; the full text is
+    loaded one item at a time when it is expanded.
+    """
+
+    def __init__(self, path: str = HISTORY_PATH, preview_length: int = HISTORY_PREVIEW_LENGTH):
+        self.path = path
+        self.preview_length = preview_length
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # Streamlit serves sessions from several threads, access is serialized by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                content_type TEXT NOT NULL,
+                tone TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS items_session ON items (session_id, id)"
+        )
+        self._conn.commit()
+
+    def add(self, session_id: str, item: ContentItem) -> int:
+        """Append a generated item to a session's history and return its id"""
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO items (session_id, timestamp, prompt, content_type, tone, response, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    session_id,
+                    item.timestamp,
+                    item.prompt,
+                    item.content_type,
+                    item.tone,
+                    item.response,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def count(self, session_id: str) -> int:
+        """Return the number of items in a session's history"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+
+    def page(self, session_id: str, page: int, page_size: int) -> List[Dict[str, Any]]:
+        """Return one page of history, newest first, with response previews only"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, timestamp, prompt, content_type, tone,
+                    substr(response, 1, ?) AS preview, length(response) AS response_length
+                FROM items WHERE session_id = ?
+                ORDER BY id DESC LIMIT ? OFFSET ?
+                """,
+                (self.preview_length, session_id, page_size, page * page_size),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, session_id: str, item_id: int) -> Optional[ContentItem]:
+        """Load one full history item"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT timestamp, prompt, content_type, tone, response
+                FROM items WHERE session_id = ? AND id = ?
+                """,
+                (session_id, item_id),
+            ).fetchone()
+        return ContentItem(**dict(row)) if row else None
+
+    def clear(self, session_id: str) -> None:
+        """Remove a session's history"""
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+
+_history_store: Optional[HistoryStore] = None
+_history_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store shared by all sessions"""
+    global _history_store
+
+    with _history_store_lock:
+        if _history_store is None:
+            _history_store = HistoryStore()
+        return _history_store
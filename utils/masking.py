@@ -1,3 +1,4 @@
+import hashlib
 import re
 
 
@@ -23,6 +24,11 @@ def mask_sensitive_id(id_string: str) -> str:
     return f"{id_string[:5]}...{id_string[-5:]}" if len(id_string) > 10 else "****"
 
 
+def api_key_fingerprint(api_key: str) -> str:
+    """Identify an API key without storing it on disk"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
 def mask_api_response(response_text) -> str:
     """Mask potentially sensitive IDs in API responses"""
     # Match patterns that look like IDs (hexadecimal or UUID-like)
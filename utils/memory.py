@@ -0,0 +1,82 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+from config.settings import MEMORY_SESSION_TTL_SECONDS
+
+
+def estimate_size(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate deep size in bytes of an object graph, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+
+    if isinstance(obj, dict):
+        size += sum(
+            estimate_size(key, seen) + estimate_size(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in obj)
+
+    if hasattr(obj, "__dict__"):
+        size += estimate_size(vars(obj), seen)
+
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(obj, slot):
+                size += estimate_size(getattr(obj, slot), seen)
+
+    return size
+
+
+class SessionMemoryTracker:
+    """Latest memory estimate of every live session, for sizing the server"""
+
+    def __init__(self, ttl_seconds: float = MEMORY_SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Dict[str, float]] = {}
+
+    def record(self, session_id: str, nbytes: int) -> None:
+        """Store a session's current estimate and forget sessions gone idle"""
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = {"bytes": nbytes, "updated_at": now}
+            for stale_id in [
+                sid for sid, entry in self._sessions.items()
+                if now - entry["updated_at"] > self.ttl_seconds
+            ]:
+                del self._sessions[stale_id]
+
+    def report(self) -> Dict[str, Any]:
+        """Return session count plus total, average and largest session size in bytes"""
+        with self._lock:
+            sizes = [entry["bytes"] for entry in self._sessions.values()]
+
+        return {
+            "sessions": len(sizes),
+            "total_bytes": sum(sizes),
+            "avg_bytes": sum(sizes) // len(sizes) if sizes else 0,
+            "max_bytes": max(sizes, default=0),
+        }
+
+
+_memory_tracker: Optional[SessionMemoryTracker] = None
+_memory_tracker_lock = threading.Lock()
+
+
+def get_memory_tracker() -> SessionMemoryTracker:
+    """Return the process-wide session memory tracker"""
+    global _memory_tracker
+
+    with _memory_tracker_lock:
+        if _memory_tracker is None:
+            _memory_tracker = SessionMemoryTracker()
+        return _memory_tracker
@@ -0,0 +1,90 @@
+"""Retry budgets: cap retries and hedges at a share of recent traffic"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+from config.settings import (
+    RETRY_BUDGET_MIN_PER_SECOND,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_WINDOW_SECONDS,
+)
+from utils.telemetry import get_telemetry
+
+
+class RetryBudget:
+    """
+    Extra attempts (retries and hedges) may add at most `ratio` of the
+    requests made over the last window, plus a small floor so a quiet process
+    can still retry. When an upstream is failing everywhere, attempts beyond
+    the budget fail fast instead of multiplying the load on it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ratio: float = RETRY_BUDGET_RATIO,
+        min_per_second: float = RETRY_BUDGET_MIN_PER_SECOND,
+        window_seconds: float = RETRY_BUDGET_WINDOW_SECONDS,
+    ):
+        self.name = name
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.denied = 0
+
+    def _expire(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window_seconds:
+                events.popleft()
+
+    def _allowance(self) -> float:
+        return self.ratio * len(self._requests) + self.min_per_second * self.window_seconds
+
+    def record_request(self) -> None:
+        """Count one original request, which earns the budget its share"""
+        now = time.monotonic()
+        with self._lock:
+            self._requests.append(now)
+            self._expire(now)
+
+    def try_spend(self) -> bool:
+        """Take one extra attempt from the budget, or refuse it"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            allowed = len(self._retries) < self._allowance()
+            if allowed:
+                self._retries.append(now)
+            else:
+                self.denied += 1
+
+        if not allowed:
+            get_telemetry().increment("prosepilot_retry_budget_denied_total", budget=self.name)
+        return allowed
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "available": max(0, int(self._allowance()) - len(self._retries)),
+                "denied": self.denied,
+            }
+
+
+_retry_budgets: Dict[str, RetryBudget] = {}
+_retry_budgets_lock = threading.Lock()
+
+
+def get_retry_budget(name: str) -> RetryBudget:
+    """Return the process-wide retry budget for an upstream"""
+    with _retry_budgets_lock:
+        if name not in _retry_budgets:
+            _retry_budgets[name] = RetryBudget(name)
+        return _retry_budgets[name]
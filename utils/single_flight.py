@@ -0,0 +1,250 @@
+"""Single-flight coalescing: concurrent identical calls share one execution"""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional
+from utils.telemetry import get_telemetry
+
+
+class _Call:
+    """An in-flight plain call; followers wait for its result"""
+    __slots__ = ("finished", "result", "error")
+
+    def __init__(self):
+        self.finished = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast:
+    """An in-flight stream; every chunk is kept so late joiners replay from the start"""
+    __slots__ = ("chunks", "done", "error", "subscribers", "condition", "task")
+
+    def __init__(self, condition):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.condition = condition
+        self.task = None  # the pump of an async broadcast, kept referenced
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution. The
+    first caller runs it; callers arriving while it is in flight attach and
+    get the same result, the same exception, or the same stream. Nothing is
+    remembered once a call finishes; that is what the caches are for.
+
+    Streams are driven by a pump (a thread, or a task for async streams) so
+    they do not depend on any one consumer. Every consumer replays the chunks
+    from the start, and the upstream stream is closed once all of them left.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _count(self, joined: bool) -> None:
+        """Update the counters; call with the lock held"""
+        self.calls += 1
+        if joined:
+            self.coalesced += 1
+        else:
+            self.executions += 1
+
+    def _report_coalesced(self, on_join: Optional[Callable[[], None]]) -> None:
+        get_telemetry().increment("prosepilot_coalesced_total", operation=self.name)
+        if on_join is not None:
+            on_join()
+
+    def do(self, key: Hashable, func: Callable[[], Any], on_join: Optional[Callable[[], None]] = None) -> Any:
+        """Run func, or wait for the identical call already running (calling on_join)"""
+        with self._lock:
+            call = self._calls.get(key)
+            joined = call is not None
+            if not joined:
+                call = self._calls[key] = _Call()
+            self._count(joined)
+
+        if joined:
+            self._report_coalesced(on_join)
+            call.finished.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.finished.set()
+        return call.result
+
+    def stream(
+        self, key: Hashable, start: Callable[[], Iterator[Any]],
+        on_join: Optional[Callable[[], None]] = None,
+    ) -> Iterator[Any]:
+        """Iterate start(), or the identical stream already running"""
+        with self._lock:
+            broadcast = self._streams.get(key)
+            joined = broadcast is not None
+            if not joined:
+                broadcast = self._streams[key] = _Broadcast(threading.Condition())
+            broadcast.subscribers += 1
+            self._count(joined)
+
+        if joined:
+            self._report_coalesced(on_join)
+        else:
+            threading.Thread(
+                target=self._pump, args=(key, broadcast, start),
+                name=f"single-flight-{self.name}", daemon=True,
+            ).start()
+
+        index = 0
+        try:
+            while True:
+                with broadcast.condition:
+                    broadcast.condition.wait_for(lambda: index < len(broadcast.chunks) or broadcast.done)
+                    pending = broadcast.chunks[index:]
+                    finished = broadcast.done
+                index += len(pending)
+
+                yield from pending
+                if finished:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            self._unsubscribe(key, broadcast)
+
+    def _pump(self, key: Hashable, broadcast: _Broadcast, start: Callable[[], Iterator[Any]]) -> None:
+        iterator = None
+        try:
+            iterator = start()
+            for chunk in iterator:
+                with broadcast.condition:
+                    if not broadcast.subscribers:
+                        break  # everyone left; stop paying for the rest
+                    broadcast.chunks.append(chunk)
+                    broadcast.condition.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            if iterator is not None and hasattr(iterator, "close"):
+                iterator.close()
+            with self._lock:
+                self._forget(key, broadcast)
+            with broadcast.condition:
+                broadcast.done = True
+                broadcast.condition.notify_all()
+
+    async def astream(
+        self, key: Hashable, start: Callable[[], AsyncIterator[Any]],
+        on_join: Optional[Callable[[], None]] = None,
+    ) -> AsyncIterator[Any]:
+        """Async counterpart of stream; only calls on the same event loop are joined"""
+        loop = asyncio.get_running_loop()
+        key = (id(loop), key)
+
+        with self._lock:
+            broadcast = self._streams.get(key)
+            joined = broadcast is not None
+            if not joined:
+                broadcast = self._streams[key] = _Broadcast(asyncio.Condition())
+            broadcast.subscribers += 1
+            self._count(joined)
+
+        if joined:
+            self._report_coalesced(on_join)
+        else:
+            broadcast.task = loop.create_task(self._apump(key, broadcast, start))
+
+        index = 0
+        try:
+            while True:
+                async with broadcast.condition:
+                    await broadcast.condition.wait_for(lambda: index < len(broadcast.chunks) or broadcast.done)
+                pending = broadcast.chunks[index:]
+                finished = broadcast.done and index + len(pending) == len(broadcast.chunks)
+                index += len(pending)
+
+                for chunk in pending:
+                    yield chunk
+                if finished:
+                    if broadcast.error is not None:
+                        raise broadcast.error
+                    return
+        finally:
+            self._unsubscribe(key, broadcast)
+
+    async def _apump(self, key: Hashable, broadcast: _Broadcast, start: Callable[[], AsyncIterator[Any]]) -> None:
+        iterator = None
+        try:
+            iterator = start()
+            async for chunk in iterator:
+                if not broadcast.subscribers:
+                    break
+                broadcast.chunks.append(chunk)
+                async with broadcast.condition:
+                    broadcast.condition.notify_all()
+        except Exception as e:
+            broadcast.error = e
+        finally:
+            if iterator is not None and hasattr(iterator, "aclose"):
+                await iterator.aclose()
+            with self._lock:
+                self._forget(key, broadcast)
+            broadcast.done = True
+            async with broadcast.condition:
+                broadcast.condition.notify_all()
+
+    def _unsubscribe(self, key: Hashable, broadcast: _Broadcast) -> None:
+        with self._lock:
+            broadcast.subscribers -= 1
+            if not broadcast.subscribers and not broadcast.done:
+                # Abandoned: the next identical call must start afresh
+                self._forget(key, broadcast)
+
+    def _forget(self, key: Hashable, broadcast: _Broadcast) -> None:
+        """Stop offering this broadcast to new callers; call with the lock held"""
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._streams),
+            }
+
+
+_single_flights: Dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Return the process-wide single-flight group for an operation"""
+    with _single_flights_lock:
+        if name not in _single_flights:
+            _single_flights[name] = SingleFlight(name)
+        return _single_flights[name]
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters of every single-flight group, by operation"""
+    with _single_flights_lock:
+        groups = list(_single_flights.values())
+    return {group.name: group.stats() for group in groups}
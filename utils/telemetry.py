@@ -0,0 +1,273 @@
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from config.settings import (
+    MODEL_PRICING,
+    TELEMETRY_LATENCY_BUCKETS,
+    TELEMETRY_WINDOW_SECONDS,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+METRIC_HELP = {
+    "prosepilot_rag_build_seconds": "Time to build the RAG context for a request",
+    "prosepilot_generation_ttft_seconds": "Time from request to first generated text",
+    "prosepilot_upstream_ttft_seconds": "Time from sending a completion request to its first chunk, excluding waits for a free key",
+    "prosepilot_generation_seconds": "Total time of a generation request",
+    "prosepilot_analysis_seconds": "Time to score generated content",
+    "prosepilot_hashnode_request_seconds": "Hashnode GraphQL request latency, retries included",
+    "prosepilot_publish_seconds": "Time to process a queued publish job",
+    "prosepilot_tokens_total": "Tokens used, by model and kind",
+    "prosepilot_cost_usd_total": "Estimated OpenAI spend in US dollars",
+    "prosepilot_errors_total": "Failed calls, by component and error class",
+    "prosepilot_coalesced_total": "Calls that joined an identical call already in flight, by operation",
+    "prosepilot_pool_requests_total": "OpenAI requests started, by pooled key and model",
+    "prosepilot_pool_failures_total": "OpenAI attempts that failed over, by pooled key, model and error class",
+    "prosepilot_pool_fallbacks_total": "Requests served by a fallback model, by requested and served model",
+    "prosepilot_retry_budget_denied_total": "Retries and hedges refused by the retry budget",
+    "prosepilot_hedges_total": "Hedged generation requests, by model and outcome (fired, won, lost, denied)",
+    "prosepilot_hedge_saved_seconds_total": "Estimated time to first token saved by hedges that won",
+}
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class RollingHistogram:
+    """
+    Cumulative bucket counts for Prometheus, plus the samples of the last
+    window_seconds for percentiles that reflect current behaviour.
+    """
+
+    def __init__(self, buckets: List[float], window_seconds: float):
+        self.buckets = sorted(buckets)
+        self.window_seconds = window_seconds
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self._recent: Deque[Tuple[float, float]] = deque()
+
+    def observe(self, value: float, now: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self._recent.append((now, value))
+        self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        while self._recent and now - self._recent[0][0] > self.window_seconds:
+            self._recent.popleft()
+
+    def recent(self, now: float) -> List[float]:
+        """Samples of the rolling window, sorted"""
+        self._expire(now)
+        return sorted(value for _, value in self._recent)
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        """Percentiles over the rolling window, totals over the process lifetime"""
+        recent = self.recent(now)
+
+        def percentile(q: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * q))], 4)
+
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "window_count": len(recent),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        }
+
+
+class Telemetry:
+    """Process-wide registry of latency histograms and counters"""
+
+    def __init__(
+        self,
+        buckets: List[float] = TELEMETRY_LATENCY_BUCKETS,
+        window_seconds: float = TELEMETRY_WINDOW_SECONDS,
+    ):
+        self.buckets = buckets
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, RollingHistogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._last_export = 0.0
+
+    def observe(self, metric: str, value: float, **labels) -> None:
+        """Record one latency sample in seconds"""
+        now = time.time()
+        with self._lock:
+            series = self._histograms.setdefault(metric, {})
+            key = _label_key(labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = RollingHistogram(self.buckets, self.window_seconds)
+            histogram.observe(value, now)
+
+    def recent_values(self, metric: str, **labels) -> List[float]:
+        """Sorted samples of one series over the rolling window"""
+        with self._lock:
+            histogram = self._histograms.get(metric, {}).get(_label_key(labels))
+            return histogram.recent(time.time()) if histogram else []
+
+    def increment(self, metric: str, amount: float = 1.0, **labels) -> None:
+        """Add to a counter"""
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0.0) + amount
+
+    def record_error(self, component: str, error: BaseException) -> None:
+        self.increment("prosepilot_errors_total", component=component, error=type(error).__name__)
+
+    @contextmanager
+    def timer(self, metric: str, component: str, **labels) -> Iterator[None]:
+        """Time a block; failures are counted by error class and re-raised"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(component, e)
+            self.observe(metric, time.perf_counter() - started_at, status="error", **labels)
+            raise
+        self.observe(metric, time.perf_counter() - started_at, status="ok", **labels)
+
+    def record_usage(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0,
+    ) -> None:
+        """Count tokens and their estimated cost for one request"""
+        self.increment("prosepilot_tokens_total", prompt_tokens, model=model, kind="prompt")
+        self.increment("prosepilot_tokens_total", completion_tokens, model=model, kind="completion")
+        if cached_tokens:
+            self.increment("prosepilot_tokens_total", cached_tokens, model=model, kind="cached_prompt")
+
+        pricing = MODEL_PRICING.get(model)
+        if pricing:
+            input_price, cached_price, output_price = pricing
+            cost = (
+                (prompt_tokens - cached_tokens) * input_price
+                + cached_tokens * cached_price
+                + completion_tokens * output_price
+            ) / 1_000_000
+            self.increment("prosepilot_cost_usd_total", cost, model=model)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as plain data: histogram summaries and counter values"""
+        now = time.time()
+        with self._lock:
+            histograms = {
+                metric: [
+                    {"labels": dict(key), **histogram.summary(now)}
+                    for key, histogram in series.items()
+                ]
+                for metric, series in self._histograms.items()
+            }
+            counters = {
+                metric: [
+                    {"labels": dict(key), "value": round(value, 6)}
+                    for key, value in series.items()
+                ]
+                for metric, series in self._counters.items()
+            }
+        return {"generated_at": now, "histograms": histograms, "counters": counters}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def write_json(self, path: str) -> None:
+        """Write the JSON snapshot to a file, e.g. for an external scraper"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Written then renamed, so readers never see a half-written file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.to_json())
+        os.replace(temp_path, path)
+        self._last_export = time.time()
+
+    def export_if_stale(self, path: str, min_interval: float) -> None:
+        """Refresh the JSON export at most once per min_interval seconds"""
+        if time.time() - self._last_export >= min_interval:
+            self.write_json(path)
+
+    def prometheus_text(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                        cumulative += count
+                        lines.append(
+                            f"{metric}_bucket{_format_labels(key, ('le', repr(float(bound))))} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+
+            for metric, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Return the process-wide telemetry registry"""
+    global _telemetry
+
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
+
+
+def timed(metric: str, component: str, **labels):
+    """Decorator form of Telemetry.timer"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_telemetry().timer(metric, component, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
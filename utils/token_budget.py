@@ -0,0 +1,101 @@
+import math
+import re
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence
+from config.settings import (
+    COMPLETION_HEADROOM,
+    COMPLETION_OVERHEAD_TOKENS,
+    DEFAULT_MAX_TOKENS,
+    TOKENS_PER_WORD,
+)
+
+# Words, digit runs, indentation after a newline, and single symbols
+TOKEN_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|\n[ \t]*|[^\sA-Za-z\d]")
+MESSAGE_OVERHEAD_TOKENS = 4  # role and delimiters per chat message
+REPLY_PRIMING_TOKENS = 3
+SECTION_SEPARATOR_TOKENS = 1  # the blank line between context sections
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local approximation of a BPE token count. Common words are one
+    token, long words one more per 7 letters, digits one per 3, symbols one each.
+    """
+    tokens = 0
+    for piece in TOKEN_PIECE_PATTERN.findall(text or ""):
+        first = piece[0]
+        if first.isalpha():
+            tokens += 1 + (len(piece) - 1) // 7
+        elif first.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        else:
+            tokens += 1
+    return tokens
+
+
+def estimate_message_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Estimate the prompt tokens of a chat completion request"""
+    return REPLY_PRIMING_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message["content"])
+        for message in messages
+    )
+
+
+def completion_token_budget(max_length: Optional[int]) -> int:
+    """Derive max_tokens from a word limit, with headroom for markdown syntax"""
+    if not max_length:
+        return DEFAULT_MAX_TOKENS
+    return math.ceil(max_length * TOKENS_PER_WORD * COMPLETION_HEADROOM) + COMPLETION_OVERHEAD_TOKENS
+
+
+@dataclass(frozen=True)
+class ContextSection:
+    """One titled block of prompt context; lower priority values are kept longest"""
+    text: str
+    priority: int
+    tokens: int
+
+    @classmethod
+    def create(cls, text: str, priority: int) -> "ContextSection":
+        return cls(text, priority, estimate_tokens(text))
+
+
+def _trim_section(section: ContextSection, max_tokens: int) -> Optional[ContextSection]:
+    """Drop trailing lines until the section fits, keeping its title and one line"""
+    lines = section.text.split("\n")
+    tokens = section.tokens
+
+    while tokens > max_tokens and len(lines) > 2:
+        tokens -= estimate_tokens("\n" + lines.pop())
+
+    if tokens > max_tokens or len(lines) < 2:
+        return None
+    return replace(section, text="\n".join(lines), tokens=tokens)
+
+
+def fit_sections(sections: Sequence[ContextSection], budget: Optional[int]) -> List[ContextSection]:
+    """
+    Fit context sections into a token budget. The least important sections
+    are trimmed line by line, or dropped when even a trimmed version would
+    not fit; the kept sections stay in their original order.
+    """
+    kept = list(sections)
+    if budget is None:
+        return kept
+
+    total = sum(section.tokens + SECTION_SEPARATOR_TOKENS for section in kept)
+
+    for section in sorted(sections, key=lambda s: s.priority, reverse=True):
+        if total <= budget:
+            break
+
+        position = kept.index(section)
+        trimmed = _trim_section(section, section.tokens - (total - budget))
+        if trimmed is not None:
+            kept[position] = trimmed
+            total -= section.tokens - trimmed.tokens
+        else:
+            del kept[position]
+            total -= section.tokens + SECTION_SEPARATOR_TOKENS
+
+    return kept